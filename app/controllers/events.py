@@ -0,0 +1,67 @@
+import logging
+import threading
+from typing import Callable, List
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+VAULT_OPENED = "vault_opened"
+VAULT_CLOSED = "vault_closed"
+VAULT_MUTATED = "vault_mutated"
+VAULT_SUSPENDED = "vault_suspended"
+VAULT_RESUMED = "vault_resumed"
+VAULT_SAVING = "vault_saving"
+VAULT_SAVED = "vault_saved"
+
+_listeners: List[Callable[[str], None]] = []
+_listeners_lock = threading.Lock()
+
+
+def subscribe(listener: Callable[[str], None]) -> None:
+    """
+    Register a callback invoked with the event name on every vault lifecycle event.
+
+    :param listener: The callable receiving the event name.
+    :type listener: Callable[[str], None]
+    :return: None
+    :rtype: None
+    """
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[str], None]) -> None:
+    """
+    Remove a previously registered event callback.
+
+    :param listener: The callable to remove.
+    :type listener: Callable[[str], None]
+    :return: None
+    :rtype: None
+    """
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def emit(event: str) -> None:
+    """
+    Notify every subscriber of a vault lifecycle event. Listener errors are
+    logged and never propagated to the emitting controller.
+
+    :param event: The event name (one of the VAULT_* constants).
+    :type event: str
+    :return: None
+    :rtype: None
+    """
+    with _listeners_lock:
+        listeners = list(_listeners)
+
+    for listener in listeners:
+        try:
+            listener(event)
+        except Exception as e:
+            logger.error(f"Event listener failed on '{event}': {e}")
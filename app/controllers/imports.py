@@ -1,15 +1,45 @@
 import pandas as pd
 import logging
-from typing import List, Dict, Optional
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional
+from pydantic import TypeAdapter, ValidationError
 
 from app.core.config import settings
+from app.controllers import events
+from app.controllers.jobs import Job, JobCancelled, job_registry
 from app.controllers.kdbx.models import EntryModel
-from app.controllers.kdbx.operations import add_entry, list_all_entries
+from app.controllers.kdbx.manager import get_active_session
+from app.controllers.kdbx.dedupe import (
+    ImportDedupeIndex, ImportMatch, DEDUPE_POLICIES, SKIP, TAG, KEEP_NEWEST, is_newer
+)
+from app.controllers.kdbx.operations import add_entries, update_entry_fields, vault_batch
 from app.utils.file import get_resolved_path
 
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 
+# Rows read from the CSV at a time; bounds the parser memory whatever the file size.
+CSV_CHUNK_ROWS = 5000
+
+# Rows returned by the import preview, and bytes sampled to estimate the row count.
+PREVIEW_ROWS = 50
+_PREVIEW_SAMPLE_BYTES = 64 * 1024
+
+_MAPPED_FIELDS = ("title", "username", "password", "url", "notes")
+_entry_list = TypeAdapter(List[EntryModel])
+
+# Entries parsed by background jobs, keyed by job id, until imported, discarded,
+# superseded by a new parse, expired with their job or the vault is locked.
+# They stay on the Python side so the dataset never crosses the JS bridge.
+_parsed_imports: Dict[str, List[EntryModel]] = {}
+_parsed_imports_lock = threading.Lock()
+# Latest parse job; only its result is kept. The generation is bumped whenever
+# held results are dropped, so an older job finishing late stores nothing.
+_current_parse: Optional[Job] = None
+_parse_generation = 0
+
 PRESETS = {
     "chrome": {
         "title": "name",
@@ -35,7 +65,8 @@ PRESETS = {
         "url": "URL",
         "username": "Username",
         "password": "Password",
-        "notes": "Notes"
+        "notes": "Notes",
+        "updated_at": "Last Modified"
     }
 }
 
@@ -62,6 +93,213 @@ def get_csv_columns(file_path: str) -> List[str]:
         return []
 
 
+def _exported_at(path: Path) -> datetime:
+    """
+    :return: The modification time of the exported file, in UTC.
+    :rtype: datetime
+    """
+    return datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
+
+
+def _resolve_mapping(preset_name: Optional[str], manual_mapping: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    :return: The manual mapping if given, else the preset mapping, else None.
+    :rtype: Optional[Dict[str, Any]]
+    """
+    return manual_mapping or PRESETS.get(preset_name)
+
+
+def _select_column(chunk: pd.DataFrame, columns: Any) -> pd.Series:
+    """
+    Pick a model field from a chunk: the first non-empty value among the
+    mapped columns, row by row, stripped. Missing columns read as empty.
+
+    :param chunk: A chunk of the CSV read as strings.
+    :type chunk: pd.DataFrame
+    :param columns: A column name, a list of fallback column names, or None.
+    :type columns: Any
+    :return: The field values, aligned with the chunk index.
+    :rtype: pd.Series
+    """
+    result = pd.Series("", index=chunk.index, dtype=object)
+    for column in (columns if isinstance(columns, list) else [columns]):
+        if column not in chunk.columns:
+            continue
+        values = chunk[column].astype(str).str.strip()
+        result = result.where(result != "", values)
+    return result
+
+
+def _select_timestamps(chunk: pd.DataFrame, columns: Any, exported_at: datetime) -> pd.Series:
+    """
+    Pick the modification time of each row; rows without a readable one are
+    dated by the export itself.
+
+    :param chunk: A chunk of the CSV read as strings.
+    :type chunk: pd.DataFrame
+    :param columns: The mapped column name(s), or None.
+    :type columns: Any
+    :param exported_at: Fallback time, in UTC.
+    :type exported_at: datetime
+    :return: Aware UTC datetimes, aligned with the chunk index.
+    :rtype: pd.Series
+    """
+    values = pd.to_datetime(_select_column(chunk, columns), errors="coerce", utc=True, format="mixed")
+    return values.fillna(pd.Timestamp(exported_at)).astype(object)
+
+
+def _chunk_to_models(chunk: pd.DataFrame, mapping: Dict[str, Any], exported_at: datetime) -> List[EntryModel]:
+    """
+    Map and validate one chunk of CSV rows. Rows without a password are dropped;
+    the chunk is validated as a whole and only falls back to row-by-row
+    validation (to skip the bad rows) when that fails.
+
+    :param chunk: A chunk of the CSV read as strings.
+    :type chunk: pd.DataFrame
+    :param mapping: Model field to CSV column(s) mapping.
+    :type mapping: Dict[str, Any]
+    :param exported_at: Modification time given to rows without one (the export time).
+    :type exported_at: datetime
+    :return: The valid entries of the chunk.
+    :rtype: List[EntryModel]
+    """
+    fields = pd.DataFrame({name: _select_column(chunk, mapping.get(name)) for name in _MAPPED_FIELDS})
+    fields["updated_at"] = _select_timestamps(chunk, mapping.get("updated_at"), exported_at)
+    fields = fields[fields["password"] != ""]
+    fields.loc[fields["title"] == "", "title"] = "Imported Entry"
+    fields["group"] = "Imported"
+    records = fields.to_dict(orient="records")
+
+    try:
+        return _entry_list.validate_python(records)
+    except ValidationError:
+        entries = []
+        for record in records:
+            try:
+                entries.append(EntryModel.model_validate(record))
+            except ValidationError as row_err:
+                logger.warning(f"Skipping row due to processing error: {row_err}")
+        return entries
+
+
+def iter_csv_models(
+    file_path: str, preset_name: Optional[str] = None, manual_mapping: Optional[Dict[str, str]] = None,
+    chunk_rows: int = CSV_CHUNK_ROWS, progress: Optional[Callable[[float], None]] = None
+) -> Iterator[List[EntryModel]]:
+    """
+    Stream a CSV file as batches of EntryModel instances, reading chunk_rows
+    rows at a time so memory stays flat for large exports.
+
+    :param file_path: Path to the source CSV file.
+    :type file_path: str
+    :param preset_name: Name of a predefined preset (e.g., 'chrome', 'firefox').
+    :type preset_name: Optional[str]
+    :param manual_mapping: A dictionary mapping model fields to CSV columns.
+    :type manual_mapping: Optional[Dict[str, str]]
+    :param chunk_rows: Rows read per chunk.
+    :type chunk_rows: int
+    :param progress: Optional callback receiving the fraction of the file read after each chunk.
+    :type progress: Optional[Callable[[float], None]]
+    :raises Exception: Parser errors are propagated to the caller.
+    :return: An iterator of entry batches; empty if the file or mapping is invalid.
+    :rtype: Iterator[List[EntryModel]]
+    """
+    path = get_resolved_path(file_path)
+    if not path.exists():
+        logger.error(f"CSV parsing failed: Source file not found at '{path}'")
+        return
+
+    mapping = _resolve_mapping(preset_name, manual_mapping)
+    if not mapping:
+        logger.error("No valid mapping configuration provided for CSV import.")
+        return
+
+    size = path.stat().st_size or 1
+    exported_at = _exported_at(path)
+    with open(path, "rb") as handle:
+        with pd.read_csv(handle, dtype=str, keep_default_na=False, chunksize=max(1, chunk_rows)) as reader:
+            for chunk in reader:
+                yield _chunk_to_models(chunk, mapping, exported_at)
+                if progress:
+                    progress(min(1.0, handle.tell() / size))
+
+
+def _estimate_rows(path: Path) -> int:
+    """
+    Estimate the number of data rows of a CSV from the average line length at
+    its head and tail. Multi-line quoted fields make this an approximation.
+
+    :param path: The CSV file path.
+    :type path: Path
+    :return: The estimated row count, header excluded.
+    :rtype: int
+    """
+    size = path.stat().st_size
+    with open(path, "rb") as handle:
+        sample = handle.read(_PREVIEW_SAMPLE_BYTES)
+        if len(sample) >= size:
+            lines = sample.count(b"\n") + (0 if not sample or sample.endswith(b"\n") else 1)
+            return max(0, lines - 1)
+
+        # Row lengths drift through a file (ids and names grow), so the tail is
+        # sampled too; its first, partial line is dropped.
+        handle.seek(max(len(sample), size - _PREVIEW_SAMPLE_BYTES))
+        tail = handle.read()
+        tail = tail[tail.find(b"\n") + 1:]
+
+    lines = sample.count(b"\n") + tail.count(b"\n")
+    if not lines:
+        return 0
+    return max(0, round(size * lines / (len(sample) + len(tail))) - 1)
+
+
+def preview_csv(
+    file_path: str, preset_name: Optional[str] = None, manual_mapping: Optional[Dict[str, str]] = None,
+    rows: int = PREVIEW_ROWS
+) -> Optional[Dict[str, Any]]:
+    """
+    Map the first rows of a CSV file and estimate the size of the whole import
+    without reading it.
+
+    :param file_path: Path to the source CSV file.
+    :type file_path: str
+    :param preset_name: Name of a predefined preset (e.g., 'chrome', 'firefox').
+    :type preset_name: Optional[str]
+    :param manual_mapping: A dictionary mapping model fields to CSV columns.
+    :type manual_mapping: Optional[Dict[str, str]]
+    :param rows: Number of rows to sample.
+    :type rows: int
+    :return: The sampled entries, the number of rows sampled, and the estimated
+             rows and importable entries of the file; None if the file or mapping is invalid.
+    :rtype: Optional[Dict[str, Any]]
+    """
+    path = get_resolved_path(file_path)
+    if not path.exists():
+        logger.error(f"CSV preview failed: Source file not found at '{path}'")
+        return None
+
+    mapping = _resolve_mapping(preset_name, manual_mapping)
+    if not mapping:
+        logger.error("No valid mapping configuration provided for CSV import.")
+        return None
+
+    try:
+        sample = pd.read_csv(path, dtype=str, keep_default_na=False, nrows=max(1, rows))
+        entries = _chunk_to_models(sample, mapping, _exported_at(path))
+        estimated_rows = max(_estimate_rows(path), len(sample))
+    except Exception as e:
+        logger.error(f"Failed to preview CSV {path}: {e}")
+        return None
+
+    ratio = len(entries) / len(sample) if len(sample) else 0.0
+    return {
+        "entries": entries,
+        "sampled_rows": len(sample),
+        "estimated_rows": estimated_rows,
+        "estimated_entries": round(estimated_rows * ratio),
+    }
+
+
 def parse_csv_to_models(
     file_path: str, preset_name: Optional[str] = None, manual_mapping: Optional[Dict[str, str]] = None
 ) -> List[EntryModel]:
@@ -77,88 +315,291 @@ def parse_csv_to_models(
     :return: A list of EntryModel objects.
     :rtype: List[EntryModel]
     """
+    try:
+        entries = [entry for batch in iter_csv_models(file_path, preset_name, manual_mapping) for entry in batch]
+    except Exception as e:
+        logger.error(f"Critical error during CSV parsing: {e}")
+        return []
+
+    logger.info(f"Successfully parsed {len(entries)} entries from CSV.")
+    return entries
+
+
+def start_csv_parse(
+    file_path: str, preset_name: Optional[str] = None, manual_mapping: Optional[Dict[str, str]] = None
+) -> Optional[Job]:
+    """
+    Parse and validate a whole CSV file on a background job. The job reports
+    the fraction of the file read and can be cancelled between chunks; its
+    result only holds the entry count, the entries themselves are kept here
+    for run_parsed_import(). Starting a parse cancels the previous one and
+    discards earlier parsed results.
+
+    :param file_path: Path to the source CSV file.
+    :type file_path: str
+    :param preset_name: Name of a predefined preset (e.g., 'chrome', 'firefox').
+    :type preset_name: Optional[str]
+    :param manual_mapping: A dictionary mapping model fields to CSV columns.
+    :type manual_mapping: Optional[Dict[str, str]]
+    :return: The started Job, or None if the file or mapping is invalid.
+    :rtype: Optional[Job]
+    """
     path = get_resolved_path(file_path)
     if not path.exists():
         logger.error(f"CSV parsing failed: Source file not found at '{path}'")
-        return []
-    
-    mapping = manual_mapping or PRESETS.get(preset_name)
-    
-    if not mapping:
+        return None
+    if not _resolve_mapping(preset_name, manual_mapping):
         logger.error("No valid mapping configuration provided for CSV import.")
-        return []
+        return None
 
-    try:
-        df = pd.read_csv(path).fillna("")
-        df.replace({pd.NA: "", float('nan'): ""}).to_dict(orient="records")
-        entries = []
+    global _current_parse
+    generation = _drop_parsed_imports()
 
-        def get_value(field_name):
-            """
-            """
-            cols = mapping.get(field_name)              
-            
-            if isinstance(cols, list):
-                for col in cols:
-                    val = str(row.get(col, "")).strip()
-                    if val: return val
-                return ""
-            
-            return str(row.get(cols, "")).strip()
-
-        for _, row in df.iterrows():
-            try:
-                entry = EntryModel(
-                    title=get_value("title") or "Imported Entry",
-                    username=get_value("username"),
-                    password=get_value("password"),
-                    url=get_value("url"),
-                    notes=get_value("notes"),
-                    group="Imported"
-                )
-                
-                if entry.title and entry.password:
-                    entries.append(entry)
-            except Exception as row_err:
-                logger.warning(f"Skipping row due to processing error: {row_err}")
-                continue
+    def run(job: Job) -> Dict[str, int]:
+        job.set_stage("parse", 0.0)
+        entries: List[EntryModel] = []
+        report = lambda ratio: job.set_stage("parse", ratio)
+        for batch in iter_csv_models(str(path), preset_name, manual_mapping, progress=report):
+            entries.extend(batch)
 
+        job.set_stage("ready", 1.0)
+        with _parsed_imports_lock:
+            if generation != _parse_generation:
+                raise JobCancelled()
+            _parsed_imports[job.id] = entries
         logger.info(f"Successfully parsed {len(entries)} entries from CSV.")
-        return entries
+        return {"entries": len(entries)}
 
-    except Exception as e:
-        logger.error(f"Critical error during CSV parsing: {e}")
-        return []
+    job = job_registry.submit("csv_parse", run, on_expire=lambda expired: discard_parsed_import(expired.id))
+    with _parsed_imports_lock:
+        if generation == _parse_generation:
+            _current_parse = job
+        else:
+            job.cancel()
+    return job
 
 
-def execute_final_import(entries: List[EntryModel], target_group: str) -> Dict[str, int]:
+def _drop_parsed_imports() -> int:
     """
-    Persist a list of EntryModel instances into the active vault.
+    Cancel the running parse job and release every parsed result.
 
-    :param entries: List of models to be imported.
+    :return: The new parse generation.
+    :rtype: int
+    """
+    global _current_parse, _parse_generation
+    with _parsed_imports_lock:
+        previous, _current_parse = _current_parse, None
+        _parse_generation += 1
+        _parsed_imports.clear()
+        generation = _parse_generation
+
+    if previous is not None:
+        previous.cancel()
+    return generation
+
+
+def _on_vault_event(event: str) -> None:
+    """
+    Release the parsed rows, which hold plaintext passwords, once the vault is locked.
+
+    :param event: The event name.
+    :type event: str
+    :return: None
+    :rtype: None
+    """
+    if event in (events.VAULT_CLOSED, events.VAULT_SUSPENDED):
+        _drop_parsed_imports()
+
+
+def discard_parsed_import(job_id: str) -> bool:
+    """
+    Release the entries parsed by a job without importing them.
+
+    :param job_id: The parse job identifier.
+    :type job_id: str
+    :return: True if parsed entries were held for that job.
+    :rtype: bool
+    """
+    with _parsed_imports_lock:
+        return _parsed_imports.pop(job_id, None) is not None
+
+
+def _resolve_policy(policy: Optional[str]) -> str:
+    """
+    :return: The requested dedupe policy, IMPORT_DEDUPE_POLICY if None, or 'tag' if unknown.
+    :rtype: str
+    """
+    policy = policy or settings.IMPORT_DEDUPE_POLICY
+    if policy not in DEDUPE_POLICIES:
+        logger.warning(f"Unknown import dedupe policy '{policy}', tagging duplicates instead.")
+        return TAG
+    return policy
+
+
+def _overwrite(match: ImportMatch, entry: EntryModel) -> bool:
+    """
+    Replace a known version of an account with an imported row: a vault entry
+    is updated in place, a row imported earlier in this run is simply replaced.
+    """
+    if match.uuid is not None:
+        return update_entry_fields(match.uuid, entry)
+
+    pending = match.model
+    pending.title, pending.username, pending.password = entry.title, entry.username, entry.password
+    pending.url, pending.notes, pending.updated_at = entry.url, entry.notes, entry.updated_at
+    return True
+
+
+def _import_batch(entries: List[EntryModel], target_group: str, index: ImportDedupeIndex, policy: str) -> Dict[str, int]:
+    """
+    Resolve the duplicates of a batch against the vault (and the rows already
+    imported), then bulk-insert the new entries. A row repeating a known
+    account with the same password is always dropped; a row with a different
+    password is skipped, tagged and added, written over the newest version,
+    or written over it only if the row is newer, depending on the policy.
+
+    :param entries: The batch to import; the models are updated in place.
     :type entries: List[EntryModel]
     :param target_group: The destination group name in the vault.
     :type target_group: str
-    :return: A dictionary with 'success' and 'failed' counts.
+    :param index: The dedupe index of this import; extended with the batch.
+    :type index: ImportDedupeIndex
+    :param policy: One of skip, tag, overwrite or keep_newest.
+    :type policy: str
+    :return: A dictionary with 'success', 'failed', 'skipped' and 'updated' counts.
     :rtype: Dict[str, int]
     """
-    stats = {"success": 0, "failed": 0}
-    current_entries = list_all_entries()
-    existing_keys = {(e.title, e.username) for e in current_entries}
-    
+    stats = {"success": 0, "failed": 0, "skipped": 0, "updated": 0}
+    new_entries = []
+
     for entry in entries:
         entry.group = target_group
-        
-        if (entry.title, entry.username) in existing_keys:
+        matches = index.find(entry)
+
+        if not matches:
+            index.add(entry)
+            new_entries.append(entry)
+            continue
+
+        fingerprint = index.fingerprint(entry.password)
+        if policy == SKIP or any(m.fingerprint == fingerprint for m in matches):
+            stats["skipped"] += 1
+            continue
+
+        if policy == TAG:
             if settings.DUPLICATE_TAG not in entry.tags:
                 entry.tags.append(settings.DUPLICATE_TAG)
             logger.info(f"Import: Duplicate detected for '{entry.title}' (User: {entry.username}). Tagging...")
+            index.add(entry)
+            new_entries.append(entry)
+            continue
+
+        newest = max(matches, key=lambda m: (m.updated_at is not None, m.updated_at or datetime.min))
+        if policy == KEEP_NEWEST and not is_newer(entry.updated_at, newest.updated_at):
+            stats["skipped"] += 1
+            continue
 
-        if add_entry(entry):
-            stats["success"] += 1
-            existing_keys.add((entry.title, entry.username))
+        if _overwrite(newest, entry):
+            index.replace(newest, entry)
+            stats["updated"] += 1
         else:
             stats["failed"] += 1
-            
-    logger.info(f"Import process completed. Success: {stats['success']}, Failed: {stats['failed']}")
-    return stats
\ No newline at end of file
+
+    added = add_entries(new_entries)
+    stats["success"] += added
+    stats["failed"] += len(new_entries) - added
+    return stats
+
+
+def _import_batches(batches: Iterable[List[EntryModel]], target_group: str, policy: Optional[str] = None) -> Dict[str, int]:
+    """
+    Import batches of entries inside a single vault batch, so the vault is saved
+    once. The dedupe index is built once, in a single pass over the vault.
+    """
+    policy = _resolve_policy(policy)
+    stats = {"success": 0, "failed": 0, "skipped": 0, "updated": 0}
+    index = ImportDedupeIndex()
+    index.build(list(get_active_session().entries_by_uuid.values()))
+
+    with vault_batch():
+        for batch in batches:
+            for key, value in _import_batch(batch, target_group, index, policy).items():
+                stats[key] += value
+
+    logger.info(
+        f"Import process completed ({policy}). Success: {stats['success']}, Updated: {stats['updated']}, "
+        f"Skipped: {stats['skipped']}, Failed: {stats['failed']}"
+    )
+    return stats
+
+
+def execute_final_import(entries: List[EntryModel], target_group: str, policy: Optional[str] = None) -> Dict[str, int]:
+    """
+    Persist a list of EntryModel instances into the active vault.
+
+    :param entries: List of models to be imported.
+    :type entries: List[EntryModel]
+    :param target_group: The destination group name in the vault.
+    :type target_group: str
+    :param policy: Duplicate policy (skip, tag, overwrite, keep_newest); defaults to IMPORT_DEDUPE_POLICY.
+    :type policy: Optional[str]
+    :return: A dictionary with 'success', 'failed', 'skipped' and 'updated' counts.
+    :rtype: Dict[str, int]
+    """
+    return _import_batches([entries], target_group, policy)
+
+
+def import_csv_file(
+    file_path: str, target_group: str, preset_name: Optional[str] = None,
+    manual_mapping: Optional[Dict[str, str]] = None, policy: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Stream a CSV file straight into the active vault, chunk by chunk, without
+    building the full list of entries first. The vault is saved once at the end.
+
+    :param file_path: Path to the source CSV file.
+    :type file_path: str
+    :param target_group: The destination group name in the vault.
+    :type target_group: str
+    :param preset_name: Name of a predefined preset (e.g., 'chrome', 'firefox').
+    :type preset_name: Optional[str]
+    :param manual_mapping: A dictionary mapping model fields to CSV columns.
+    :type manual_mapping: Optional[Dict[str, str]]
+    :param policy: Duplicate policy (skip, tag, overwrite, keep_newest); defaults to IMPORT_DEDUPE_POLICY.
+    :type policy: Optional[str]
+    :return: A dictionary with 'success', 'failed', 'skipped' and 'updated' counts.
+    :rtype: Dict[str, int]
+    """
+    try:
+        return _import_batches(iter_csv_models(file_path, preset_name, manual_mapping), target_group, policy)
+    except Exception as e:
+        logger.error(f"Critical error during CSV import: {e}")
+        return {"success": 0, "failed": 0}
+
+
+def run_parsed_import(job_id: str, target_group: str, policy: Optional[str] = None) -> Dict[str, int]:
+    """
+    Import the entries parsed by a finished start_csv_parse() job. The parsed
+    entries are released afterwards, so a job can be imported once.
+
+    :param job_id: The parse job identifier.
+    :type job_id: str
+    :param target_group: The destination group name in the vault.
+    :type target_group: str
+    :param policy: Duplicate policy (skip, tag, overwrite, keep_newest); defaults to IMPORT_DEDUPE_POLICY.
+    :type policy: Optional[str]
+    :return: A dictionary with 'success', 'failed', 'skipped' and 'updated' counts.
+    :rtype: Dict[str, int]
+    """
+    with _parsed_imports_lock:
+        entries = _parsed_imports.pop(job_id, None)
+
+    if entries is None:
+        logger.error(f"Import failed: no parsed entries for job {job_id}.")
+        return {"success": 0, "failed": 0}
+
+    batches = (entries[i:i + CSV_CHUNK_ROWS] for i in range(0, len(entries), CSV_CHUNK_ROWS))
+    return _import_batches(batches, target_group, policy)
+
+
+events.subscribe(_on_vault_event)
@@ -0,0 +1,257 @@
+import time
+import uuid
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Finished jobs are kept this long (seconds) so the frontend can read their outcome.
+_FINISHED_JOB_TTL = 600
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job function when cancellation was requested.
+    """
+
+
+class Job:
+    """
+    A long-running operation executed on a background thread. The job function
+    reports its progress through set_stage() and polls check_cancelled()
+    between steps; cancellation is cooperative.
+    """
+
+
+    def __init__(self, kind: str, on_expire: Optional[Callable[["Job"], None]] = None):
+        """
+        :ivar id: Unique job identifier handed to the frontend.
+        :vartype id: str
+        :ivar kind: The operation type (e.g. 'open_vault').
+        :vartype kind: str
+        :ivar status: One of pending, running, done, failed or cancelled.
+        :vartype status: str
+        :ivar stage: Name of the step currently executing.
+        :vartype stage: Optional[str]
+        :ivar progress: Overall completion ratio, from 0.0 to 1.0.
+        :vartype progress: float
+        :ivar result: JSON-serializable outcome of a successful job.
+        :vartype result: Any
+        :ivar error: Error message of a failed job.
+        :vartype error: Optional[str]
+        :ivar on_expire: Callback run when the finished job is dropped from the registry,
+                         to release what its result refers to.
+        :vartype on_expire: Optional[Callable[[Job], None]]
+        """
+        self.id: str = uuid.uuid4().hex
+        self.kind: str = kind
+        self.status: str = PENDING
+        self.stage: Optional[str] = None
+        self.progress: float = 0.0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at: float = time.time()
+        self.finished_at: Optional[float] = None
+        self.on_expire = on_expire
+        self._cancel_event = threading.Event()
+
+
+    def set_stage(self, stage: str, progress: Optional[float] = None) -> None:
+        """
+        Report the step being executed. Raises JobCancelled if a cancel is pending,
+        so each stage boundary is also a cancellation point.
+
+        :param stage: The stage name.
+        :type stage: str
+        :param progress: Optional overall completion ratio (0.0 - 1.0).
+        :type progress: Optional[float]
+        :return: None
+        :rtype: None
+        """
+        self.check_cancelled()
+        self.stage = stage
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, progress))
+        logger.debug(f"Job {self.kind}:{self.id[:8]} -> {stage}")
+
+
+    def cancel(self) -> None:
+        """
+        Request cancellation. The job stops at its next cancellation point.
+
+        :return: None
+        :rtype: None
+        """
+        self._cancel_event.set()
+
+
+    def is_cancelled(self) -> bool:
+        """
+        :return: True if cancellation was requested.
+        :rtype: bool
+        """
+        return self._cancel_event.is_set()
+
+
+    def check_cancelled(self) -> None:
+        """
+        Abort the job function if cancellation was requested.
+
+        :raises JobCancelled: If the job was cancelled.
+        :return: None
+        :rtype: None
+        """
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+
+    def is_finished(self) -> bool:
+        """
+        :return: True once the job reached done, failed or cancelled.
+        :rtype: bool
+        """
+        return self.status in (DONE, FAILED, CANCELLED)
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the job state for the frontend.
+
+        :return: A JSON-serializable dictionary.
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobRegistry:
+    """
+    Registry of the background jobs started from the API, so the frontend can
+    poll and cancel them by id.
+    """
+
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+
+    def _prune(self) -> List[Job]:
+        """
+        Drop jobs finished more than _FINISHED_JOB_TTL seconds ago. Must be called with the lock held.
+
+        :return: The dropped jobs; the caller runs their on_expire callbacks once the lock is released.
+        :rtype: List[Job]
+        """
+        limit = time.time() - _FINISHED_JOB_TTL
+        expired = [j for j in self._jobs.values() if j.finished_at and j.finished_at < limit]
+        for job in expired:
+            del self._jobs[job.id]
+        return expired
+
+
+    @staticmethod
+    def _expire(jobs: List[Job]) -> None:
+        """
+        Run the on_expire callbacks of dropped jobs.
+        """
+        for job in jobs:
+            if job.on_expire is None:
+                continue
+            try:
+                job.on_expire(job)
+            except Exception as e:
+                logger.error(f"Job {job.kind}:{job.id[:8]} cleanup failed: {e}")
+
+
+    def _run(self, job: Job, func: Callable[[Job], Any]) -> None:
+        """
+        Execute a job function and record its outcome.
+        """
+        job.status = RUNNING
+        try:
+            job.result = func(job)
+            job.status = DONE
+            job.progress = 1.0
+        except JobCancelled:
+            job.status = CANCELLED
+            logger.info(f"Job {job.kind}:{job.id[:8]} cancelled during '{job.stage}'.")
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            logger.error(f"Job {job.kind}:{job.id[:8]} failed during '{job.stage}': {e}")
+        finally:
+            job.finished_at = time.time()
+
+
+    def submit(self, kind: str, func: Callable[[Job], Any], on_expire: Optional[Callable[[Job], None]] = None) -> Job:
+        """
+        Start a job on a daemon thread.
+
+        :param kind: The operation type.
+        :type kind: str
+        :param func: The job function; receives the Job and returns its result.
+        :type func: Callable[[Job], Any]
+        :param on_expire: (Optional) Callback run when the finished job is pruned.
+        :type on_expire: Optional[Callable[[Job], None]]
+        :return: The started Job.
+        :rtype: Job
+        """
+        job = Job(kind, on_expire=on_expire)
+        with self._lock:
+            expired = self._prune()
+            self._jobs[job.id] = job
+        self._expire(expired)
+
+        threading.Thread(target=self._run, args=(job, func), name=f"Job-{kind}", daemon=True).start()
+        return job
+
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        :param job_id: The job identifier.
+        :type job_id: str
+        :return: The Job, or None if unknown or expired.
+        :rtype: Optional[Job]
+        """
+        with self._lock:
+            expired = self._prune()
+            job = self._jobs.get(job_id)
+        self._expire(expired)
+        return job
+
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request the cancellation of a running job.
+
+        :param job_id: The job identifier.
+        :type job_id: str
+        :return: True if the job exists and was still running, False otherwise.
+        :rtype: bool
+        """
+        job = self.get(job_id)
+        if job is None or job.is_finished():
+            return False
+        job.cancel()
+        return True
+
+
+job_registry = JobRegistry()
@@ -1,15 +1,19 @@
 
 from .manager import (
     create_new_vault, generate_keyfile, open_vault, 
-    get_active_vault, close_current_vault
+    get_active_vault, get_active_session, close_current_vault, retune_vault_kdf,
+    suspend_vault, is_vault_loaded
 )
 from .session import VaultSession
-from .models import GroupModel, EntryModel
+from .models import GroupModel, EntryModel, EntryRow
+from .query import compile_query, QueryPlan
 from .operations import (
     list_all_entries, list_groups, list_entries_by_group,
     find_entries, get_group, create_group, update_group, 
-    delete_group, add_entry, update_entry, delete_entry, 
-    move_entry
+    delete_group, add_entry, add_entries, update_entry, update_entry_fields, update_entry_tags, 
+    update_entry_properties, delete_entry, move_entry, vault_batch,
+    list_entry_rows_by_group, list_all_entry_rows, find_entry_rows, get_entry_model,
+    list_entry_rows_page, search_entry_rows_incremental, close_search_session
 )
 
 __all__ = [
@@ -17,10 +21,17 @@ __all__ = [
     "generate_keyfile",
     "open_vault", 
     "get_active_vault", 
+    "get_active_session",
     "close_current_vault",
+    "retune_vault_kdf",
+    "suspend_vault",
+    "is_vault_loaded",
     "VaultSession",
     "GroupModel", 
     "EntryModel",
+    "EntryRow",
+    "compile_query",
+    "QueryPlan",
     "list_all_entries", 
     "list_groups", 
     "list_entries_by_group",
@@ -30,7 +41,19 @@ __all__ = [
     "update_group", 
     "delete_group",
     "add_entry", 
+    "add_entries",
     "update_entry", 
+    "update_entry_fields",
+    "update_entry_tags",
+    "update_entry_properties",
     "delete_entry", 
-    "move_entry"
+    "move_entry",
+    "vault_batch",
+    "list_entry_rows_by_group",
+    "list_all_entry_rows",
+    "find_entry_rows",
+    "get_entry_model",
+    "list_entry_rows_page",
+    "search_entry_rows_incremental",
+    "close_search_session"
 ]
\ No newline at end of file
@@ -1,7 +1,13 @@
+import os
+import json
 import shutil
+import hashlib
 import logging
+import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from app.core.config import settings
 from app.utils.file import ensure_parent_exists
@@ -9,10 +15,222 @@ from app.utils.file import ensure_parent_exists
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 
+_INDEX_FILENAME = "backup-index.json"
+_OBJECTS_DIRNAME = "objects"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+_index_lock = threading.RLock()
+_index_cache: Optional[Dict[str, Any]] = None
+_index_cache_folder: Optional[Path] = None
+_known_digests: Dict[str, Tuple[int, int, str]] = {}
+
+
+def _get_backup_folder() -> Path:
+    """
+    Resolve the backup folder and make sure its object store exists.
+
+    :return: The absolute path of the backup folder.
+    :rtype: Path
+    """
+    backup_folder = Path(settings.BACKUP_DIR).resolve()
+    ensure_parent_exists(backup_folder / _OBJECTS_DIRNAME / "dummy.txt")
+    return backup_folder
+
+
+def _load_index(backup_folder: Path) -> Dict[str, Any]:
+    """
+    Load the backup index, served from memory after the first read.
+
+    :param backup_folder: The backup folder holding the index file.
+    :type backup_folder: Path
+    :return: The index dictionary ({"version": 1, "vaults": {path: [records]}}).
+    :rtype: Dict[str, Any]
+    """
+    global _index_cache, _index_cache_folder
+
+    if _index_cache is not None and _index_cache_folder == backup_folder:
+        return _index_cache
+
+    index: Dict[str, Any] = {"version": 1, "vaults": {}}
+    index_path = backup_folder / _INDEX_FILENAME
+
+    if index_path.exists():
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get("vaults"), dict):
+                index = data
+        except (json.JSONDecodeError, IOError) as e:
+            logger.error(f"Backup index is unreadable, starting a new one: {e}")
+
+    _index_cache = index
+    _index_cache_folder = backup_folder
+    return index
+
+
+def _save_index(backup_folder: Path, index: Dict[str, Any]) -> None:
+    """
+    Atomically persist the backup index next to the stored objects.
+
+    :param backup_folder: The backup folder holding the index file.
+    :type backup_folder: Path
+    :param index: The index dictionary to write.
+    :type index: Dict[str, Any]
+    :return: None
+    :rtype: None
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=backup_folder, prefix=f".{_INDEX_FILENAME}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_name, backup_folder / _INDEX_FILENAME)
+    except Exception:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _hash_file(path: Path) -> str:
+    """
+    Compute the SHA-256 digest of a file in fixed-size chunks.
+
+    :param path: The file to hash.
+    :type path: Path
+    :return: The hexadecimal digest.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def register_vault_digest(path: str, digest: str) -> None:
+    """
+    Remember the digest of a vault file that was just written, so the next
+    backup does not need to read it back from disk.
+
+    :param path: The vault file path.
+    :type path: str
+    :param digest: The SHA-256 hexadecimal digest of the written bytes.
+    :type digest: str
+    :return: None
+    :rtype: None
+    """
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return
+    _known_digests[str(Path(path).resolve())] = (stat.st_size, stat.st_mtime_ns, digest)
+
+
+def _get_current_digest(source_path: Path) -> str:
+    """
+    Return the digest of the vault file, reusing the registered one if the
+    file size and modification time did not change since it was written.
+
+    :param source_path: The resolved vault file path.
+    :type source_path: Path
+    :return: The hexadecimal digest.
+    :rtype: str
+    """
+    stat = source_path.stat()
+    known = _known_digests.get(str(source_path))
+    if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+        return known[2]
+
+    digest = _hash_file(source_path)
+    _known_digests[str(source_path)] = (stat.st_size, stat.st_mtime_ns, digest)
+    return digest
+
+
+def _snapshot_file(source_path: Path, backup_path: Path) -> None:
+    """
+    Preserve the current vault file under the backup name. Vault saves replace
+    the file by rename instead of rewriting it, so a hard link is a stable
+    snapshot that costs no I/O. Falls back to a byte copy when linking is not
+    possible (e.g. the backup folder lives on another filesystem).
+
+    :param source_path: The current vault file.
+    :type source_path: Path
+    :param backup_path: The destination path of the backup.
+    :type backup_path: Path
+    :return: None
+    :rtype: None
+    """
+    try:
+        os.link(source_path, backup_path)
+    except (OSError, AttributeError, NotImplementedError):
+        shutil.copy2(source_path, backup_path)
+
+
+def _select_retained(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Apply the retention policy: the latest BACKUP_MAX_COUNT snapshots plus the
+    newest snapshot of each of the last BACKUP_KEEP_HOURLY hours,
+    BACKUP_KEEP_DAILY days and BACKUP_KEEP_WEEKLY ISO weeks.
+
+    :param records: The backup records of one vault, newest first.
+    :type records: List[Dict[str, Any]]
+    :return: The records to keep, newest first.
+    :rtype: List[Dict[str, Any]]
+    """
+    keep_ids: Set[str] = {r["id"] for r in records[:settings.BACKUP_MAX_COUNT]}
+
+    bucket_rules = (
+        (settings.BACKUP_KEEP_HOURLY, lambda d: d.strftime("%Y%m%d%H")),
+        (settings.BACKUP_KEEP_DAILY, lambda d: d.strftime("%Y%m%d")),
+        (settings.BACKUP_KEEP_WEEKLY, lambda d: "%d-%02d" % d.isocalendar()[:2]),
+    )
+
+    for limit, bucket_of in bucket_rules:
+        if limit <= 0:
+            continue
+
+        seen_buckets: Set[str] = set()
+        for record in records:
+            bucket = bucket_of(datetime.fromisoformat(record["created_at"]))
+            if bucket in seen_buckets:
+                continue
+            if len(seen_buckets) >= limit:
+                break
+            seen_buckets.add(bucket)
+            keep_ids.add(record["id"])
+
+    return [r for r in records if r["id"] in keep_ids]
+
+
+def _collect_garbage(backup_folder: Path, index: Dict[str, Any], candidates: Set[str]) -> None:
+    """
+    Delete stored objects that are no longer referenced by any index record.
+
+    :param backup_folder: The backup folder holding the object store.
+    :type backup_folder: Path
+    :param index: The backup index.
+    :type index: Dict[str, Any]
+    :param candidates: Digests of the objects that lost a reference.
+    :type candidates: Set[str]
+    :return: None
+    :rtype: None
+    """
+    referenced = {r["hash"] for records in index["vaults"].values() for r in records}
+
+    for digest in candidates - referenced:
+        try:
+            (backup_folder / _OBJECTS_DIRNAME / f"{digest}.kdbx").unlink()
+            logger.debug(f"Rotated (deleted) old backup object: {digest[:12]}")
+        except FileNotFoundError:
+            pass
+
 
 def execute_backup_rotation(source_path_str: str) -> None:
     """
-    Create a timestamped backup of the current vault and rotate old copies.
+    Snapshot the current vault into the content-addressed backup store and
+    apply the retention policy. Identical snapshots are stored only once.
+    Must be called before the vault is atomically replaced on disk.
 
     :param source_path_str: The absolute path to the active vault file.
     :type source_path_str: str
@@ -21,36 +239,117 @@ def execute_backup_rotation(source_path_str: str) -> None:
     if not source_path_str:
         return
 
-    source_path = Path(source_path_str)
+    source_path = Path(source_path_str).resolve()
     if not source_path.exists():
         return
 
-    backup_folder = Path(settings.BACKUP_DIR)
-    ensure_parent_exists(backup_folder / "dummy.txt")
+    with _index_lock:
+        try:
+            backup_folder = _get_backup_folder()
+            index = _load_index(backup_folder)
+            records: List[Dict[str, Any]] = index["vaults"].setdefault(str(source_path), [])
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"{source_path.stem}_{timestamp}{source_path.suffix}"
-    backup_path = backup_folder / backup_filename
+            digest = _get_current_digest(source_path)
+            if records and records[0]["hash"] == digest:
+                logger.debug("Backup skipped: vault unchanged since the last snapshot.")
+                return
 
-    try:
-        shutil.copy2(source_path, backup_path)
-        logger.debug(f"Backup created: {backup_filename}")
-    except Exception as e:
-        logger.error(f"Failed to create backup file: {e}")
-        return
+            object_path = backup_folder / _OBJECTS_DIRNAME / f"{digest}.kdbx"
+            if not object_path.exists():
+                _snapshot_file(source_path, object_path)
 
-    try:
-        existing_backups = sorted(
-            [f for f in backup_folder.glob(f"{source_path.stem}_*{source_path.suffix}")],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
-        )
-
-        if len(existing_backups) > settings.BACKUP_MAX_COUNT:
-            to_delete = existing_backups[settings.BACKUP_MAX_COUNT:]
-            for old_file in to_delete:
-                old_file.unlink()
-                logger.debug(f"Rotated (deleted) old backup: {old_file.name}")
-
-    except Exception as e:
-        logger.error(f"Error during backup rotation: {e}")
\ No newline at end of file
+            now = datetime.now()
+            records.insert(0, {
+                "id": f"{now.strftime('%Y%m%d_%H%M%S_%f')}_{digest[:12]}",
+                "hash": digest,
+                "created_at": now.isoformat(),
+                "size": object_path.stat().st_size,
+            })
+            logger.debug(f"Backup recorded: {records[0]['id']}")
+
+        except Exception as e:
+            logger.error(f"Failed to create backup file: {e}")
+            return
+
+        try:
+            retained = _select_retained(records)
+            dropped = {r["hash"] for r in records if r not in retained}
+            index["vaults"][str(source_path)] = retained
+            _save_index(backup_folder, index)
+            _collect_garbage(backup_folder, index, dropped)
+
+        except Exception as e:
+            logger.error(f"Error during backup rotation: {e}")
+
+
+def list_backups(vault_path: str) -> List[Dict[str, Any]]:
+    """
+    List the stored snapshots of a vault, newest first.
+
+    :param vault_path: The path of the vault whose backups are requested.
+    :type vault_path: str
+    :return: A list of dictionaries with 'id', 'created_at' and 'size'.
+    :rtype: List[Dict[str, Any]]
+    """
+    if not vault_path:
+        return []
+
+    with _index_lock:
+        index = _load_index(_get_backup_folder())
+        records = index["vaults"].get(str(Path(vault_path).resolve()), [])
+        return [
+            {"id": r["id"], "created_at": r["created_at"], "size": r["size"]}
+            for r in records
+        ]
+
+
+def restore_backup(backup_id: str, vault_path: str) -> bool:
+    """
+    Replace a vault file with one of its stored snapshots. The current file is
+    snapshotted first, so the restore itself can be undone.
+
+    :param backup_id: The identifier of the snapshot to restore.
+    :type backup_id: str
+    :param vault_path: The path of the vault to overwrite.
+    :type vault_path: str
+    :return: True if the snapshot was restored, False otherwise.
+    :rtype: bool
+    """
+    if not backup_id or not vault_path:
+        return False
+
+    target = Path(vault_path).resolve()
+
+    with _index_lock:
+        backup_folder = _get_backup_folder()
+        index = _load_index(backup_folder)
+        records = index["vaults"].get(str(target), [])
+        record = next((r for r in records if r["id"] == backup_id), None)
+
+        if not record:
+            logger.error(f"Restore failed: backup '{backup_id}' not found for {target.name}")
+            return False
+
+        object_path = backup_folder / _OBJECTS_DIRNAME / f"{record['hash']}.kdbx"
+        if not object_path.exists():
+            logger.error(f"Restore failed: backup object missing for '{backup_id}'")
+            return False
+
+        execute_backup_rotation(str(target))
+
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+        try:
+            os.close(fd)
+            shutil.copy2(object_path, tmp_name)
+            os.replace(tmp_name, target)
+        except Exception as e:
+            logger.error(f"Failed to restore backup '{backup_id}': {e}")
+            try:
+                os.remove(tmp_name)
+            except OSError:
+                pass
+            return False
+
+        register_vault_digest(str(target), record["hash"])
+        logger.info(f"Backup '{backup_id}' restored over {target.name}")
+        return True
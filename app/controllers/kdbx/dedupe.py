@@ -0,0 +1,205 @@
+import hmac
+import secrets
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+from pykeepass.entry import Entry
+
+from app.controllers.kdbx.models import EntryModel, read_entry_fields
+
+
+SKIP = "skip"
+TAG = "tag"
+OVERWRITE = "overwrite"
+KEEP_NEWEST = "keep_newest"
+DEDUPE_POLICIES = (SKIP, TAG, OVERWRITE, KEEP_NEWEST)
+
+
+def normalize_host(url: Optional[str]) -> str:
+    """
+    Reduce a URL to the host that identifies the account: lowercase, without
+    scheme, credentials, port, path or a leading 'www.'. Bare hosts
+    ('example.com/login') are accepted.
+
+    :param url: The entry URL.
+    :type url: Optional[str]
+    :return: The normalized host, or an empty string if there is none.
+    :rtype: str
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if "://" not in url:
+        url = "//" + url
+
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+    host = host.rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def _account_key(url: Optional[str], username: Optional[str], title: Optional[str]) -> Tuple[str, str]:
+    """
+    :return: (site, username) identifying an account; entries without a URL
+             host fall back to their title as the site.
+    :rtype: Tuple[str, str]
+    """
+    site = normalize_host(url) or "title:" + (title or "").strip().casefold()
+    return site, (username or "").strip().casefold()
+
+
+def _as_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """
+    :return: The datetime as an aware UTC value; naive values are taken as UTC.
+    :rtype: Optional[datetime]
+    """
+    if moment is None:
+        return None
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def is_newer(candidate: Optional[datetime], current: Optional[datetime]) -> bool:
+    """
+    :return: True if candidate is strictly more recent than current. An unknown
+             current time is older than anything; an unknown candidate is never newer.
+    :rtype: bool
+    """
+    if candidate is None:
+        return False
+    if current is None:
+        return True
+    return _as_utc(candidate) > _as_utc(current)
+
+
+class ImportMatch:
+    """
+    One known version of an account: an entry already in the vault, or an
+    imported model (pending until add_entries() assigns its UUID).
+    """
+    __slots__ = ("entry_uuid", "model", "fingerprint", "updated_at")
+
+
+    def __init__(self, fingerprint: Optional[bytes], updated_at: Optional[datetime],
+                 entry_uuid: Optional[str] = None, model: Optional[EntryModel] = None):
+        """
+        :ivar entry_uuid: UUID of the vault entry, for entries present before the import.
+        :vartype entry_uuid: Optional[str]
+        :ivar model: The imported model, for accounts first seen in this import.
+        :vartype model: Optional[EntryModel]
+        :ivar fingerprint: Keyed hash of the password.
+        :vartype fingerprint: Optional[bytes]
+        :ivar updated_at: Last modification time, in UTC.
+        :vartype updated_at: Optional[datetime]
+        """
+        self.entry_uuid = entry_uuid
+        self.model = model
+        self.fingerprint = fingerprint
+        self.updated_at = _as_utc(updated_at)
+
+
+    @property
+    def uuid(self) -> Optional[str]:
+        """
+        :return: The UUID of the vault entry, or None while the imported model is pending.
+        :rtype: Optional[str]
+        """
+        return self.model.uuid if self.model is not None else self.entry_uuid
+
+
+class ImportDedupeIndex:
+    """
+    Import-time index of the accounts of the vault, keyed on the normalized
+    URL host and username, holding the keyed password fingerprint and the
+    modification time of every known version. It is built in one pass from the
+    raw entry fields (no models) and grows with the imported rows, so duplicates
+    inside the imported file are caught too. The HMAC key is random and lives
+    only as long as the index.
+    """
+
+
+    def __init__(self):
+        """
+        :ivar _key: Per-index secret used to derive the password fingerprints.
+        :vartype _key: bytes
+        :ivar _accounts: Known versions of every (site, username) account.
+        :vartype _accounts: Dict[Tuple[str, str], List[ImportMatch]]
+        """
+        self._key: bytes = secrets.token_bytes(32)
+        self._accounts: Dict[Tuple[str, str], List[ImportMatch]] = {}
+
+
+    def fingerprint(self, password: Optional[str]) -> Optional[bytes]:
+        """
+        :return: The keyed fingerprint of a password, or None if it is empty.
+        :rtype: Optional[bytes]
+        """
+        if not password:
+            return None
+        return hmac.new(self._key, password.encode("utf-8"), hashlib.sha256).digest()
+
+
+    def build(self, entries: Iterable[Entry]) -> None:
+        """
+        Index the entries of the vault. Entries in the recycle bin are ignored.
+
+        :param entries: The pykeepass entries of the vault.
+        :type entries: Iterable[Entry]
+        :return: None
+        :rtype: None
+        """
+        self._accounts = {}
+        for entry in entries:
+            fields = read_entry_fields(entry)
+            if fields.get("deleted_at"):
+                continue
+
+            modified = entry._element.findtext("Times/LastModificationTime")
+            match = ImportMatch(
+                self.fingerprint(fields.get("Password")),
+                entry._kp._decode_time(modified) if modified else None,
+                entry_uuid=str(entry.uuid)
+            )
+            key = _account_key(fields.get("URL"), fields.get("UserName"), fields.get("Title"))
+            self._accounts.setdefault(key, []).append(match)
+
+
+    def find(self, entry: EntryModel) -> List[ImportMatch]:
+        """
+        :param entry: The imported model.
+        :type entry: EntryModel
+        :return: The known versions of the same account, in indexing order.
+        :rtype: List[ImportMatch]
+        """
+        return self._accounts.get(_account_key(entry.url, entry.username, entry.title), [])
+
+
+    def add(self, entry: EntryModel) -> ImportMatch:
+        """
+        Register an imported model as a new version of its account.
+
+        :param entry: The imported model.
+        :type entry: EntryModel
+        :return: The registered match.
+        :rtype: ImportMatch
+        """
+        match = ImportMatch(self.fingerprint(entry.password), entry.updated_at, model=entry)
+        self._accounts.setdefault(_account_key(entry.url, entry.username, entry.title), []).append(match)
+        return match
+
+
+    def replace(self, match: ImportMatch, entry: EntryModel) -> None:
+        """
+        Record that a known version was overwritten with an imported model.
+
+        :param match: The overwritten version.
+        :type match: ImportMatch
+        :param entry: The model it was overwritten with.
+        :type entry: EntryModel
+        :return: None
+        :rtype: None
+        """
+        match.fingerprint = self.fingerprint(entry.password)
+        match.updated_at = _as_utc(entry.updated_at)
@@ -0,0 +1,180 @@
+import hmac
+import secrets
+import hashlib
+import threading
+from typing import Dict, Iterable, Optional, Set
+from pykeepass.entry import Entry
+
+
+class PasswordDuplicateIndex:
+    """
+    Incrementally maintained map from a keyed hash of each password to the UUIDs
+    sharing it. The HMAC key is random and lives only as long as the index, so
+    neither plaintext passwords nor reusable unsalted hashes are kept in memory.
+    """
+
+
+    def __init__(self):
+        """
+        :ivar _key: Per-index secret used to derive the password fingerprints.
+        :vartype _key: bytes
+        :ivar _hash_by_uuid: Fingerprint of the password of every indexed entry.
+        :vartype _hash_by_uuid: Dict[str, bytes]
+        :ivar _uuids_by_hash: UUIDs of the entries sharing each fingerprint.
+        :vartype _uuids_by_hash: Dict[bytes, Set[str]]
+        :ivar _changed: UUIDs whose duplicate status may have changed since the last audit.
+        :vartype _changed: Set[str]
+        """
+        self._key: bytes = secrets.token_bytes(32)
+        self._hash_by_uuid: Dict[str, bytes] = {}
+        self._uuids_by_hash: Dict[bytes, Set[str]] = {}
+        self._changed: Set[str] = set()
+        self._lock = threading.Lock()
+
+
+    def _fingerprint(self, password: Optional[str]) -> Optional[bytes]:
+        """
+        Compute the keyed fingerprint of a password. Empty passwords are never duplicates.
+        """
+        if not password:
+            return None
+        return hmac.new(self._key, password.encode("utf-8"), hashlib.sha256).digest()
+
+
+    def _detach(self, entry_uuid: str) -> None:
+        """
+        Remove an entry from its fingerprint bucket. Must be called with the lock held.
+        """
+        digest = self._hash_by_uuid.pop(entry_uuid, None)
+        if digest is None:
+            return
+
+        members = self._uuids_by_hash[digest]
+        members.discard(entry_uuid)
+        if len(members) == 1:
+            # The remaining entry just became unique.
+            self._changed.update(members)
+        elif not members:
+            del self._uuids_by_hash[digest]
+
+
+    def _attach(self, entry_uuid: str, digest: bytes) -> None:
+        """
+        Add an entry to a fingerprint bucket. Must be called with the lock held.
+        """
+        members = self._uuids_by_hash.setdefault(digest, set())
+        if len(members) == 1:
+            # The existing entry just became a duplicate.
+            self._changed.update(members)
+        members.add(entry_uuid)
+        self._hash_by_uuid[entry_uuid] = digest
+
+
+    def build(self, entries: Iterable[Entry]) -> None:
+        """
+        Index every entry of a freshly opened vault and mark all of them for auditing.
+
+        :param entries: The pykeepass entries of the vault.
+        :type entries: Iterable[Entry]
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._hash_by_uuid = {}
+            self._uuids_by_hash = {}
+            for entry in entries:
+                entry_uuid = str(entry.uuid)
+                digest = self._fingerprint(entry.password)
+                if digest is not None:
+                    self._uuids_by_hash.setdefault(digest, set()).add(entry_uuid)
+                    self._hash_by_uuid[entry_uuid] = digest
+                self._changed.add(entry_uuid)
+
+
+    def update(self, entry: Entry) -> None:
+        """
+        Re-index an added or modified entry.
+
+        :param entry: The pykeepass Entry instance.
+        :type entry: Entry
+        :return: None
+        :rtype: None
+        """
+        entry_uuid = str(entry.uuid)
+        digest = self._fingerprint(entry.password)
+
+        with self._lock:
+            self._changed.add(entry_uuid)
+            if self._hash_by_uuid.get(entry_uuid) == digest:
+                return
+
+            self._detach(entry_uuid)
+            if digest is not None:
+                self._attach(entry_uuid, digest)
+
+
+    def remove(self, entry_uuid: str) -> None:
+        """
+        Drop a permanently deleted entry from the index.
+
+        :param entry_uuid: The UUID string of the removed entry.
+        :type entry_uuid: str
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._detach(str(entry_uuid))
+            self._changed.discard(str(entry_uuid))
+
+
+    def is_duplicate(self, entry_uuid: str) -> bool:
+        """
+        Tell whether an entry shares its password with at least one other entry.
+
+        :param entry_uuid: The UUID string of the entry.
+        :type entry_uuid: str
+        :return: True if the password is reused, False otherwise.
+        :rtype: bool
+        """
+        with self._lock:
+            digest = self._hash_by_uuid.get(str(entry_uuid))
+            return digest is not None and len(self._uuids_by_hash[digest]) > 1
+
+
+    def pop_changed(self) -> Set[str]:
+        """
+        Return and reset the UUIDs whose duplicate status must be re-checked.
+
+        :return: The set of UUID strings to audit.
+        :rtype: Set[str]
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            return changed
+
+
+    def mark_changed(self, entry_uuids: Iterable[str]) -> None:
+        """
+        Queue entries again, e.g. after an audit failed to tag them.
+
+        :param entry_uuids: The UUID strings to re-check on the next audit.
+        :type entry_uuids: Iterable[str]
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._changed.update(entry_uuids)
+
+
+    def clear(self) -> None:
+        """
+        Forget every fingerprint and rotate the HMAC key.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._key = secrets.token_bytes(32)
+            self._hash_by_uuid = {}
+            self._uuids_by_hash = {}
+            self._changed = set()
@@ -0,0 +1,259 @@
+import time
+import secrets
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import argon2
+from construct import Container
+from pykeepass import PyKeePass
+from pykeepass.kdbx_parsing import kdbx3, kdbx4
+from pykeepass.kdbx_parsing.common import aes_kdf
+from pykeepass.kdbx_parsing.kdbx4 import kdf_uuids
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+ARGON2D = "argon2"
+ARGON2ID = "argon2id"
+AESKDF = "aeskdf"
+KDF_ALGORITHMS = (ARGON2D, ARGON2ID, AESKDF)
+
+# Security floors: calibration never goes below these, even on slow hosts.
+_MIN_ARGON2_ITERATIONS = 2
+_MIN_AES_ROUNDS = 60000
+
+# Each timing sample is grown until it runs at least this long (seconds).
+_SAMPLE_SECONDS = 0.1
+
+# VariantDictionary value types used by the KDBX4 KDF parameters.
+_VD_UINT32 = 0x04
+_VD_UINT64 = 0x05
+_VD_BYTES = 0x42
+
+_calibration_lock = threading.Lock()
+_last_calibration: Optional[Dict[str, Any]] = None
+
+
+def derive_transformed_key(header: Container, password: Optional[str], keyfile: Optional[str]) -> bytes:
+    """
+    Run the key derivation of a vault described by its parsed KDBX header,
+    exactly as pykeepass does when decrypting.
+
+    :param header: The parsed KDBX header (the RawCopy container, with 'value').
+    :type header: Container
+    :param password: Master password.
+    :type password: Optional[str]
+    :param keyfile: Path to the keyfile.
+    :type keyfile: Optional[str]
+    :return: The 32-byte transformed key.
+    :rtype: bytes
+    """
+    compute = {3: kdbx3.compute_transformed, 4: kdbx4.compute_transformed}[header.value.major_version]
+    context = Container(_=Container(
+        header=header, _=Container(password=password, keyfile=keyfile, transformed_key=None)
+    ))
+    return compute(context)
+
+
+def _time_call(func: Callable[[], Any]) -> float:
+    """
+    :return: Wall time in seconds spent running func.
+    :rtype: float
+    """
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def _fit_cost(measure: Callable[[int], float], start: int) -> Tuple[float, float]:
+    """
+    Fit the cost model time = overhead + units * per_unit from two samples,
+    growing the work until a sample is long enough to be meaningful.
+
+    :param measure: Runs the KDF with the given work units and returns the elapsed seconds.
+    :type measure: Callable[[int], float]
+    :param start: Initial work units.
+    :type start: int
+    :return: (overhead, per_unit) in seconds.
+    :rtype: Tuple[float, float]
+    """
+    units = start
+    elapsed = measure(units)
+    while elapsed < _SAMPLE_SECONDS:
+        units *= 2
+        elapsed = measure(units)
+
+    doubled = measure(units * 2)
+    per_unit = max((doubled - elapsed) / units, elapsed / (units * 2), 1e-9)
+    overhead = max(elapsed - per_unit * units, 0.0)
+    return overhead, per_unit
+
+
+def calibrate_kdf(
+    target_ms: Optional[int] = None, algorithm: Optional[str] = None,
+    memory_mib: Optional[int] = None, parallelism: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Measure the KDF throughput of this host and pick the work factor that makes
+    the key derivation take about target_ms. Argon2 memory and parallelism are
+    taken as given; only the iteration count (or the AES-KDF rounds) is tuned.
+
+    :param target_ms: Desired derivation time; defaults to KDF_TARGET_UNLOCK_MS.
+    :type target_ms: Optional[int]
+    :param algorithm: One of argon2, argon2id or aeskdf; defaults to KDF_ALGORITHM.
+    :type algorithm: Optional[str]
+    :param memory_mib: Argon2 memory cost; defaults to KDF_MEMORY_MIB.
+    :type memory_mib: Optional[int]
+    :param parallelism: Argon2 lanes; defaults to KDF_PARALLELISM.
+    :type parallelism: Optional[int]
+    :raises ValueError: If the algorithm is unknown.
+    :return: The parameters (algorithm, iterations, memory_kib, parallelism) plus
+             the estimated derivation time in ms and the target it was tuned for.
+    :rtype: Dict[str, Any]
+    """
+    global _last_calibration
+
+    target_ms = max(1, int(target_ms if target_ms is not None else settings.KDF_TARGET_UNLOCK_MS))
+    algorithm = algorithm or settings.KDF_ALGORITHM
+    if algorithm not in KDF_ALGORITHMS:
+        raise ValueError(f"Unsupported KDF algorithm: {algorithm}")
+
+    if algorithm == AESKDF:
+        memory_kib, parallelism, minimum, start = 0, 1, _MIN_AES_ROUNDS, 10000
+        seed, composite = secrets.token_bytes(32), secrets.token_bytes(32)
+        measure = lambda rounds: _time_call(lambda: aes_kdf(seed, rounds, composite))
+    else:
+        memory_kib = max(8, int(memory_mib if memory_mib is not None else settings.KDF_MEMORY_MIB)) * 1024
+        parallelism = max(1, int(parallelism if parallelism is not None else settings.KDF_PARALLELISM))
+        minimum, start = _MIN_ARGON2_ITERATIONS, 1
+        kind = argon2.low_level.Type.ID if algorithm == ARGON2ID else argon2.low_level.Type.D
+        salt, secret = secrets.token_bytes(32), secrets.token_bytes(32)
+        measure = lambda iterations: _time_call(lambda: argon2.low_level.hash_secret_raw(
+            secret=secret, salt=salt, hash_len=32, type=kind, time_cost=iterations,
+            memory_cost=memory_kib, parallelism=parallelism, version=19
+        ))
+
+    with _calibration_lock:
+        overhead, per_unit = _fit_cost(measure, start)
+
+    units = max(minimum, int((target_ms / 1000 - overhead) / per_unit))
+    result = {
+        "algorithm": algorithm,
+        "iterations": units,
+        "memory_kib": memory_kib,
+        "parallelism": parallelism,
+        "estimated_ms": round((overhead + units * per_unit) * 1000),
+        "target_ms": target_ms,
+    }
+    _last_calibration = result
+    logger.info(
+        f"KDF calibrated: {algorithm} x{units} ({memory_kib} KiB, {parallelism} lanes), "
+        f"~{result['estimated_ms']} ms for a {target_ms} ms target."
+    )
+    return result
+
+
+def get_last_calibration() -> Optional[Dict[str, Any]]:
+    """
+    :return: The result of the latest calibrate_kdf() call in this process, if any.
+    :rtype: Optional[Dict[str, Any]]
+    """
+    return _last_calibration
+
+
+def read_kdf_parameters(vault: PyKeePass) -> Dict[str, Any]:
+    """
+    Describe the KDF configured in a vault header, in the calibrate_kdf() format.
+
+    :param vault: The PyKeePass instance.
+    :type vault: PyKeePass
+    :return: The algorithm, iterations (rounds for AES-KDF), memory_kib and parallelism.
+    :rtype: Dict[str, Any]
+    """
+    dynamic_header = vault.kdbx.header.value.dynamic_header
+
+    if vault.version[0] == 3:
+        return {
+            "algorithm": AESKDF, "iterations": dynamic_header.transform_rounds.data,
+            "memory_kib": 0, "parallelism": 1,
+        }
+
+    params = dynamic_header.kdf_parameters.data.dict
+    algorithm = vault.kdf_algorithm
+    if algorithm == AESKDF:
+        return {"algorithm": AESKDF, "iterations": params["R"].value, "memory_kib": 0, "parallelism": 1}
+
+    return {
+        "algorithm": algorithm,
+        "iterations": params["I"].value,
+        "memory_kib": params["M"].value // 1024,
+        "parallelism": params["P"].value,
+    }
+
+
+def _variant_dictionary(items: List[Tuple[int, str, Any]]) -> Container:
+    """
+    Build the parsed form of a KDBX4 VariantDictionary. Each item peeks the type
+    byte of the next one and the last one peeks the 0x00 terminator, which is
+    what ends the RepeatUntil when pykeepass serializes the header.
+
+    :param items: (type, key, value) triples, in file order.
+    :type items: List[Tuple[int, str, Any]]
+    :return: The dictionary container keyed by item key.
+    :rtype: Container
+    """
+    entries = Container()
+    for position, (kind, key, value) in enumerate(items):
+        next_byte = items[position + 1][0] if position + 1 < len(items) else 0x00
+        entries[key] = Container(type=kind, key=key, value=value, next_byte=next_byte)
+    return entries
+
+
+def apply_kdf_parameters(vault: PyKeePass, params: Dict[str, Any]) -> None:
+    """
+    Rewrite the KDF section of the in-memory vault header with the given
+    parameters and a fresh salt. Takes effect on the next save, which must
+    derive the key again (transformed_key=None, or the key of the new header).
+
+    :param vault: The PyKeePass instance.
+    :type vault: PyKeePass
+    :param params: Parameters in the calibrate_kdf() format.
+    :type params: Dict[str, Any]
+    :raises ValueError: If the vault format cannot hold the requested KDF.
+    :return: None
+    :rtype: None
+    """
+    algorithm = params["algorithm"]
+    iterations = int(params["iterations"])
+    header = vault.kdbx.header
+    dynamic_header = header.value.dynamic_header
+
+    if vault.version[0] == 3:
+        if algorithm != AESKDF:
+            raise ValueError("KDBX 3.1 vaults only support AES-KDF; upgrade the vault to KDBX 4 for Argon2.")
+        dynamic_header.transform_rounds.data = iterations
+        dynamic_header.transform_seed.data = secrets.token_bytes(32)
+    else:
+        if algorithm == AESKDF:
+            items = [
+                (_VD_BYTES, "$UUID", kdf_uuids[AESKDF]),
+                (_VD_UINT64, "R", iterations),
+                (_VD_BYTES, "S", secrets.token_bytes(32)),
+            ]
+        else:
+            items = [
+                (_VD_BYTES, "$UUID", kdf_uuids[algorithm]),
+                (_VD_UINT64, "I", iterations),
+                (_VD_UINT64, "M", int(params["memory_kib"]) * 1024),
+                (_VD_UINT32, "P", int(params["parallelism"])),
+                (_VD_BYTES, "S", secrets.token_bytes(32)),
+                (_VD_UINT32, "V", 19),
+            ]
+        dynamic_header.kdf_parameters.data.dict = _variant_dictionary(items)
+
+    # The raw header bytes take precedence when building; drop them so the header
+    # is serialized again from the edited values.
+    header.pop("data", None)
@@ -1,19 +1,39 @@
+import io
+import copy
+import hmac
 import secrets
 import base64
 import logging
+import threading
 from pathlib import Path
-from typing import Optional
-from pykeepass import PyKeePass, create_database
+from typing import Any, Callable, Dict, Optional
+from pykeepass import PyKeePass
+from pykeepass.pykeepass import BLANK_DATABASE_LOCATION, BLANK_DATABASE_PASSWORD
 from pykeepass.exceptions import CredentialsError
+from pykeepass.kdbx_parsing.kdbx import KDBX
 
 from app.core.config import settings
+from app.controllers import events
 from app.utils.file import validate_and_prepare_path, get_resolved_path
 from app.controllers.history import update_history
 from app.controllers.kdbx.session import VaultSession
+from app.controllers.kdbx.resume import ResumeSnapshot
+from app.controllers.kdbx.saver import vault_saver
+from app.controllers.kdbx.persistence import write_vault_atomically
+from app.controllers.kdbx.backups import register_vault_digest, execute_backup_rotation
+from app.controllers.kdbx.kdf import (
+    derive_transformed_key, calibrate_kdf, read_kdf_parameters, apply_kdf_parameters
+)
+from app.controllers.jobs import Job, job_registry
 
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 _session = VaultSession()
+_register_lock = threading.Lock()
+vault_saver.mutation_lock = _session.mutation_lock
+
+# Overall progress reported when each open stage starts (the KDF dominates).
+_OPEN_STAGE_PROGRESS = {"read": 0.0, "kdf": 0.05, "decrypt": 0.75, "index": 0.9}
 
 
 def _register_active_vault(path: str, kp_instance: PyKeePass) -> None:
@@ -28,12 +48,15 @@ def _register_active_vault(path: str, kp_instance: PyKeePass) -> None:
     :return: None
     :rtype: None
     """
-    settings.FILE_PATH = path
-    _session.active_path = path
-    _session.transformed_key = kp_instance.transformed_key
-    _session.vault = kp_instance
+    with _register_lock:
+        settings.FILE_PATH = path
+        _session.active_path = path
+        _session.transformed_key = kp_instance.transformed_key
+        _session.vault = kp_instance
+        _session.build_indexes(kp_instance)
     update_history(path)
     logger.debug(f"Session and global settings updated for vault: {path}")
+    events.emit(events.VAULT_OPENED)
 
 
 def create_new_vault(path: str, password: str, keyfile: Optional[str] = None) -> bool:
@@ -55,11 +78,22 @@ def create_new_vault(path: str, password: str, keyfile: Optional[str] = None) ->
 
     try:
         logger.info(f"Initializing new vault creation at: {output_path}")
-        kp = create_database(filename=str(output_path), password=password, keyfile=keyfile)
-        
+        # Same template as pykeepass.create_database, without its intermediate save.
+        kp = PyKeePass(BLANK_DATABASE_LOCATION, BLANK_DATABASE_PASSWORD)
+        kp.filename, kp.password, kp.keyfile = str(output_path), password, keyfile
+
         kp.add_group(kp.root_group, settings.PERSONAL_GROUP_NAME)
 
-        kp.save()
+        if settings.KDF_AUTO_TUNE:
+            try:
+                apply_kdf_parameters(kp, calibrate_kdf())
+            except Exception as e:
+                logger.warning(f"KDF calibration failed, keeping the default parameters: {e}")
+
+        # The cached key still belongs to the template password: derive the key of the
+        # final header once; it serves both the write and the session.
+        kp.kdbx.body.transformed_key = derive_transformed_key(kp.kdbx.header, password, keyfile)
+        register_vault_digest(str(output_path), write_vault_atomically(kp, str(output_path), transformed_key=kp.transformed_key))
         _register_active_vault(str(output_path), kp)
 
         logger.info(f"Vault created and registered successfully: {output_path.name}")
@@ -110,6 +144,57 @@ def generate_keyfile(path: str) -> Optional[str]:
         return None
 
 
+def _derive_transformed_key(data: bytes, password: Optional[str], keyfile: Optional[str]) -> Optional[bytes]:
+    """
+    Run the key derivation alone, from the parsed KDBX header, so it can be
+    reported as its own stage. If the header cannot be parsed on its own,
+    None is returned and PyKeePass derives the key itself.
+    """
+    try:
+        header = KDBX.subcons[0].parse(data)
+    except Exception as e:
+        logger.debug(f"Standalone key derivation unavailable, deferring to pykeepass: {e}")
+        return None
+
+    return derive_transformed_key(header, password, keyfile)
+
+
+def _load_vault(
+    path: Path, password: Optional[str], keyfile: Optional[str],
+    report: Callable[[str, float], None] = lambda stage, progress: None
+) -> PyKeePass:
+    """
+    Read, derive the key of and decrypt a vault file, reporting each stage.
+    Decryption and XML parsing are a single pass inside pykeepass.
+
+    :param path: The resolved .kdbx path.
+    :type path: Path
+    :param password: Master password.
+    :type password: Optional[str]
+    :param keyfile: Path to the keyfile.
+    :type keyfile: Optional[str]
+    :param report: Called with (stage, progress) when a stage starts; may raise to abort.
+    :type report: Callable[[str, float], None]
+    :raises CredentialsError: If the password or keyfile is wrong.
+    :return: The decrypted PyKeePass instance.
+    :rtype: PyKeePass
+    """
+    report("read", _OPEN_STAGE_PROGRESS["read"])
+    data = path.read_bytes()
+
+    report("kdf", _OPEN_STAGE_PROGRESS["kdf"])
+    transformed_key = _derive_transformed_key(data, password, keyfile)
+
+    report("decrypt", _OPEN_STAGE_PROGRESS["decrypt"])
+    if transformed_key is not None:
+        kp = PyKeePass(io.BytesIO(data), transformed_key=transformed_key)
+    else:
+        kp = PyKeePass(io.BytesIO(data), password=password, keyfile=keyfile)
+
+    kp.filename = str(path)
+    return kp
+
+
 def open_vault(path: str, password: Optional[str] = None, keyfile: Optional[str] = None) -> bool:
     """
     Open an existing KDBX vault and initialize the active session.
@@ -131,7 +216,7 @@ def open_vault(path: str, password: Optional[str] = None, keyfile: Optional[str]
 
     try:
         logger.info(f"Opening vault: {resolved_path.name}")
-        kp = PyKeePass(filename=str(resolved_path), password=password, keyfile=keyfile)
+        kp = _load_vault(resolved_path, password, keyfile)
 
         _register_active_vault(str(resolved_path), kp)
         return True
@@ -144,9 +229,114 @@ def open_vault(path: str, password: Optional[str] = None, keyfile: Optional[str]
     return False
 
 
+def open_vault_async(path: str, password: Optional[str] = None, keyfile: Optional[str] = None) -> Optional[Job]:
+    """
+    Open a vault on a background job so the caller (the UI bridge) is not
+    blocked by the key derivation. The job reports the stages read, kdf,
+    decrypt and index, and registers the session only once everything
+    succeeded. Cancellation takes effect at the next stage boundary; a
+    running KDF cannot be interrupted, its result is discarded.
+
+    :param path: Path to the .kdbx file.
+    :type path: str
+    :param password: (Optional) Master password for the database.
+    :type password: Optional[str]
+    :param keyfile: (Optional) Path to the required keyfile.
+    :type keyfile: Optional[str]
+    :return: The started Job (its result is True once the vault is open), or None if the file does not exist.
+    :rtype: Optional[Job]
+    """
+    resolved_path = get_resolved_path(path, suffix='.kdbx')
+
+    if not resolved_path.exists():
+        logger.error(f"Vault file not found at: {resolved_path}")
+        return None
+
+    def run(job: Job) -> bool:
+        logger.info(f"Opening vault in background: {resolved_path.name}")
+        try:
+            kp = _load_vault(resolved_path, password, keyfile, job.set_stage)
+        except CredentialsError:
+            raise ValueError("Invalid credentials (password or keyfile).")
+
+        job.set_stage("index", _OPEN_STAGE_PROGRESS["index"])
+        _register_active_vault(str(resolved_path), kp)
+        return True
+
+    return job_registry.submit("open_vault", run)
+
+
+def retune_vault_kdf(
+    password: Optional[str] = None, keyfile: Optional[str] = None, target_ms: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Recalibrate the key derivation of the active vault for this host and
+    rewrite the vault with the new parameters and a fresh salt. The master
+    credentials are required because the session only keeps the transformed
+    key, which is bound to the old parameters; they are checked against it
+    before anything is changed. The previous file goes through the regular
+    backup rotation first.
+
+    :param password: Master password of the active vault.
+    :type password: Optional[str]
+    :param keyfile: Path to the keyfile of the active vault.
+    :type keyfile: Optional[str]
+    :param target_ms: Desired derivation time; defaults to KDF_TARGET_UNLOCK_MS.
+    :type target_ms: Optional[int]
+    :return: The applied parameters (see calibrate_kdf) plus the previous ones under 'previous', or None on failure.
+    :rtype: Optional[Dict[str, Any]]
+    """
+    vault = get_active_vault()
+    path = _session.active_path
+    if vault is None or not path:
+        logger.error("Cannot re-tune the KDF: no active vault.")
+        return None
+
+    try:
+        current_key = derive_transformed_key(vault.kdbx.header, password, keyfile)
+        if not hmac.compare_digest(current_key, vault.transformed_key):
+            logger.error("KDF re-tune rejected: invalid credentials (password or keyfile).")
+            return None
+
+        previous = read_kdf_parameters(vault)
+        params = calibrate_kdf(target_ms=target_ms)
+
+        vault_saver.flush()
+        with vault_saver.paused():
+            events.emit(events.VAULT_SAVING)
+            if not vault_saver.write_allowed():
+                logger.error("KDF re-tune aborted: the vault file has unmerged external changes.")
+                return None
+            original_header = copy.deepcopy(vault.kdbx.header)
+            try:
+                apply_kdf_parameters(vault, params)
+                new_key = derive_transformed_key(vault.kdbx.header, password, keyfile)
+                # pykeepass saves with the key cached on the parsed body; keep it in step with the header.
+                vault.kdbx.body.transformed_key = new_key
+
+                execute_backup_rotation(path)
+                register_vault_digest(path, write_vault_atomically(vault, path, transformed_key=new_key))
+            except Exception:
+                vault.kdbx.header = original_header
+                vault.kdbx.body.transformed_key = current_key
+                raise
+            _session.transformed_key = new_key
+            events.emit(events.VAULT_SAVED)
+
+        logger.info(f"Vault KDF re-tuned: {previous['algorithm']} x{previous['iterations']} -> {params['algorithm']} x{params['iterations']}")
+        return {**params, "previous": previous}
+
+    except Exception as e:
+        logger.error(f"Failed to re-tune the vault KDF: {e}")
+        return None
+
+
 def get_active_vault() -> Optional[PyKeePass]:
     """
-    Retrieve the active PyKeePass instance or re-open it using the transformed_key.
+    Retrieve the active PyKeePass instance, resuming a suspended session if needed.
+    A suspended vault is restored from its in-memory snapshot when the file is
+    unchanged on disk; otherwise it is re-read with the transformed_key and
+    fully re-indexed.
 
     :return: The active PyKeePass instance if available, None otherwise.
     :rtype: Optional[PyKeePass]
@@ -154,19 +344,94 @@ def get_active_vault() -> Optional[PyKeePass]:
     if _session.vault:
         return _session.vault
 
-    if _session.active_path and _session.transformed_key:
-        try:
-            logger.debug("Re-opening vault using transformed_key...")
-            _session.vault = PyKeePass(
-                filename=_session.active_path, 
-                transformed_key=_session.transformed_key
-            )
+    if not (_session.active_path and _session.transformed_key):
+        return None
+
+    with _register_lock:
+        if _session.vault:
             return _session.vault
+
+        snapshot, _session.resume_snapshot = _session.resume_snapshot, None
+        if snapshot is not None and snapshot.matches_file():
+            try:
+                _session.rebind(snapshot.restore(_session.transformed_key))
+                logger.debug("Vault resumed from the in-memory snapshot.")
+            except Exception as e:
+                logger.warning(f"Resume snapshot unusable, re-reading the vault: {e}")
+
+        if not _session.vault:
+            try:
+                logger.debug("Re-opening vault using transformed_key...")
+                vault = PyKeePass(
+                    filename=_session.active_path, 
+                    transformed_key=_session.transformed_key
+                )
+                _session.build_indexes(vault)
+                _session.vault = vault
+            except Exception as e:
+                logger.error(f"Failed to restore session: {e}")
+                _session.clear()
+                return None
+
+    events.emit(events.VAULT_RESUMED)
+    return _session.vault
+
+
+def is_vault_loaded() -> bool:
+    """
+    Tell whether a vault is open and parsed in memory, without resuming a
+    suspended session. Meant for background work that must not wake the vault.
+
+    :return: True if a vault is loaded, False if none is open or it is suspended.
+    :rtype: bool
+    """
+    return _session.vault is not None
+
+
+def suspend_vault() -> bool:
+    """
+    Release the parsed vault from memory while keeping the session unlocked.
+    Pending changes are written first, then the decrypted payload is moved into
+    an encrypted in-memory snapshot (see ResumeSnapshot). The next
+    get_active_vault() restores it without a KDF, file read or re-index as long
+    as the file was not modified in the meantime.
+
+    :return: True if the vault was suspended, False otherwise.
+    :rtype: bool
+    """
+    # Mutations are held off from the flush to the capture: an edit in between
+    # would leave the saver dirty with an emptied vault.
+    with _session.mutation_lock, _register_lock:
+        vault, path = _session.vault, _session.active_path
+        if vault is None or not path or not _session.transformed_key:
+            return False
+
+        if _session.take_deferred_saves():
+            vault_saver.request_save(vault, path)
+        if not vault_saver.flush():
+            logger.error("Vault not suspended: pending changes could not be saved.")
+            return False
+
+        try:
+            with vault_saver.paused():
+                _session.suspend(ResumeSnapshot.capture(vault, path, _session.transformed_key))
         except Exception as e:
-            logger.error(f"Failed to restore session: {e}")
-            _session.clear()
-    
-    return None
+            logger.error(f"Failed to suspend the vault: {e}")
+            return False
+
+    logger.info("Vault suspended; it will be resumed on next access.")
+    events.emit(events.VAULT_SUSPENDED)
+    return True
+
+
+def get_active_session() -> VaultSession:
+    """
+    Expose the module-level session holding the in-memory vault indexes.
+
+    :return: The active VaultSession instance.
+    :rtype: VaultSession
+    """
+    return _session
 
 
 def close_current_vault() -> None:
@@ -176,6 +441,12 @@ def close_current_vault() -> None:
     :return: None
     :rtype: None
     """
-    _session.clear()
-    settings.FILE_PATH = None
-    logger.info("Current vault session has been closed and purged.")
\ No newline at end of file
+    with _session.mutation_lock:
+        if _session.take_deferred_saves() and _session.vault and _session.active_path:
+            vault_saver.request_save(_session.vault, _session.active_path)
+        vault_saver.flush()
+        vault_saver.discard()
+        _session.clear()
+        settings.FILE_PATH = None
+    logger.info("Current vault session has been closed and purged.")
+    events.emit(events.VAULT_CLOSED)
\ No newline at end of file
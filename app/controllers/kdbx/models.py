@@ -1,11 +1,37 @@
 import json
+from dataclasses import dataclass
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from pykeepass.entry import Entry
 from pykeepass.group import Group
 from datetime import datetime
 
 
+def read_entry_fields(kp_entry: Entry) -> Dict[str, Optional[str]]:
+    """
+    Read every String field of an entry in a single pass over its XML element,
+    instead of one XPath query per field property. KDBX stores each field as
+    <String><Key/><Value/></String>, so the children are read by position.
+
+    :param kp_entry: The pykeepass Entry to read.
+    :type kp_entry: Entry
+    :return: The field values keyed by field name (Title, UserName, custom keys...).
+    :rtype: Dict[str, Optional[str]]
+    """
+    return {s[0].text: s[1].text for s in kp_entry._element.iterfind("String") if len(s) > 1}
+
+
+def _resolve_entry_icon(kp_entry: Entry, custom: Dict[str, str]) -> Optional[int]:
+    """
+    Return the custom icon of an entry, falling back to its native KeePass icon.
+    """
+    custom_icon = custom.get("_icon")
+    try:
+        return int(custom_icon) if custom_icon is not None and str(custom_icon) != "None" else kp_entry.icon
+    except ValueError:
+        return kp_entry.icon
+
+
 class EntryModel(BaseModel):
     """
     Pydantic model representing a KDBX database entry.
@@ -34,12 +60,7 @@ class EntryModel(BaseModel):
         Create an EntryModel instance from a pykeepass Entry object.
         """
         custom = kp_entry.custom_properties
-        custom_icon = custom.get("_icon")
-        
-        try:
-            icon_val = int(custom_icon) if custom_icon is not None and str(custom_icon) != "None" else kp_entry.icon
-        except ValueError:
-            icon_val = kp_entry.icon
+        icon_val = _resolve_entry_icon(kp_entry, custom)
 
         return cls(
             uuid=str(kp_entry.uuid),
@@ -61,6 +82,69 @@ class EntryModel(BaseModel):
         )
 
 
+class EntryRow:
+    """
+    Lightweight, display-only projection of an entry for list views. It holds
+    no secrets (only whether a password / TOTP seed is set) and skips Pydantic
+    validation; the full EntryModel is loaded when an entry is opened.
+    """
+    __slots__ = (
+        "uuid", "title", "username", "url", "group", "color", "icon", "tags",
+        "is_favorite", "has_password", "has_totp", "deleted_at", "created_at", "updated_at"
+    )
+
+
+    def __init__(self, kp_entry: Entry):
+        """
+        :param kp_entry: The pykeepass Entry to project.
+        :type kp_entry: Entry
+        """
+        fields = read_entry_fields(kp_entry)
+        parent = kp_entry._element.getparent()
+
+        self.uuid: str = str(kp_entry.uuid)
+        self.title: str = fields.get("Title") or "Untitled"
+        self.username: Optional[str] = fields.get("UserName")
+        self.url: Optional[str] = fields.get("URL")
+        self.group: str = parent.findtext("Name") if parent is not None and parent.tag == "Group" else "Personal"
+        self.color: Optional[str] = fields.get("color")
+        self.icon: Optional[int] = _resolve_entry_icon(kp_entry, fields)
+        self.tags: List[str] = kp_entry.tags or []
+        self.is_favorite: bool = fields.get("is_favorite") == "True"
+        self.has_password: bool = bool(fields.get("Password"))
+        self.has_totp: bool = bool(fields.get("otp"))
+        self.deleted_at: Optional[str] = fields.get("deleted_at")
+        self.created_at: Optional[datetime] = kp_entry.ctime
+        self.updated_at: Optional[datetime] = kp_entry.mtime
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the row for the frontend. 'password' and 'totp_seed' only
+        tell whether the secret is set, matching the list view contract.
+
+        :return: A JSON-serializable dictionary.
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "uuid": self.uuid,
+            "title": self.title,
+            "username": self.username,
+            "url": self.url,
+            "group": self.group,
+            "color": self.color,
+            "icon": self.icon,
+            "tags": self.tags,
+            "is_favorite": self.is_favorite,
+            "password": self.has_password,
+            "totp_seed": self.has_totp,
+            "auto_fill_config": None,
+            "deleted_at": self.deleted_at,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
 class GroupModel(BaseModel):
     """
     Data model for KDBX groups.
@@ -104,4 +188,19 @@ class GroupModel(BaseModel):
             color=metadata.get("color") if metadata.get("color") != "None" else None,
             created_at=kp_group.ctime,
             updated_at=kp_group.mtime
-        )
\ No newline at end of file
+        )
+
+
+@dataclass(frozen=True)
+class VaultSnapshot:
+    """
+    Immutable, materialized view of every vault entry at a given revision.
+    Shared by all background audits so the vault is converted to models once per change.
+
+    :ivar revision: The session revision the snapshot was built from.
+    :vartype revision: int
+    :ivar entries: All entries of the vault, sorted by title.
+    :vartype entries: Tuple[EntryModel, ...]
+    """
+    revision: int
+    entries: Tuple[EntryModel, ...]
\ No newline at end of file
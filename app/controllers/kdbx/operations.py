@@ -1,39 +1,121 @@
 import json
 import uuid
 import logging
+import functools
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional, Literal
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Literal, Tuple, TypeVar
 from pykeepass.group import Group
+from pykeepass.entry import Entry
 from pykeepass import PyKeePass
 
 from app.core.config import settings
-from app.controllers.kdbx.manager import get_active_vault
-from app.controllers.kdbx.models import EntryModel, GroupModel
-from app.controllers.kdbx.backups import execute_backup_rotation
+from app.controllers import events
+from app.controllers.kdbx.manager import get_active_vault, get_active_session
+from app.controllers.kdbx.models import EntryModel, EntryRow, GroupModel
+from app.controllers.kdbx.saver import vault_saver
+from app.controllers.kdbx.query import compile_query
 
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 
+_EntryT = TypeVar("_EntryT", EntryModel, EntryRow)
+_MutatorT = TypeVar("_MutatorT", bound=Callable)
+
+# Upper bound of a single page returned by list_entry_rows_page.
+ENTRY_PAGE_MAX_SIZE = 500
+
 
 def _save_vault_safely(vault: PyKeePass) -> None:
     """
-    Helper utility to perform automated backup rotation before persisting changes.
+    Helper utility to schedule a backup rotation and save of the vault.
+    The write runs in the background saver; inside a vault_batch() block
+    it is deferred until the batch commits.
 
     :param vault: The active PyKeePass instance to be saved.
     :type vault: PyKeePass
     :return: None
     :rtype: None
     """
-    if settings.FILE_PATH:
-        execute_backup_rotation(settings.FILE_PATH)
-    vault.save()
+    events.emit(events.VAULT_MUTATED)
+    if get_active_session().defer_save():
+        return
+    vault_saver.request_save(vault, settings.FILE_PATH)
+
+
+def _mutator(func: _MutatorT) -> _MutatorT:
+    """
+    Run a vault mutation under the session mutation lock, so the saver never
+    serializes the tree half-way through a change.
+
+    :param func: The mutation function.
+    :type func: Callable
+    :return: The wrapped function.
+    :rtype: Callable
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with get_active_session().mutation_lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def vault_batch() -> Iterator[None]:
+    """
+    Group several mutations so a single save is scheduled when the outermost
+    batch exits. Batches can be nested safely.
+
+    :return: A context manager that commits the pending save on exit.
+    :rtype: Iterator[None]
+    """
+    session = get_active_session()
+    session.begin_batch()
+    try:
+        yield
+    finally:
+        if session.end_batch():
+            vault = get_active_vault()
+            if vault:
+                vault_saver.request_save(vault, settings.FILE_PATH)
+                logger.debug("Vault batch committed.")
+
+
+def _find_entry(entry_uuid: str) -> Optional[Entry]:
+    """
+    Resolve an entry through the session UUID index instead of an XPath query.
+
+    :param entry_uuid: The unique identifier of the entry.
+    :type entry_uuid: str
+    :return: The pykeepass Entry instance if found, None otherwise.
+    :rtype: Optional[Entry]
+    """
+    return get_active_session().get_entry(entry_uuid)
+
+
+def _create_root_group(vault: PyKeePass, name: str, notes: Optional[str] = None) -> Group:
+    """
+    Create a group under the vault root and register it in the session group index.
+
+    :param vault: The active PyKeePass instance.
+    :type vault: PyKeePass
+    :param name: The name of the new group.
+    :type name: str
+    :param notes: Optional JSON metadata stored in the group notes.
+    :type notes: Optional[str]
+    :return: The newly created pykeepass Group instance.
+    :rtype: Group
+    """
+    group = vault.add_group(vault.root_group, name, notes=notes)
+    get_active_session().track_group(group)
+    return group
 
 
 def sort_entries(
-    entries: List[EntryModel], sort_by: Literal["title", "created_at", "updated_at"] = "title", reverse: bool = False
-) -> List[EntryModel]:
+    entries: List[_EntryT], sort_by: Literal["title", "created_at", "updated_at"] = "title", reverse: bool = False
+) -> List[_EntryT]:
     """
-    Sort a list of EntryModel objects based on a specific attribute.
+    Sort a list of EntryModel (or EntryRow) objects based on a specific attribute.
 
     :param entries: The list of entries to sort.
     :type entries: List[EntryModel]
@@ -111,13 +193,17 @@ def list_groups() -> List[GroupModel]:
     if not vault:
         return []
 
-    logger.debug("Fetching flat group list (JSON parsed)...")
-    groups = [
-        GroupModel.from_pykeepass(g) 
-        for g in vault.groups 
-        if g.name != "Root"
-    ]
-    return sort_groups(groups)
+    session = get_active_session()
+    if session.group_models is None:
+        logger.debug("Fetching flat group list (JSON parsed)...")
+        groups = [
+            GroupModel.from_pykeepass(g) 
+            for g in vault.groups 
+            if g.name != "Root"
+        ]
+        session.group_models = sort_groups(groups)
+
+    return list(session.group_models)
 
 
 def list_entries_by_group(group_name: str) -> List[EntryModel]:
@@ -134,7 +220,7 @@ def list_entries_by_group(group_name: str) -> List[EntryModel]:
         logger.warning(f"Attempted to list entries for group '{group_name}' but no vault is active.")
         return []
 
-    group = vault.find_groups(name=group_name, first=True)
+    group = get_group(group_name)
     if not group:
         logger.error(f"Group lookup failed: Group '{group_name}' not found in the vault.")
         return []
@@ -144,6 +230,105 @@ def list_entries_by_group(group_name: str) -> List[EntryModel]:
     return sort_entries(entries)
 
 
+def list_entry_rows_by_group(group_name: str) -> List[EntryRow]:
+    """
+    List the entries of a group as lightweight rows for the list views.
+    Secrets are not copied; use get_entry_model() when an entry is opened.
+
+    :param group_name: The name of the group to filter entries by.
+    :type group_name: str
+    :return: A sorted list of rows for the entries of the group.
+    :rtype: List[EntryRow]
+    """
+    vault = get_active_vault()
+    if not vault:
+        logger.warning(f"Attempted to list entries for group '{group_name}' but no vault is active.")
+        return []
+
+    group = get_group(group_name)
+    if not group:
+        logger.error(f"Group lookup failed: Group '{group_name}' not found in the vault.")
+        return []
+
+    return sort_entries([EntryRow(e) for e in group.entries])
+
+
+def list_all_entry_rows() -> List[EntryRow]:
+    """
+    List every entry of the vault as lightweight rows.
+
+    :return: A sorted list of rows for all database entries.
+    :rtype: List[EntryRow]
+    """
+    if not get_active_vault():
+        return []
+    return sort_entries([EntryRow(e) for e in list(get_active_session().entries_by_uuid.values())])
+
+
+def list_entry_rows_page(
+    group_name: Optional[str] = None, query: Optional[str] = None, offset: int = 0, limit: int = 100,
+    sort_by: Literal["title", "created_at", "updated_at", "relevance"] = "title", reverse: bool = False
+) -> Tuple[List[EntryRow], int]:
+    """
+    Return one window of a sorted entry listing plus the total number of rows.
+    The sorted listing is memoized on the session, so fetching further pages
+    only slices it until the vault changes.
+
+    :param group_name: Restrict the listing to a group. None lists the whole vault.
+    :type group_name: Optional[str]
+    :param query: Optional search string (same matching as find_entries).
+    :type query: Optional[str]
+    :param offset: Index of the first row of the page.
+    :type offset: int
+    :param limit: Maximum number of rows (capped to ENTRY_PAGE_MAX_SIZE).
+    :type limit: int
+    :param sort_by: The field to sort by ('title', 'created_at', 'updated_at'), or
+                    'relevance' to keep the search ranking of a query.
+    :type sort_by: str
+    :param reverse: If True, sorts in descending order.
+    :type reverse: bool
+    :return: A tuple of (rows of the page, total row count).
+    :rtype: Tuple[List[EntryRow], int]
+    """
+    if not get_active_vault():
+        return [], 0
+
+    query = query or None
+
+    def build() -> List[EntryRow]:
+        if query:
+            rows = find_entry_rows(query=query, group_name=group_name)
+            if sort_by == "relevance":
+                return rows[::-1] if reverse else rows
+        elif group_name:
+            rows = list_entry_rows_by_group(group_name)
+        else:
+            rows = list_all_entry_rows()
+        return sort_entries(rows, sort_by="title" if sort_by == "relevance" else sort_by, reverse=reverse)
+
+    view = get_active_session().get_row_view((group_name, query, sort_by, reverse), build)
+
+    offset = max(0, int(offset))
+    limit = max(1, min(int(limit), ENTRY_PAGE_MAX_SIZE))
+    return view[offset:offset + limit], len(view)
+
+
+def get_entry_model(entry_uuid: str) -> Optional[EntryModel]:
+    """
+    Load the full model of a single entry, secrets included.
+
+    :param entry_uuid: The unique identifier of the entry.
+    :type entry_uuid: str
+    :return: The EntryModel if the entry exists, None otherwise.
+    :rtype: Optional[EntryModel]
+    """
+    if not get_active_vault():
+        return None
+
+    entry = _find_entry(entry_uuid)
+    return EntryModel.from_pykeepass(entry) if entry else None
+
+
 def list_recycle_bin_entries() -> List[EntryModel]:
     """
     Retrieve all entries currently residing in the Recycle Bin group.
@@ -154,18 +339,25 @@ def list_recycle_bin_entries() -> List[EntryModel]:
     return list_entries_by_group(settings.RECYCLE_BIN_GROUP_NAME)
 
 
-def find_entries(query: Optional[str] = None, group_name: Optional[str] = None, tags: Optional[List[str]] = None) -> List[EntryModel]:
+def _resolve_entries(entry_uuids: List[str], target_group: Optional[Group], tags: Optional[List[str]]) -> List[Entry]:
     """
-    Search for entries within the vault using flexible filtering criteria.
+    Map matching UUIDs to entries, keeping those inside the group subtree and
+    carrying every required tag.
+    """
+    entries_by_uuid = get_active_session().entries_by_uuid
+    entries = [entries_by_uuid[u] for u in entry_uuids if u in entries_by_uuid]
+    if target_group is not None:
+        entries = [e for e in entries if target_group._element in e._element.iterancestors("Group")]
+    if tags:
+        required = set(tags)
+        entries = [e for e in entries if required.issubset(e.tags or [])]
+    return entries
 
-    :param query: Search string to match against title, username, URL, or notes.
-    :type query: Optional[str]
-    :param group_name: Optional name of the group to restrict the search.
-    :type group_name: Optional[str]
-    :param tags: Optional list of tags that entries must include.
-    :type tags: Optional[List[str]]
-    :return: A list of EntryModel instances matching the criteria.
-    :rtype: List[EntryModel]
+
+def _search_entries(query: Optional[str], group_name: Optional[str], tags: Optional[List[str]]) -> List[Entry]:
+    """
+    Resolve the native pykeepass entries matching the search criteria. Queries
+    are compiled by compile_query and run against the session indexes.
     """
     vault = get_active_vault()
     if not vault:
@@ -173,9 +365,10 @@ def find_entries(query: Optional[str] = None, group_name: Optional[str] = None,
         return []
 
     search_params = {}
-    
+    target_group = None
+
     if group_name:
-        target_group = vault.find_groups(name=group_name, first=True)
+        target_group = get_group(group_name)
         if not target_group:
             logger.error(f"Search aborted: Group '{group_name}' does not exist.")
             return []
@@ -184,20 +377,116 @@ def find_entries(query: Optional[str] = None, group_name: Optional[str] = None,
     if tags:
         search_params['tags'] = tags
 
-    entries = vault.find_entries(**search_params)
-
     if query:
-        q = query.lower()
-        entries = [
-            e for e in entries 
-            if (e.title and q in e.title.lower()) or 
-               (e.username and q in e.username.lower()) or 
-               (e.url and q in e.url.lower()) or 
-               (e.notes and q in e.notes.lower())
-        ]
+        entries = _resolve_entries(compile_query(query).execute(get_active_session()), target_group, tags)
+        logger.debug(f"Query search completed: {len(entries)} entries found.")
+        return entries
 
+    entries = vault.find_entries(**search_params)
     logger.debug(f"Search completed: {len(entries)} entries found.")
-    return [EntryModel.from_pykeepass(e) for e in entries]
+    return entries
+
+
+def find_entries(query: Optional[str] = None, group_name: Optional[str] = None, tags: Optional[List[str]] = None) -> List[EntryModel]:
+    """
+    Search for entries within the vault using flexible filtering criteria.
+
+    :param query: Search query: words matched against title, username, URL host, notes and tags,
+                  plus the filters and operators documented in compile_query.
+    :type query: Optional[str]
+    :param group_name: Optional name of the group to restrict the search.
+    :type group_name: Optional[str]
+    :param tags: Optional list of tags that entries must include.
+    :type tags: Optional[List[str]]
+    :return: A list of EntryModel instances matching the criteria, most relevant first.
+    :rtype: List[EntryModel]
+    """
+    return [EntryModel.from_pykeepass(e) for e in _search_entries(query, group_name, tags)]
+
+
+def find_entry_rows(query: Optional[str] = None, group_name: Optional[str] = None, tags: Optional[List[str]] = None) -> List[EntryRow]:
+    """
+    Same search as find_entries, projected to secret-free list rows.
+
+    :param query: Search query: words matched against title, username, URL host, notes and tags,
+                  plus the filters and operators documented in compile_query.
+    :type query: Optional[str]
+    :param group_name: Optional name of the group to restrict the search.
+    :type group_name: Optional[str]
+    :param tags: Optional list of tags that entries must include.
+    :type tags: Optional[List[str]]
+    :return: A list of EntryRow instances matching the criteria, most relevant first.
+    :rtype: List[EntryRow]
+    """
+    return [EntryRow(e) for e in _search_entries(query, group_name, tags)]
+
+
+def search_entry_rows_incremental(
+    search_id: str, sequence: int, query: Optional[str], group_name: Optional[str] = None, limit: int = 100
+) -> Optional[Tuple[List[EntryRow], int]]:
+    """
+    Search-as-you-type variant of find_entry_rows. The search box keeps the
+    candidates of its previous query, so extending the query only narrows
+    them, and a request superseded by a newer keystroke (higher sequence)
+    stops early instead of sending its results.
+
+    :param search_id: Identifies the search box issuing the requests.
+    :type search_id: str
+    :param sequence: Increasing number of the keystroke within the search box.
+    :type sequence: int
+    :param query: The current search text.
+    :type query: Optional[str]
+    :param group_name: Optional name of the group to restrict the search.
+    :type group_name: Optional[str]
+    :param limit: Maximum number of rows returned (capped to ENTRY_PAGE_MAX_SIZE).
+    :type limit: int
+    :return: A tuple of (most relevant rows, total match count), or None if the request went stale.
+    :rtype: Optional[Tuple[List[EntryRow], int]]
+    """
+    if not get_active_vault():
+        return [], 0
+
+    session = get_active_session()
+    search = session.get_search_session(search_id)
+    if not search.begin(sequence):
+        return None
+
+    target_group = get_group(group_name) if group_name else None
+    if group_name and not target_group:
+        logger.error(f"Search aborted: Group '{group_name}' does not exist.")
+        return [], 0
+
+    plan = compile_query(query)
+    if plan.is_plain_text:
+        ranked = search.search(sequence, query, session.revision)
+        if ranked is None:
+            return None
+        entry_uuids = [entry_uuid for entry_uuid, _ in ranked]
+    else:
+        # Filters and operators are not refined incrementally, only cancelled.
+        entry_uuids = plan.execute(session, lambda: search.is_stale(sequence))
+        if search.is_stale(sequence):
+            return None
+
+    entries = _resolve_entries(entry_uuids, target_group, None)
+
+    limit = max(1, min(int(limit), ENTRY_PAGE_MAX_SIZE))
+    rows = [EntryRow(e) for e in entries[:limit]]
+    if search.is_stale(sequence):
+        return None
+    return rows, len(entries)
+
+
+def close_search_session(search_id: str) -> None:
+    """
+    Cancel the pending request of a search box and release its cached candidates.
+
+    :param search_id: Identifies the search box.
+    :type search_id: str
+    :return: None
+    :rtype: None
+    """
+    get_active_session().close_search_session(search_id)
 
 
 def get_group(name: str) -> Optional[Group]:
@@ -213,9 +502,10 @@ def get_group(name: str) -> Optional[Group]:
     if not vault:
         return None
     
-    return vault.find_groups(name=name, first=True)
+    return get_active_session().get_group(name)
 
 
+@_mutator
 def create_group(group_data: GroupModel) -> bool:
     """
     Create a new group in the root of the vault. 
@@ -235,7 +525,7 @@ def create_group(group_data: GroupModel) -> bool:
             "icon": group_data.icon,
             "color": group_data.color
         })
-        vault.add_group(vault.root_group, group_data.name, notes=notes_json)
+        _create_root_group(vault, group_data.name, notes=notes_json)
         _save_vault_safely(vault=vault)
         return True
     except Exception as e:
@@ -243,6 +533,7 @@ def create_group(group_data: GroupModel) -> bool:
         return False
 
 
+@_mutator
 def update_group(group_name: str, data: GroupModel) -> bool:
     """
     Update the properties of an existing group.
@@ -266,6 +557,10 @@ def update_group(group_name: str, data: GroupModel) -> bool:
             "icon": data.icon,
             "color": data.color
         })
+        group.touch(modify=True)
+        session = get_active_session()
+        session.reindex_groups(vault)
+        session.mark_changed(str(group.uuid))
         _save_vault_safely(vault=vault)
         return True
     except Exception as e:
@@ -273,6 +568,7 @@ def update_group(group_name: str, data: GroupModel) -> bool:
         return False
 
 
+@_mutator
 def delete_group(group_name: str, force_delete_entries: bool = False, move_entries_to: Optional[str] = settings.PERSONAL_GROUP_NAME) -> bool:
     """
     Delete a group with safety checks for contained entries.
@@ -291,30 +587,62 @@ def delete_group(group_name: str, force_delete_entries: bool = False, move_entri
 
     entries_count = len(group.entries)
 
-    if entries_count > 0:
-        if move_entries_to:
+    if entries_count > 0 and not move_entries_to and not force_delete_entries:
+        logger.warning(f"Group '{group_name}' is not empty. Use force or move entries.")
+        return False
+
+    with vault_batch():
+        if entries_count > 0 and move_entries_to:
             target_group = get_group(move_entries_to)
             if not target_group:
-                target_group = vault.add_group(vault.root_group, move_entries_to)
+                target_group = _create_root_group(vault, move_entries_to)
             
             logger.info(f"Moving {entries_count} entries to '{move_entries_to}' before deletion.")
+            session = get_active_session()
             for entry in group.entries:
                 vault.move_entry(entry, target_group)
-        
-        elif not force_delete_entries:
-            logger.warning(f"Group '{group_name}' is not empty. Use force or move entries.")
+                session.track_entry(entry)
+
+        try:
+            session = get_active_session()
+            for entry in group.entries:
+                session.untrack_entry(str(entry.uuid))
+
+            vault.delete_group(group)
+            session.reindex_groups(vault)
+            session.mark_changed(str(group.uuid))
+            _save_vault_safely(vault=vault)
+            logger.info(f"Group '{group_name}' deleted successfully.")
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting group: {e}")
             return False
 
-    try:
-        vault.delete_group(group)
-        _save_vault_safely(vault=vault)
-        logger.info(f"Group '{group_name}' deleted successfully.")
-        return True
-    except Exception as e:
-        logger.error(f"Error deleting group: {e}")
-        return False
 
+def _apply_custom_fields(new_entry: Entry, entry: EntryModel) -> None:
+    """
+    Copy the Project Key attributes of a model onto a freshly created entry.
 
+    :param new_entry: The new pykeepass Entry instance.
+    :type new_entry: Entry
+    :param entry: The source data model.
+    :type entry: EntryModel
+    :return: None
+    :rtype: None
+    """
+    if entry.color:
+        new_entry.set_custom_property("color", entry.color)
+
+    if entry.icon is not None:
+        new_entry.set_custom_property("_icon", str(entry.icon))
+
+    new_entry.set_custom_property("is_favorite", str(entry.is_favorite))
+
+    if entry.totp_seed:
+        new_entry.otp = entry.totp_seed
+
+
+@_mutator
 def add_entry(entry: EntryModel) -> bool:
     """
     Register a new entry in the vault with automatic group resolution.
@@ -334,7 +662,7 @@ def add_entry(entry: EntryModel) -> bool:
     
     if not target_group:
         logger.info(f"Creating missing group: {group_name}")
-        target_group = vault.add_group(vault.root_group, group_name)
+        target_group = _create_root_group(vault, group_name)
 
     try:
         safe_tags = [str(t) for t in entry.tags if t] if isinstance(entry.tags, list) else []
@@ -349,17 +677,8 @@ def add_entry(entry: EntryModel) -> bool:
             tags=safe_tags
         )
         
-        if entry.color:
-            new_entry.set_custom_property("color", entry.color)
-
-        if entry.icon is not None:
-            new_entry.set_custom_property("_icon", str(entry.icon))
-
-        new_entry.set_custom_property("is_favorite", str(entry.is_favorite))
-        
-        if entry.totp_seed:
-            new_entry.otp = entry.totp_seed
-            
+        _apply_custom_fields(new_entry, entry)
+        get_active_session().track_entry(new_entry)
         _save_vault_safely(vault=vault)
         logger.info(f"Entry '{entry.title}' successfully added to group '{group_name}'.")
         return True
@@ -369,6 +688,65 @@ def add_entry(entry: EntryModel) -> bool:
         return False
 
 
+@_mutator
+def add_entries(entries: Iterable[EntryModel]) -> int:
+    """
+    Bulk-insert entries into the vault with a single save. Unlike add_entry,
+    no per-entry lookup for an identical title in the target group is made
+    (that scan makes row-by-row inserts quadratic); callers handle duplicates.
+    The UUID of each inserted entry is written back to its model.
+
+    :param entries: The data models to insert.
+    :type entries: Iterable[EntryModel]
+    :return: The number of entries added.
+    :rtype: int
+    """
+    vault = get_active_vault()
+    if not vault:
+        logger.warning("Attempted to add entries but no vault session is active.")
+        return 0
+
+    session = get_active_session()
+    groups: Dict[str, Group] = {}
+    added = 0
+
+    with vault_batch():
+        for entry in entries:
+            group_name = entry.group if entry.group and entry.group != "Root" else settings.PERSONAL_GROUP_NAME
+            target_group = groups.get(group_name)
+            if target_group is None:
+                target_group = get_group(group_name)
+                if not target_group:
+                    logger.info(f"Creating missing group: {group_name}")
+                    target_group = _create_root_group(vault, group_name)
+                groups[group_name] = target_group
+
+            try:
+                new_entry = Entry(
+                    entry.title or "Untitled",
+                    entry.username or "",
+                    entry.password or "",
+                    url=entry.url or "",
+                    notes=entry.notes or "",
+                    tags=[str(t) for t in entry.tags if t] if isinstance(entry.tags, list) else [],
+                    kp=vault
+                )
+                _apply_custom_fields(new_entry, entry)
+                target_group.append(new_entry)
+                session.track_entry(new_entry)
+                entry.uuid = str(new_entry.uuid)
+                added += 1
+            except Exception as e:
+                logger.error(f"Failed to add entry '{entry.title}': {e}")
+
+        if added:
+            _save_vault_safely(vault=vault)
+
+    logger.info(f"{added} entries added in bulk.")
+    return added
+
+
+@_mutator
 def update_entry(entry_uuid: str, data: EntryModel) -> bool:
     """
     Update an existing database entry identified by its UUID.
@@ -394,7 +772,7 @@ def update_entry(entry_uuid: str, data: EntryModel) -> bool:
         logger.error(f"Invalid UUID format: {entry_uuid}")
         return False
 
-    entry = vault.find_entries(uuid=parsed_uuid, first=True)
+    entry = _find_entry(str(parsed_uuid))
     if not entry:
         logger.error(f"Update failed: Entry with UUID {entry_uuid} not found.")
         return False
@@ -426,11 +804,13 @@ def update_entry(entry_uuid: str, data: EntryModel) -> bool:
                 entry.delete_custom_property("color")
 
         entry.set_custom_property("is_favorite", str(data.is_favorite))
+        get_active_session().track_entry(entry)
         
-        if data.group and data.group != entry.group.name:
-            move_entry(entry_uuid, data.group)
-            
-        _save_vault_safely(vault=vault)
+        with vault_batch():
+            if data.group and data.group != entry.group.name:
+                move_entry(entry_uuid, data.group)
+                
+            _save_vault_safely(vault=vault)
         logger.info(f"Entry '{data.title}' (UUID: {entry_uuid}) updated successfully.")
         return True
 
@@ -439,6 +819,147 @@ def update_entry(entry_uuid: str, data: EntryModel) -> bool:
         return False
 
 
+@_mutator
+def update_entry_fields(entry_uuid: str, data: EntryModel) -> bool:
+    """
+    Overwrite the standard fields (title, username, password, URL, notes) of an
+    entry, keeping the previous version in its history. Group, tags and the
+    Project Key attributes are left untouched.
+
+    :param entry_uuid: The unique identifier of the entry.
+    :type entry_uuid: str
+    :param data: The model holding the new field values.
+    :type data: EntryModel
+    :return: True if the entry was updated, False otherwise.
+    :rtype: bool
+    """
+    vault = get_active_vault()
+    if not vault:
+        return False
+
+    entry = _find_entry(entry_uuid)
+    if not entry:
+        logger.error(f"Field update failed: Entry with UUID {entry_uuid} not found.")
+        return False
+
+    try:
+        entry.save_history()
+        entry.title = data.title or "Untitled"
+        entry.username = data.username or ""
+        entry.password = data.password or ""
+        entry.url = data.url or ""
+        entry.notes = data.notes or ""
+
+        get_active_session().track_entry(entry)
+        _save_vault_safely(vault=vault)
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to update fields of entry {entry_uuid}: {e}")
+        return False
+
+
+@_mutator
+def update_entry_tags(
+    entry_uuid: str,
+    add: Optional[List[str]] = None,
+    remove: Optional[List[str]] = None,
+    internal: bool = False
+) -> bool:
+    """
+    Add or remove tags on an existing entry without rewriting its other fields.
+    Used by the background audits, which work on snapshots that may be stale.
+
+    :param entry_uuid: The unique identifier of the entry to tag.
+    :type entry_uuid: str
+    :param add: Tags that must be present after the update.
+    :type add: Optional[List[str]]
+    :param remove: Tags that must be absent after the update.
+    :type remove: Optional[List[str]]
+    :param internal: True for audit writes, which keep the entry modification time
+                     and are not recorded as local edits.
+    :type internal: bool
+    :return: True if the entry exists (changed or not), False otherwise.
+    :rtype: bool
+    """
+    vault = get_active_vault()
+    if not vault:
+        return False
+
+    entry = _find_entry(entry_uuid)
+    if not entry:
+        logger.error(f"Tag update failed: Entry with UUID {entry_uuid} not found.")
+        return False
+
+    try:
+        current_tags = list(entry.tags or [])
+        new_tags = [t for t in current_tags if t not in (remove or [])]
+        new_tags += [t for t in (add or []) if t not in new_tags]
+
+        if new_tags == current_tags:
+            return True
+
+        entry.tags = new_tags
+        get_active_session().track_entry(entry, local=not internal)
+        _save_vault_safely(vault=vault)
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to update tags of entry {entry_uuid}: {e}")
+        return False
+
+
+@_mutator
+def update_entry_properties(entry_uuid: str, properties: Dict[str, Optional[str]], internal: bool = False) -> bool:
+    """
+    Set or remove internal custom properties of an entry (e.g. audit state)
+    without rewriting its other fields. A None value removes the property.
+
+    :param entry_uuid: The unique identifier of the entry.
+    :type entry_uuid: str
+    :param properties: Property names mapped to their new value, or None to delete them.
+    :type properties: Dict[str, Optional[str]]
+    :param internal: True for audit state: the properties are written in place without
+                     touching the entry, bumping the revision or scheduling a save;
+                     they are persisted with the next save of the vault.
+    :type internal: bool
+    :return: True if the entry exists (changed or not), False otherwise.
+    :rtype: bool
+    """
+    vault = get_active_vault()
+    if not vault:
+        return False
+
+    entry = _find_entry(entry_uuid)
+    if not entry:
+        logger.error(f"Property update failed: Entry with UUID {entry_uuid} not found.")
+        return False
+
+    try:
+        current = entry.custom_properties
+        changed = False
+
+        for key, value in properties.items():
+            if value is None and key in current:
+                entry.delete_custom_property(key)
+                changed = True
+            elif value is not None and current.get(key) != value:
+                entry.set_custom_property(key, value)
+                changed = True
+
+        if not changed or internal:
+            return True
+
+        get_active_session().track_entry(entry)
+        _save_vault_safely(vault=vault)
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to update properties of entry {entry_uuid}: {e}")
+        return False
+
+
+@_mutator
 def delete_entry(entry_uuid: str, permanent: bool = False) -> bool:
     """
     Remove an entry from the vault, either logically or permanently.
@@ -456,7 +977,7 @@ def delete_entry(entry_uuid: str, permanent: bool = False) -> bool:
     if not vault:
         return False
 
-    entry = vault.find_entries(uuid=entry_uuid, first=True)
+    entry = _find_entry(entry_uuid)
     if not entry:
         logger.warning(f"Delete aborted: No entry found with UUID {entry_uuid}.")
         return False
@@ -464,14 +985,18 @@ def delete_entry(entry_uuid: str, permanent: bool = False) -> bool:
     try:
         if permanent:
             vault.delete_entry(entry)
+            get_active_session().untrack_entry(str(entry.uuid))
             logger.info(f"Entry {entry_uuid} permanently deleted.")
+            _save_vault_safely(vault=vault)
         else:
             timestamp = datetime.now().isoformat()
             entry.set_custom_property("deleted_at", timestamp)
-            move_entry(entry_uuid, settings.RECYCLE_BIN_GROUP_NAME)
+            get_active_session().track_entry(entry)
+            with vault_batch():
+                move_entry(entry_uuid, settings.RECYCLE_BIN_GROUP_NAME)
+                _save_vault_safely(vault=vault)
             logger.info(f"Entry {entry_uuid} moved to Recycle Bin.") 
 
-        _save_vault_safely(vault=vault)
         return True
 
     except Exception as e:
@@ -479,6 +1004,7 @@ def delete_entry(entry_uuid: str, permanent: bool = False) -> bool:
         return False
 
 
+@_mutator
 def move_entry(entry_uuid: str, target_group_name: str) -> bool:
     """
     Relocate an entry to a different group within the vault.
@@ -494,15 +1020,16 @@ def move_entry(entry_uuid: str, target_group_name: str) -> bool:
     if not vault:
         return False
 
-    entry = vault.find_entries(uuid=entry_uuid, first=True)
+    entry = _find_entry(entry_uuid)
     if not entry:
         logger.error(f"Move failed: Entry {entry_uuid} not found.")
         return False
         
-    target_group = get_group(target_group_name) or vault.add_group(vault.root_group, target_group_name)
+    target_group = get_group(target_group_name) or _create_root_group(vault, target_group_name)
 
     try:
         vault.move_entry(entry, target_group)
+        get_active_session().track_entry(entry)
         _save_vault_safely(vault=vault)
         logger.debug(f"Entry {entry_uuid} moved to group '{target_group_name}'.")
         return True
@@ -0,0 +1,104 @@
+import io
+import os
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Optional
+from pykeepass import PyKeePass
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """
+    Flush a directory entry to disk so a completed rename survives a crash.
+    Silently skipped on platforms that cannot open directories (Windows).
+
+    :param directory: The directory containing the replaced file.
+    :type directory: Path
+    :return: None
+    :rtype: None
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def serialize_vault(vault: PyKeePass, transformed_key: Optional[bytes] = None) -> bytes:
+    """
+    Encrypt the vault into an in-memory KDBX payload.
+
+    :param vault: The PyKeePass instance to serialize.
+    :type vault: PyKeePass
+    :param transformed_key: (Optional) Precomputed transformed key that skips the KDF.
+    :type transformed_key: Optional[bytes]
+    :return: The encrypted .kdbx file content.
+    :rtype: bytes
+    """
+    buffer = io.BytesIO()
+    vault.save(filename=buffer, transformed_key=transformed_key)
+    return buffer.getvalue()
+
+
+def write_vault_data(data: bytes, path: str) -> str:
+    """
+    Write a serialized vault into a temporary sibling file, fsync it and atomically
+    replace the target with os.replace. The previous file is never modified in place,
+    so a crash leaves either the old or the new vault intact.
+
+    :param data: The encrypted .kdbx content (see serialize_vault).
+    :type data: bytes
+    :param path: The destination .kdbx path.
+    :type path: str
+    :return: The SHA-256 hexadecimal digest of the written file.
+    :rtype: str
+    """
+    target = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+
+        os.replace(tmp_name, target)
+
+    except Exception:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    _fsync_directory(target.parent)
+    logger.debug(f"Vault written atomically to: {target.name}")
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_vault_atomically(vault: PyKeePass, path: str, transformed_key: Optional[bytes] = None) -> str:
+    """
+    Serialize the vault and atomically replace the target file (see write_vault_data).
+
+    :param vault: The PyKeePass instance to persist.
+    :type vault: PyKeePass
+    :param path: The destination .kdbx path.
+    :type path: str
+    :param transformed_key: (Optional) Precomputed transformed key that skips the KDF.
+    :type transformed_key: Optional[bytes]
+    :return: The SHA-256 hexadecimal digest of the written file.
+    :rtype: str
+    """
+    return write_vault_data(serialize_vault(vault, transformed_key=transformed_key), path)
@@ -0,0 +1,567 @@
+import re
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from pykeepass.entry import Entry
+
+from app.core.config import settings
+from app.controllers.kdbx.search import EntryFacets, query_terms
+from app.controllers.kdbx.session import VaultSession
+from app.controllers.kdbx.strength import WEAK_SCORE_THRESHOLD
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+# Relative cost of evaluating a predicate on one entry. Plans run the cheapest
+# filters first, so expensive ones only see the entries that survived them.
+_COST_INDEX = 0      # set membership / index lookup
+_COST_FACETS = 1     # indexed, lowercased field values
+_COST_GROUP = 2      # walk of the XML ancestors
+_COST_TIMES = 3      # pykeepass time properties (XPath + date parsing)
+
+_TEXT_FACETS = {
+    "title": ("title",),
+    "user": ("username",),
+    "username": ("username",),
+    "url": ("url",),
+    "notes": ("notes",),
+}
+_ANY_TEXT_FACETS = ("title", "username", "url", "notes")
+
+_HAS_FACETS = {
+    "totp": "has_totp",
+    "otp": "has_totp",
+    "password": "has_password",
+    "url": "url",
+    "username": "username",
+    "user": "username",
+    "notes": "notes",
+    "tags": "tags",
+}
+
+_AGE_RE = re.compile(r"^([<>])(\d+)([hdwmy])$")
+_DATE_RE = re.compile(r"^([<>])(\d{4}-\d{2}-\d{2})$")
+_AGE_UNITS = {"h": 1 / 24, "d": 1, "w": 7, "m": 30, "y": 365}
+
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+class _EntryView:
+    """
+    An entry being evaluated, with its indexed facets.
+    """
+    __slots__ = ("uuid", "entry", "facets")
+
+
+    def __init__(self, entry_uuid: str, entry: Entry, facets: Optional[EntryFacets]):
+        self.uuid = entry_uuid
+        self.entry = entry
+        self.facets = facets if facets is not None else EntryFacets.from_entry(entry)
+
+
+class _Node(ABC):
+    """
+    Base predicate of a query plan.
+
+    :cvar cost: Relative cost of test(), used to order the plan.
+    :cvar exact: Whether candidates() is exactly the set of matches, so test() can be skipped.
+    """
+    cost: int = _COST_INDEX
+    exact: bool = False
+
+
+    def candidates(self, session: VaultSession) -> Optional[Set[str]]:
+        """
+        Return the UUIDs that can possibly match, resolved from an index, or
+        None if the predicate cannot narrow the search up front.
+        """
+        return None
+
+
+    @abstractmethod
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        """
+        Evaluate the predicate on one entry.
+
+        :param view: The entry and its indexed facets.
+        :type view: _EntryView
+        :param session: The active vault session.
+        :type session: VaultSession
+        :return: True if the entry matches.
+        :rtype: bool
+        """
+
+
+class _Text(_Node):
+    """
+    Free-text terms resolved through the inverted index, optionally verified
+    as an exact phrase.
+    """
+
+
+    def __init__(self, terms: List[str], phrase: Optional[str] = None):
+        self.terms = terms
+        self.phrase = phrase.lower() if phrase else None
+        self.cost = _COST_FACETS if self.phrase else _COST_INDEX
+        self.exact = self.phrase is None
+        self.scores: Optional[Dict[str, float]] = None
+
+
+    def candidates(self, session: VaultSession) -> Optional[Set[str]]:
+        if self.scores is None:
+            self.scores = dict(session.search.rank(self.terms)[0])
+        return set(self.scores)
+
+
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        if self.scores is None:
+            self.candidates(session)
+        if view.uuid not in self.scores:
+            return False
+        if self.phrase:
+            return any(self.phrase in getattr(view.facets, f) for f in _ANY_TEXT_FACETS)
+        return True
+
+
+class _Substring(_Node):
+    """
+    Case-insensitive substring match on entry fields.
+    """
+    cost = _COST_FACETS
+
+
+    def __init__(self, needle: str, facets: Tuple[str, ...] = _ANY_TEXT_FACETS):
+        self.needle = needle.lower()
+        self.facets = facets
+
+
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        return any(self.needle in getattr(view.facets, f) for f in self.facets)
+
+
+class _Group(_Node):
+    """
+    Entry located in a group (or one of its subgroups) of the given name.
+    """
+    cost = _COST_GROUP
+
+
+    def __init__(self, name: str):
+        self.name = name.lower()
+
+
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        for group in view.entry._element.iterancestors("Group"):
+            if (group.findtext("Name") or "").lower() == self.name:
+                return True
+        return False
+
+
+class _Tag(_Node):
+    """
+    Entry carrying a tag (case-insensitive, exact).
+    """
+    cost = _COST_FACETS
+
+
+    def __init__(self, tag: str):
+        self.tag = tag.lower()
+
+
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        return self.tag in view.facets.tags
+
+
+class _Flag(_Node):
+    """
+    Boolean state backed by a field value or a session index.
+    """
+
+
+    def __init__(self, check: Callable[[_EntryView, VaultSession], bool], cost: int):
+        self.check = check
+        self.cost = cost
+
+
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        return self.check(view, session)
+
+
+class _Time(_Node):
+    """
+    Comparison of the creation or modification time against a bound.
+    """
+    cost = _COST_TIMES
+
+
+    def __init__(self, attribute: str, after: bool, bound: datetime):
+        self.attribute = attribute
+        self.after = after
+        self.bound = bound
+
+
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        value = getattr(view.entry, self.attribute)
+        if value is None:
+            return False
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value > self.bound if self.after else value < self.bound
+
+
+class _Not(_Node):
+
+
+    def __init__(self, child: _Node):
+        self.child = child
+        self.cost = child.cost
+
+
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        return not self.child.test(view, session)
+
+
+class _And(_Node):
+
+
+    def __init__(self, children: List[_Node]):
+        self.children = sorted(children, key=lambda c: c.cost)
+        self.cost = sum(c.cost for c in children)
+        self.exact = all(c.exact for c in children)
+
+
+    def candidates(self, session: VaultSession) -> Optional[Set[str]]:
+        sets = [s for s in (c.candidates(session) for c in self.children) if s is not None]
+        if not sets:
+            return None
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        return all(c.test(view, session) for c in self.children)
+
+
+class _Or(_Node):
+
+
+    def __init__(self, children: List[_Node]):
+        self.children = sorted(children, key=lambda c: c.cost)
+        self.cost = sum(c.cost for c in children)
+        self.exact = all(c.exact for c in children)
+
+
+    def candidates(self, session: VaultSession) -> Optional[Set[str]]:
+        sets = [c.candidates(session) for c in self.children]
+        if any(s is None for s in sets):
+            return None
+        return set().union(*sets)
+
+
+    def test(self, view: _EntryView, session: VaultSession) -> bool:
+        return any(c.test(view, session) for c in self.children)
+
+
+def _is_weak(session: VaultSession, entry_uuid: str) -> bool:
+    score = session.strength.get_score(entry_uuid)
+    return score is not None and score < WEAK_SCORE_THRESHOLD
+
+
+_IS_FLAGS: Dict[str, Tuple[Callable[[_EntryView, VaultSession], bool], int]] = {
+    "weak": (lambda v, s: _is_weak(s, v.uuid), _COST_INDEX),
+    "duplicate": (lambda v, s: s.duplicates.is_duplicate(v.uuid), _COST_INDEX),
+    "favorite": (lambda v, s: v.facets.is_favorite, _COST_FACETS),
+    "deleted": (lambda v, s: v.facets.is_deleted, _COST_FACETS),
+    "pwned": (lambda v, s: settings.PWNED_TAG.lower() in v.facets.tags, _COST_FACETS),
+}
+
+
+def _lex(query: str) -> List[Tuple[str, str]]:
+    """
+    Split a query into ("op", "(" / ")" / "AND" / "OR" / "NOT") and
+    ("term", raw) tokens. Quoted values keep their spaces; a leading '-'
+    negates the following term or group.
+    """
+    tokens: List[Tuple[str, str]] = []
+    i, length = 0, len(query)
+
+    while i < length:
+        char = query[i]
+        if char.isspace():
+            i += 1
+        elif char in "()":
+            tokens.append(("op", char))
+            i += 1
+        elif char == "-" and i + 1 < length and not query[i + 1].isspace():
+            tokens.append(("op", "NOT"))
+            i += 1
+        else:
+            start, quoted = i, False
+            while i < length and (quoted or not (query[i].isspace() or query[i] in "()")):
+                if query[i] == '"':
+                    quoted = not quoted
+                i += 1
+            word = query[start:i]
+            tokens.append(("op", word) if word in _OPERATORS else ("term", word))
+
+    return tokens
+
+
+def _parse_age(value: str) -> Optional[Tuple[bool, datetime]]:
+    """
+    Parse '<30d' (newer than 30 days), '>1y' (older than a year),
+    '>2024-01-01' (after) or '<2024-01-01' (before) into (after, bound).
+    """
+    match = _AGE_RE.match(value)
+    if match:
+        sign, amount, unit = match.groups()
+        bound = datetime.now(timezone.utc) - timedelta(days=int(amount) * _AGE_UNITS[unit])
+        return sign == "<", bound
+
+    match = _DATE_RE.match(value)
+    if match:
+        sign, day = match.groups()
+        try:
+            bound = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        return sign == ">", bound
+
+    return None
+
+
+def _text_node(word: str) -> _Node:
+    """
+    Compile a free-text word or quoted phrase. Words without any indexable
+    token (e.g. '@') are matched as raw substrings.
+    """
+    phrase = word[1:-1] if len(word) >= 2 and word.startswith('"') and word.endswith('"') else None
+    text = (phrase if phrase is not None else word).strip('"')
+    terms = query_terms(text)
+
+    if not terms:
+        return _Substring(text)
+    return _Text(terms, phrase if phrase and len(terms) > 1 else None)
+
+
+def _term_node(word: str) -> _Node:
+    """
+    Compile a single term, either 'field:value' or free text.
+    """
+    field, sep, value = word.partition(":")
+    field = field.lower()
+    value = value.strip('"')
+
+    if not sep or not value:
+        return _text_node(word)
+
+    if field == "group":
+        return _Group(value)
+    if field == "tag":
+        return _Tag(value)
+    if field in _TEXT_FACETS:
+        return _Substring(value, _TEXT_FACETS[field])
+    if field == "is" and value.lower() in _IS_FLAGS:
+        check, cost = _IS_FLAGS[value.lower()]
+        return _Flag(check, cost)
+    if field == "has" and value.lower() in _HAS_FACETS:
+        facet = _HAS_FACETS[value.lower()]
+        return _Flag(lambda v, s: bool(getattr(v.facets, facet)), _COST_FACETS)
+    if field in ("modified", "created"):
+        parsed = _parse_age(value)
+        if parsed:
+            return _Time("mtime" if field == "modified" else "ctime", *parsed)
+
+    logger.debug(f"Query term '{word}' is not a known filter; matching it as text.")
+    return _text_node(word)
+
+
+class _Parser:
+    """
+    Recursive-descent parser. Precedence: NOT > AND (implicit) > OR. Unbalanced
+    parentheses are tolerated so partially typed queries still run.
+    """
+
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+
+    def parse(self) -> Optional[_Node]:
+        node = self._or()
+        while self._peek() is not None:
+            self.position += 1     # stray ')'
+            rest = self._or()
+            if rest is not None:
+                node = rest if node is None else _And([node, rest])
+        return node
+
+
+    def _or(self) -> Optional[_Node]:
+        children = []
+        while True:
+            node = self._and()
+            if node is not None:
+                children.append(node)
+            if self._peek() != ("op", "OR"):
+                break
+            self.position += 1
+        return (children[0] if len(children) == 1 else _Or(children)) if children else None
+
+
+    def _and(self) -> Optional[_Node]:
+        children = []
+        while True:
+            token = self._peek()
+            if token is None or token in (("op", "OR"), ("op", ")")):
+                break
+            if token == ("op", "AND"):
+                self.position += 1
+                continue
+            node = self._unary()
+            if node is not None:
+                children.append(node)
+        return (children[0] if len(children) == 1 else _And(children)) if children else None
+
+
+    def _unary(self) -> Optional[_Node]:
+        token = self._peek()
+        if token is None:
+            return None
+        if token == ("op", "NOT"):
+            self.position += 1
+            child = self._unary()
+            return _Not(child) if child is not None else None
+
+        self.position += 1
+        if token == ("op", "("):
+            node = self._or()
+            if self._peek() == ("op", ")"):
+                self.position += 1
+            return node
+        return _term_node(token[1])
+
+
+class QueryPlan:
+    """
+    A compiled entry query. Index-backed predicates (free text) first narrow
+    the candidate UUIDs, then the remaining predicates run on those entries
+    only, cheapest first.
+    """
+
+
+    def __init__(self, root: Optional[_Node]):
+        """
+        :param root: The root predicate, or None for an empty query (matches everything).
+        :type root: Optional[_Node]
+        """
+        self.root = root
+        self._ranking = self._text_nodes(root)
+
+
+    @classmethod
+    def _text_nodes(cls, node: Optional[_Node]) -> List[_Text]:
+        """
+        Collect the free-text predicates that contribute to relevance (all but negated ones).
+        """
+        if isinstance(node, _Text):
+            return [node]
+        if isinstance(node, (_And, _Or)):
+            return [t for child in node.children for t in cls._text_nodes(child)]
+        return []
+
+
+    @staticmethod
+    def _conjuncts(node: Optional[_Node]) -> List[_Node]:
+        if node is None:
+            return []
+        return list(node.children) if isinstance(node, _And) else [node]
+
+
+    @property
+    def is_plain_text(self) -> bool:
+        """
+        Whether the query is a plain list of words (no filters or operators),
+        i.e. equivalent to a free-text index search.
+        """
+        conjuncts = self._conjuncts(self.root)
+        return bool(conjuncts) and all(isinstance(c, _Text) and not c.phrase for c in conjuncts)
+
+
+    def execute(self, session: VaultSession, is_cancelled: Optional[Callable[[], bool]] = None) -> List[str]:
+        """
+        Run the plan against the session indexes.
+
+        :param session: The active vault session.
+        :type session: VaultSession
+        :param is_cancelled: Polled periodically; evaluation stops with an empty result once it returns True.
+        :type is_cancelled: Optional[Callable[[], bool]]
+        :return: UUIDs of the matching entries, most relevant first when the query has free-text terms.
+        :rtype: List[str]
+        """
+        # Other threads (audits, imports, merges) add and remove entries while
+        # the plan runs: iterate over a copy of the keys, never the live dict.
+        entries_by_uuid = session.entries_by_uuid
+        if self.root is None:
+            return list(entries_by_uuid)
+
+        candidates = self.root.candidates(session)
+        if candidates is None:
+            pool, checks = list(entries_by_uuid), [self.root]
+        elif self.root.exact:
+            pool, checks = candidates, []
+        elif isinstance(self.root, _And):
+            # Exact index-backed conjuncts are already enforced by the candidate set.
+            pool, checks = candidates, [c for c in self.root.children if not c.exact]
+        else:
+            pool, checks = candidates, [self.root]
+
+        # A single ranked conjunct already yields its hits by relevance: keep that order.
+        presorted = len(self._ranking) == 1 and self._ranking[0] in self._conjuncts(self.root)
+        if presorted and candidates is not None:
+            scores = self._ranking[0].scores or {}
+            pool = scores.keys() if len(candidates) == len(scores) else [u for u in scores if u in candidates]
+
+        facets = session.search.get_facets
+        matches: List[str] = []
+        for count, entry_uuid in enumerate(pool):
+            if is_cancelled and count % 512 == 0 and is_cancelled():
+                return []
+            entry = entries_by_uuid.get(entry_uuid)
+            if entry is None:
+                continue
+            if checks:
+                view = _EntryView(entry_uuid, entry, facets(entry_uuid))
+                if not all(c.test(view, session) for c in checks):
+                    continue
+            matches.append(entry_uuid)
+
+        if self._ranking and not presorted:
+            matches.sort(key=lambda u: sum((t.scores or {}).get(u, 0.0) for t in self._ranking), reverse=True)
+        return matches
+
+
+def compile_query(query: Optional[str]) -> QueryPlan:
+    """
+    Compile a search query into an executable plan.
+
+    Supported syntax: free-text words and "quoted phrases"; field filters
+    group:, tag:, title:, user:, url:, notes:; is:favorite, is:weak,
+    is:duplicate, is:pwned, is:deleted; has:totp, has:url, has:username,
+    has:notes, has:password; modified: / created: with an age ('<30d' newer
+    than, '>1y' older than; units h, d, w, m, y) or a date ('>2024-01-01'
+    after, '<2024-01-01' before). Terms are ANDed; OR, NOT (or a leading '-')
+    and parentheses combine them. Unknown filters are matched as text.
+
+    :param query: The query string.
+    :type query: Optional[str]
+    :return: The compiled QueryPlan.
+    :rtype: QueryPlan
+    """
+    return QueryPlan(_Parser(_lex(query or "")).parse())
@@ -0,0 +1,142 @@
+import io
+import os
+import zlib
+import secrets
+import logging
+from typing import List, Optional
+from lxml import etree
+from pykeepass import PyKeePass
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+_HKDF_INFO = b"project-key resume snapshot"
+
+
+def _snapshot_cipher(transformed_key: bytes, salt: bytes) -> AESGCM:
+    """
+    Derive the snapshot cipher from the session transformed key. The snapshot is
+    therefore exactly as hard to read as the vault file the session can already open.
+    """
+    key = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=_HKDF_INFO).derive(transformed_key)
+    return AESGCM(key)
+
+
+def _seal(cipher: AESGCM, data: bytes) -> bytes:
+    nonce = secrets.token_bytes(12)
+    return nonce + cipher.encrypt(nonce, data, None)
+
+
+def _open(cipher: AESGCM, sealed: bytes) -> bytes:
+    return cipher.decrypt(sealed[:12], sealed[12:], None)
+
+
+class ResumeSnapshot:
+    """
+    Compact, encrypted copy of the decrypted payload of a suspended vault.
+
+    Capturing it moves the plaintext XML tree (and the KDBX4 attachments) out of
+    the PyKeePass instance into a compressed AES-GCM blob and keeps the emptied
+    instance as a shell: headers, keys and the inner header stay parsed. Restoring
+    decrypts the blob and re-attaches a fresh tree, which skips the file read, the
+    outer decryption and the protected-value unmasking of a full PyKeePass parse.
+    A snapshot is only valid while the file on disk keeps the mtime and size it
+    had when the snapshot was taken.
+    """
+
+
+    def __init__(self, vault: PyKeePass, path: str, mtime_ns: int, size: int, salt: bytes,
+                 sealed_xml: bytes, sealed_binaries: List[bytes]):
+        """
+        :ivar path: The vault file the snapshot belongs to.
+        :vartype path: str
+        :ivar mtime_ns: Modification time of the file when the snapshot was taken.
+        :vartype mtime_ns: int
+        :ivar size: Size in bytes of the file when the snapshot was taken.
+        :vartype size: int
+        """
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self._vault: Optional[PyKeePass] = vault
+        self._salt = salt
+        self._sealed_xml = sealed_xml
+        self._sealed_binaries = sealed_binaries
+
+
+    @classmethod
+    def capture(cls, vault: PyKeePass, path: str, transformed_key: bytes) -> "ResumeSnapshot":
+        """
+        Seal the payload of a vault and strip it from the instance. The vault
+        must be fully saved: the file stat recorded here is what later proves
+        the snapshot still matches the disk.
+
+        :param vault: The open PyKeePass instance; it is emptied in place.
+        :type vault: PyKeePass
+        :param path: The vault file path.
+        :type path: str
+        :param transformed_key: The session transformed key.
+        :type transformed_key: bytes
+        :return: The snapshot holding the sealed payload and the emptied vault.
+        :rtype: ResumeSnapshot
+        """
+        stat = os.stat(path)
+        salt = secrets.token_bytes(16)
+        cipher = _snapshot_cipher(transformed_key, salt)
+        payload = vault.kdbx.body.payload
+
+        sealed_xml = _seal(cipher, zlib.compress(etree.tostring(payload.xml), 1))
+        binaries = payload.get("inner_header", {}).get("binary", [])
+        sealed_binaries = [_seal(cipher, item.data) for item in binaries]
+
+        payload.xml = None
+        for item in binaries:
+            item.data = b""
+
+        return cls(vault, path, stat.st_mtime_ns, stat.st_size, salt, sealed_xml, sealed_binaries)
+
+
+    def matches_file(self) -> bool:
+        """
+        :return: True if the vault file still has the recorded mtime and size.
+        :rtype: bool
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size
+
+
+    def restore(self, transformed_key: bytes) -> PyKeePass:
+        """
+        Decrypt the payload and re-attach it to the vault shell. A snapshot can
+        be restored only once.
+
+        :param transformed_key: The session transformed key.
+        :type transformed_key: bytes
+        :raises ValueError: If the snapshot was already consumed.
+        :raises cryptography.exceptions.InvalidTag: If the key does not match the snapshot.
+        :return: The restored PyKeePass instance.
+        :rtype: PyKeePass
+        """
+        if self._vault is None:
+            raise ValueError("Resume snapshot already consumed.")
+
+        cipher = _snapshot_cipher(transformed_key, self._salt)
+        xml = zlib.decompress(_open(cipher, self._sealed_xml))
+        binaries = [_open(cipher, sealed) for sealed in self._sealed_binaries]
+
+        payload = self._vault.kdbx.body.payload
+        payload.xml = etree.parse(io.BytesIO(xml), etree.XMLParser(remove_blank_text=True))
+        for item, data in zip(payload.get("inner_header", {}).get("binary", []), binaries):
+            item.data = data
+
+        vault, self._vault = self._vault, None
+        self._sealed_xml, self._sealed_binaries = b"", []
+        return vault
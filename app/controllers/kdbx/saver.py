@@ -0,0 +1,254 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+from pykeepass import PyKeePass
+
+from app.core.config import settings
+from app.controllers import events
+from app.controllers.kdbx.backups import execute_backup_rotation, register_vault_digest
+from app.controllers.kdbx.persistence import serialize_vault, write_vault_data
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+
+class VaultSaver:
+    """
+    Background writer that coalesces save requests and persists the vault
+    once the debounce window (SAVE_DEBOUNCE_INTERVAL) has elapsed without new edits.
+    """
+
+
+    def __init__(self):
+        """
+        Initialize an idle saver. The worker thread is started on the first request.
+
+        :ivar _vault: The PyKeePass instance pending to be written.
+        :vartype _vault: Optional[PyKeePass]
+        :ivar _path: The filesystem path of the pending vault, used for backup rotation.
+        :vartype _path: Optional[str]
+        :ivar _dirty: Whether there are unsaved changes.
+        :vartype _dirty: bool
+        :ivar _last_request: Monotonic timestamp of the latest save request.
+        :vartype _last_request: float
+        :ivar mutation_lock: Lock held by every change to the vault tree, taken while
+                             the vault is serialized. The manager shares the session
+                             lock here; it is always acquired before the write lock.
+        :vartype mutation_lock: threading.RLock
+        """
+        self._vault: Optional[PyKeePass] = None
+        self._path: Optional[str] = None
+        self._dirty: bool = False
+        self._stopped: bool = False
+        self._last_request: float = 0.0
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self.mutation_lock = threading.RLock()
+        self._write_guards: List[Callable[[], bool]] = []
+        self._thread: Optional[threading.Thread] = None
+
+
+    def request_save(self, vault: PyKeePass, path: Optional[str]) -> None:
+        """
+        Mark the vault as dirty and schedule a background save.
+
+        :param vault: The PyKeePass instance to persist.
+        :type vault: PyKeePass
+        :param path: The filesystem path of the vault, used for backup rotation.
+        :type path: Optional[str]
+        :return: None
+        :rtype: None
+        """
+        if self._vault is not None and self._vault is not vault:
+            self.flush()
+
+        with self._condition:
+            self._vault = vault
+            self._path = path
+            self._dirty = True
+            self._last_request = time.monotonic()
+            self._condition.notify_all()
+
+        if settings.SAVE_DEBOUNCE_INTERVAL <= 0:
+            self.flush()
+            return
+
+        self._ensure_worker()
+
+
+    def flush(self) -> bool:
+        """
+        Synchronously write any pending changes to disk. VAULT_SAVING is emitted
+        before the vault is serialized (listeners may still update it) and
+        VAULT_SAVED once the file is written. Mutations are held off only while
+        the vault is serialized, not during the backup rotation and file write.
+        A write guard can hold the save back; the changes then stay pending.
+
+        :return: True if nothing was pending or the save succeeded, False otherwise.
+        :rtype: bool
+        """
+        self.mutation_lock.acquire()
+        self._write_lock.acquire()
+        try:
+            try:
+                with self._condition:
+                    if not self._dirty or self._vault is None:
+                        return True
+                    vault, path = self._vault, self._path
+                    self._dirty = False
+
+                if path:
+                    events.emit(events.VAULT_SAVING)
+                    if not self.write_allowed():
+                        with self._condition:
+                            self._dirty = True
+                            self._last_request = time.monotonic()
+                        logger.debug("Vault save held back by a write guard.")
+                        return False
+                    data = serialize_vault(vault, transformed_key=vault.transformed_key)
+                else:
+                    vault.save(transformed_key=vault.transformed_key)
+            finally:
+                self.mutation_lock.release()
+
+            if path:
+                execute_backup_rotation(path)
+                register_vault_digest(path, write_vault_data(data, path))
+                events.emit(events.VAULT_SAVED)
+            logger.debug("Pending vault changes written to disk.")
+            return True
+
+        except Exception as e:
+            logger.error(f"Background vault save failed: {e}")
+            with self._condition:
+                self._dirty = True
+                self._last_request = time.monotonic()
+            return False
+
+        finally:
+            self._write_lock.release()
+
+
+    def add_write_guard(self, guard: Callable[[], bool]) -> None:
+        """
+        Register a check run after VAULT_SAVING; a False result holds the write back
+        and keeps the changes pending (e.g. an external change that cannot be merged).
+
+        :param guard: Callable returning True if the vault may be written.
+        :type guard: Callable[[], bool]
+        :return: None
+        :rtype: None
+        """
+        if guard not in self._write_guards:
+            self._write_guards.append(guard)
+
+
+    def remove_write_guard(self, guard: Callable[[], bool]) -> None:
+        """
+        Unregister a write guard.
+
+        :param guard: The callable passed to add_write_guard().
+        :type guard: Callable[[], bool]
+        :return: None
+        :rtype: None
+        """
+        if guard in self._write_guards:
+            self._write_guards.remove(guard)
+
+
+    def write_allowed(self) -> bool:
+        """
+        :return: True if every write guard allows writing the vault file.
+        :rtype: bool
+        """
+        return all(guard() for guard in list(self._write_guards))
+
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """
+        Hold off mutations and background writes while the caller rewrites the
+        vault itself (e.g. a header change that replaces the transformed key).
+
+        :return: A context manager; writes resume when it exits.
+        :rtype: Iterator[None]
+        """
+        with self.mutation_lock, self._write_lock:
+            yield
+
+
+    def discard(self) -> None:
+        """
+        Forget the tracked vault once its session has been closed.
+
+        :return: None
+        :rtype: None
+        """
+        with self._condition:
+            self._vault = None
+            self._path = None
+            self._dirty = False
+
+
+    def shutdown(self) -> bool:
+        """
+        Flush pending changes and stop the worker thread.
+
+        :return: True if the final flush succeeded, False otherwise.
+        :rtype: bool
+        """
+        success = self.flush()
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        return success
+
+
+    def _ensure_worker(self) -> None:
+        """
+        Start the daemon worker thread if it is not running yet.
+
+        :return: None
+        :rtype: None
+        """
+        with self._condition:
+            if self._stopped or (self._thread and self._thread.is_alive()):
+                return
+
+            self._thread = threading.Thread(
+                target=self._run,
+                daemon=True,
+                name="VaultSaver"
+            )
+            self._thread.start()
+            logger.debug("Background vault saver started.")
+
+
+    def _run(self) -> None:
+        """
+        Worker loop: wait for a dirty flag, let the debounce window settle and save.
+
+        :return: None
+        :rtype: None
+        """
+        while True:
+            with self._condition:
+                while not self._dirty and not self._stopped:
+                    self._condition.wait()
+
+                if self._stopped:
+                    return
+
+                while self._dirty and not self._stopped:
+                    remaining = self._last_request + settings.SAVE_DEBOUNCE_INTERVAL - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+            self.flush()
+
+
+# Global saver singleton
+vault_saver = VaultSaver()
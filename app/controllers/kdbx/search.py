@@ -0,0 +1,549 @@
+import re
+import bisect
+import threading
+import urllib.parse
+from collections import Counter
+from operator import itemgetter
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+from pykeepass.entry import Entry
+
+from app.controllers.kdbx.models import read_entry_fields
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Relevance weight of a token by the field it was found in (highest field wins).
+_FIELD_WEIGHTS = {"title": 4.0, "tags": 3.0, "username": 2.0, "url": 2.0, "notes": 1.0}
+
+# Multiplier applied to a field weight by how a query term matched the token.
+_EXACT_MATCH = 1.0
+_PREFIX_MATCH = 0.75
+_INFIX_MATCH = 0.5
+_FUZZY_MATCH = 0.4
+
+_NGRAM_SIZE = 3
+_FUZZY_MIN_LENGTH = 4
+_FUZZY_MIN_SIMILARITY = 0.5
+
+_NO_TOKENS: FrozenSet[str] = frozenset()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split a text into lowercase word tokens.
+
+    :param text: The text to tokenize.
+    :type text: Optional[str]
+    :return: The tokens in order of appearance.
+    :rtype: List[str]
+    """
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _ngrams(token: str) -> Set[str]:
+    """
+    Return the character trigrams of a token (empty for tokens shorter than 3).
+    """
+    return {token[i:i + _NGRAM_SIZE] for i in range(len(token) - _NGRAM_SIZE + 1)}
+
+
+def url_host(url: Optional[str]) -> Optional[str]:
+    """
+    Extract the host of a URL, tolerating values stored without a scheme.
+
+    :param url: The URL value of an entry.
+    :type url: Optional[str]
+    :return: The lowercase host name, or None if it cannot be parsed.
+    :rtype: Optional[str]
+    """
+    if not url:
+        return None
+    try:
+        return urllib.parse.urlsplit(url if "://" in url else f"//{url}").hostname
+    except ValueError:
+        return None
+
+
+def query_terms(text: Optional[str]) -> List[str]:
+    """
+    Normalize free-text search input into index terms. Words holding a URL
+    ('://') are reduced to their host, since only the host of entry URLs is
+    indexed. Every search path goes through here so the same input always
+    matches the same entries.
+
+    :param text: The free-text query or phrase.
+    :type text: Optional[str]
+    :return: The distinct terms in order of appearance.
+    :rtype: List[str]
+    """
+    terms: List[str] = []
+    for word in (text or "").split():
+        word = word.strip('"')
+        if "://" in word:
+            word = url_host(word) or word
+        terms.extend(tokenize(word))
+    return list(dict.fromkeys(terms))
+
+
+class EntryFacets:
+    """
+    Lowercased copy of the filterable values of an entry, kept next to the
+    index so structured queries test plain Python values instead of reading
+    the XML tree of every candidate.
+    """
+    __slots__ = (
+        "title", "username", "url", "notes", "tags",
+        "is_favorite", "is_deleted", "has_password", "has_totp"
+    )
+
+
+    def __init__(self, fields: Dict[str, Optional[str]], tags: Tuple[str, ...]):
+        """
+        :param fields: The String fields of the entry (see read_entry_fields).
+        :type fields: Dict[str, Optional[str]]
+        :param tags: The lowercased tags of the entry.
+        :type tags: Tuple[str, ...]
+        """
+        self.title: str = (fields.get("Title") or "").lower()
+        self.username: str = (fields.get("UserName") or "").lower()
+        self.url: str = (fields.get("URL") or "").lower()
+        self.notes: str = (fields.get("Notes") or "").lower()
+        self.tags: Tuple[str, ...] = tags
+        self.is_favorite: bool = fields.get("is_favorite") == "True"
+        self.is_deleted: bool = bool(fields.get("deleted_at"))
+        self.has_password: bool = bool(fields.get("Password"))
+        self.has_totp: bool = bool(fields.get("otp"))
+
+
+    @classmethod
+    def from_entry(cls, entry: Entry) -> "EntryFacets":
+        """
+        Read the facets of an entry directly from its XML element.
+
+        :param entry: The pykeepass Entry instance.
+        :type entry: Entry
+        :return: The facets of the entry.
+        :rtype: EntryFacets
+        """
+        # Same parsing as Entry.tags, without its XPath query.
+        raw_tags = entry._element.findtext("Tags")
+        tags = tuple(t.lower() for t in raw_tags.replace(",", ";").split(";")) if raw_tags else ()
+        return cls(read_entry_fields(entry), tags)
+
+
+class EntrySearchIndex:
+    """
+    In-memory inverted index over the searchable fields of the vault entries
+    (title, username, URL host, notes and tags). Query terms are resolved
+    against the token vocabulary by exact match, prefix (sorted vocabulary),
+    substring (trigram index) and, when nothing else matches, trigram
+    similarity, so a search only visits the postings of matching tokens.
+    The filterable values of each entry are kept as EntryFacets for the
+    structured query filters. Passwords are never indexed.
+    """
+
+
+    def __init__(self):
+        """
+        :ivar _documents: Indexed tokens of every entry with their field weight.
+        :vartype _documents: Dict[str, Dict[str, float]]
+        :ivar _postings: Entries containing each token, with the token weight.
+        :vartype _postings: Dict[str, Dict[str, float]]
+        :ivar _vocabulary: Sorted list of the indexed tokens, for prefix lookups.
+        :vartype _vocabulary: List[str]
+        :ivar _ngram_tokens: Tokens containing each trigram, for substring and fuzzy lookups.
+        :vartype _ngram_tokens: Dict[str, Set[str]]
+        :ivar _facets: Filterable values of every entry, for structured queries.
+        :vartype _facets: Dict[str, EntryFacets]
+        """
+        self._documents: Dict[str, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocabulary: List[str] = []
+        self._ngram_tokens: Dict[str, Set[str]] = {}
+        self._facets: Dict[str, EntryFacets] = {}
+        self._lock = threading.Lock()
+
+
+    @staticmethod
+    def _extract(entry: Entry) -> Tuple[Dict[str, float], EntryFacets]:
+        """
+        Collect the weighted tokens and the facets of an entry in a single pass over its fields.
+        """
+        facets = EntryFacets.from_entry(entry)
+        sources = (
+            ("notes", tokenize(facets.notes)),
+            ("url", tokenize(url_host(facets.url))),
+            ("username", tokenize(facets.username)),
+            ("tags", [t for tag in facets.tags for t in tokenize(tag)]),
+            ("title", tokenize(facets.title)),
+        )
+
+        # Sources are listed by ascending weight, so the heaviest field of a token wins.
+        tokens: Dict[str, float] = {}
+        for field, field_tokens in sources:
+            weight = _FIELD_WEIGHTS[field]
+            for token in field_tokens:
+                tokens[token] = weight
+        return tokens, facets
+
+
+    def _add_token(self, token: str) -> None:
+        """
+        Register a new vocabulary token. Must be called with the lock held.
+        """
+        bisect.insort(self._vocabulary, token)
+        for gram in _ngrams(token):
+            self._ngram_tokens.setdefault(gram, set()).add(token)
+
+
+    def _drop_token(self, token: str) -> None:
+        """
+        Forget a token no entry contains anymore. Must be called with the lock held.
+        """
+        del self._postings[token]
+        position = bisect.bisect_left(self._vocabulary, token)
+        if position < len(self._vocabulary) and self._vocabulary[position] == token:
+            del self._vocabulary[position]
+        for gram in _ngrams(token):
+            tokens = self._ngram_tokens.get(gram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._ngram_tokens[gram]
+
+
+    def _unindex(self, entry_uuid: str) -> None:
+        """
+        Remove an entry from the postings. Must be called with the lock held.
+        """
+        self._facets.pop(entry_uuid, None)
+        for token in self._documents.pop(entry_uuid, {}):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(entry_uuid, None)
+            if not posting:
+                self._drop_token(token)
+
+
+    def build(self, entries: Iterable[Entry]) -> None:
+        """
+        Index every entry of a freshly opened vault.
+
+        :param entries: The pykeepass entries of the vault.
+        :type entries: Iterable[Entry]
+        :return: None
+        :rtype: None
+        """
+        documents: Dict[str, Dict[str, float]] = {}
+        postings: Dict[str, Dict[str, float]] = {}
+        facets: Dict[str, EntryFacets] = {}
+        for entry in entries:
+            entry_uuid = str(entry.uuid)
+            tokens, facets[entry_uuid] = self._extract(entry)
+            documents[entry_uuid] = tokens
+            for token, weight in tokens.items():
+                postings.setdefault(token, {})[entry_uuid] = weight
+
+        ngram_tokens: Dict[str, Set[str]] = {}
+        for token in postings:
+            for gram in _ngrams(token):
+                ngram_tokens.setdefault(gram, set()).add(token)
+
+        with self._lock:
+            self._documents = documents
+            self._postings = postings
+            self._vocabulary = sorted(postings)
+            self._ngram_tokens = ngram_tokens
+            self._facets = facets
+
+
+    def update(self, entry: Entry) -> None:
+        """
+        Re-index an added or modified entry.
+
+        :param entry: The pykeepass Entry instance.
+        :type entry: Entry
+        :return: None
+        :rtype: None
+        """
+        entry_uuid = str(entry.uuid)
+        tokens, facets = self._extract(entry)
+
+        with self._lock:
+            if self._documents.get(entry_uuid) == tokens:
+                self._facets[entry_uuid] = facets
+                return
+
+            self._unindex(entry_uuid)
+            self._documents[entry_uuid] = tokens
+            self._facets[entry_uuid] = facets
+            for token, weight in tokens.items():
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = {}
+                    self._add_token(token)
+                posting[entry_uuid] = weight
+
+
+    def remove(self, entry_uuid: str) -> None:
+        """
+        Drop a permanently deleted entry from the index.
+
+        :param entry_uuid: The UUID string of the removed entry.
+        :type entry_uuid: str
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._unindex(str(entry_uuid))
+
+
+    def _expand(self, term: str) -> Tuple[Dict[str, float], bool]:
+        """
+        Resolve a query term to the vocabulary tokens it matches, with the
+        match quality of each, and whether the fuzzy fallback was used.
+        Must be called with the lock held.
+        """
+        matches: Dict[str, float] = {}
+        if term in self._postings:
+            matches[term] = _EXACT_MATCH
+
+        vocabulary = self._vocabulary
+        position = bisect.bisect_left(vocabulary, term)
+        while position < len(vocabulary) and vocabulary[position].startswith(term):
+            matches.setdefault(vocabulary[position], _PREFIX_MATCH)
+            position += 1
+
+        grams = _ngrams(term)
+        if grams:
+            candidates = sorted((self._ngram_tokens.get(g, _NO_TOKENS) for g in grams), key=len)
+            for token in candidates[0].intersection(*candidates[1:]):
+                if token not in matches and term in token:
+                    matches[token] = _INFIX_MATCH
+
+        if matches or len(term) < _FUZZY_MIN_LENGTH:
+            return matches, False
+
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._ngram_tokens.get(gram, _NO_TOKENS))
+        for token, count in shared.items():
+            similarity = 2 * count / (len(grams) + len(_ngrams(token)))
+            if similarity >= _FUZZY_MIN_SIMILARITY:
+                matches[token] = _FUZZY_MATCH * similarity
+        return matches, True
+
+
+    def get_facets(self, entry_uuid: str) -> Optional[EntryFacets]:
+        """
+        Return the indexed filterable values of an entry.
+
+        :param entry_uuid: The UUID string of the entry.
+        :type entry_uuid: str
+        :return: The facets, or None if the entry is not indexed.
+        :rtype: Optional[EntryFacets]
+        """
+        return self._facets.get(entry_uuid)
+
+
+    def rank(
+        self, terms: Sequence[str], candidates: Optional[Set[str]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Tuple[List[Tuple[str, float]], bool]:
+        """
+        Rank the entries matching every term. Each term scores an entry by its
+        best matching token (field weight times match quality) and the entry
+        score is the sum over the terms.
+
+        :param terms: The normalized query terms (see tokenize).
+        :type terms: Sequence[str]
+        :param candidates: Restrict scoring to these entry UUIDs, e.g. the
+                           results of a query this one refines.
+        :type candidates: Optional[Set[str]]
+        :param is_cancelled: Polled while scoring; ranking stops early with an
+                             empty result once it returns True.
+        :type is_cancelled: Optional[Callable[[], bool]]
+        :return: (entry UUID, score) pairs by descending relevance, and whether
+                 any term fell back to fuzzy matching.
+        :rtype: Tuple[List[Tuple[str, float]], bool]
+        """
+        if not terms:
+            return [], False
+
+        fuzzy = False
+        term_scores: List[Dict[str, float]] = []
+
+        with self._lock:
+            for term in terms:
+                if is_cancelled and is_cancelled():
+                    return [], fuzzy
+
+                matches, term_fuzzy = self._expand(term)
+                fuzzy = fuzzy or term_fuzzy
+                scores: Dict[str, float] = {}
+
+                for token, quality in matches.items():
+                    posting = self._postings[token]
+                    if candidates is None:
+                        hits = posting.items()
+                    elif len(candidates) < len(posting):
+                        hits = ((u, posting[u]) for u in candidates if u in posting)
+                    else:
+                        hits = ((u, w) for u, w in posting.items() if u in candidates)
+
+                    for entry_uuid, weight in hits:
+                        score = weight * quality
+                        if score > scores.get(entry_uuid, 0.0):
+                            scores[entry_uuid] = score
+
+                if not scores:
+                    return [], fuzzy
+                term_scores.append(scores)
+
+        term_scores.sort(key=len)
+        results = term_scores[0]
+        for scores in term_scores[1:]:
+            results = {u: s + scores[u] for u, s in results.items() if u in scores}
+
+        return sorted(results.items(), key=itemgetter(1), reverse=True), fuzzy
+
+
+    def search(self, query: str) -> Optional[List[Tuple[str, float]]]:
+        """
+        Rank the entries matching every term of a free-text query.
+
+        :param query: The free-text query.
+        :type query: str
+        :return: (entry UUID, score) pairs by descending relevance, or None if
+                 the query holds no indexable term (e.g. punctuation only).
+        :rtype: Optional[List[Tuple[str, float]]]
+        """
+        terms = query_terms(query)
+        if not terms:
+            return None
+        return self.rank(terms)[0]
+
+
+    def clear(self) -> None:
+        """
+        Forget every indexed token.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._documents = {}
+            self._postings = {}
+            self._vocabulary = []
+            self._ngram_tokens = {}
+            self._facets = {}
+
+
+class IncrementalSearch:
+    """
+    Search-as-you-type state of one search box. The candidate set of the last
+    query is kept, so a query that extends it ("git" -> "gith" -> "github")
+    only re-scores those entries. Every request carries the client sequence
+    number of its keystroke; a request superseded by a newer one stops early
+    and its results are dropped.
+    """
+
+
+    def __init__(self, index: EntrySearchIndex):
+        """
+        :param index: The inverted index of the session.
+        :type index: EntrySearchIndex
+        """
+        self._index = index
+        self._latest: int = -1
+        self._terms: Tuple[str, ...] = ()
+        self._candidates: Optional[Set[str]] = None
+        self._revision: Optional[int] = None
+        self._lock = threading.Lock()
+
+
+    def begin(self, sequence: int) -> bool:
+        """
+        Register a new request. Requests older than the latest one seen are refused.
+
+        :param sequence: The client sequence number of the request.
+        :type sequence: int
+        :return: True if the request is the latest one, False if it is already stale.
+        :rtype: bool
+        """
+        with self._lock:
+            if sequence < self._latest:
+                return False
+            self._latest = sequence
+            return True
+
+
+    def is_stale(self, sequence: int) -> bool:
+        """
+        Tell whether a newer request (or a cancel) superseded this one.
+
+        :param sequence: The client sequence number of the request.
+        :type sequence: int
+        :return: True if the request results must be dropped.
+        :rtype: bool
+        """
+        return sequence != self._latest
+
+
+    def cancel(self) -> None:
+        """
+        Supersede the in-flight request and forget the cached candidates.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._latest += 1
+            self._terms, self._candidates, self._revision = (), None, None
+
+
+    @staticmethod
+    def _refines(previous: Tuple[str, ...], terms: Tuple[str, ...]) -> bool:
+        """
+        Tell whether every match of `terms` is also a match of `previous`: each
+        previous term is extended in place and was long enough to be matched
+        as a substring (shorter terms only match word prefixes).
+        """
+        if not previous or len(terms) < len(previous):
+            return False
+        return all(len(old) >= _NGRAM_SIZE and new.startswith(old) for old, new in zip(previous, terms))
+
+
+    def search(self, sequence: int, query: str, revision: int) -> Optional[List[Tuple[str, float]]]:
+        """
+        Rank a query, narrowing the previous candidate set when possible.
+
+        :param sequence: The client sequence number, registered with begin().
+        :type sequence: int
+        :param query: The free-text query.
+        :type query: str
+        :param revision: The current vault revision; candidates of another revision are discarded.
+        :type revision: int
+        :return: (entry UUID, score) pairs by descending relevance, or None if the request went stale.
+        :rtype: Optional[List[Tuple[str, float]]]
+        """
+        terms = tuple(query_terms(query))
+        with self._lock:
+            refinable = self._revision == revision and self._refines(self._terms, terms)
+            candidates = self._candidates if refinable else None
+
+        is_cancelled = lambda: self.is_stale(sequence)
+        ranked, fuzzy = self._index.rank(terms, candidates, is_cancelled)
+
+        # Fuzzy matches are not bound by the previous candidates: redo unrestricted.
+        if fuzzy and candidates is not None:
+            ranked, fuzzy = self._index.rank(terms, None, is_cancelled)
+
+        with self._lock:
+            if sequence != self._latest:
+                return None
+            self._terms = terms
+            self._candidates = None if fuzzy else {entry_uuid for entry_uuid, _ in ranked}
+            self._revision = revision
+        return ranked
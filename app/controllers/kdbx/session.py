@@ -1,12 +1,27 @@
+import uuid
 import logging
-from typing import Optional
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Set
 from pykeepass import PyKeePass
+from pykeepass.entry import Entry
+from pykeepass.group import Group
 
 from app.core.config import settings
+from app.controllers.kdbx.models import EntryRow, GroupModel, VaultSnapshot
+from app.controllers.kdbx.duplicates import PasswordDuplicateIndex
+from app.controllers.kdbx.strength import PasswordStrengthIndex
+from app.controllers.kdbx.search import EntrySearchIndex, IncrementalSearch
+from app.controllers.kdbx.resume import ResumeSnapshot
 
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 
+# Number of sorted row views kept for paginated listings.
+_MAX_ROW_VIEWS = 8
+
+# Number of search-as-you-type states kept (one per open search box).
+_MAX_SEARCH_SESSIONS = 16
+
 
 class VaultSession:
     """
@@ -24,10 +39,406 @@ class VaultSession:
         :vartype transformed_key: Optional[bytes]
         :ivar vault: The active PyKeePass database controller instance.
         :vartype vault: Optional[PyKeePass]
+        :ivar entries_by_uuid: In-memory index of the vault entries keyed by their UUID string.
+        :vartype entries_by_uuid: Dict[str, Entry]
+        :ivar groups_by_name: In-memory index of the vault groups keyed by name (first match wins).
+        :vartype groups_by_name: Dict[str, Group]
+        :ivar group_models: Memoized, sorted GroupModel list served to the sidebar. None when stale.
+        :vartype group_models: Optional[List[GroupModel]]
+        :ivar deferred_saves: Threads whose open batch holds back a requested save.
+                              Batch nesting is tracked per thread, so a mutation
+                              made by another thread is never deferred into it.
+        :vartype deferred_saves: Set[int]
+        :ivar revision: Counter bumped on every indexed mutation. It is never reset,
+                        so a revision uniquely identifies a vault state across sessions.
+        :vartype revision: int
+        :ivar snapshot: Cached entry snapshot shared by the background audits.
+        :vartype snapshot: Optional[VaultSnapshot]
+        :ivar duplicates: Keyed-hash index of reused passwords, maintained on every entry change.
+        :vartype duplicates: PasswordDuplicateIndex
+        :ivar strength: Per-entry strength score cache with running health aggregates.
+        :vartype strength: PasswordStrengthIndex
+        :ivar search: Inverted full-text index of the searchable entry fields.
+        :vartype search: EntrySearchIndex
+        :ivar search_sessions: Search-as-you-type states keyed by the client search id.
+        :vartype search_sessions: Dict[str, IncrementalSearch]
+        :ivar row_views: Sorted EntryRow lists served page by page, valid for one revision.
+        :vartype row_views: Dict[Hashable, List[EntryRow]]
+        :ivar resume_snapshot: Encrypted payload of a suspended vault, restored on the next access.
+        :vartype resume_snapshot: Optional[ResumeSnapshot]
+        :ivar mutation_lock: Reentrant lock held by every change to the vault tree and by
+                             the saver while it serializes it, so a save never captures
+                             a half-applied change.
+        :vartype mutation_lock: threading.RLock
+        :ivar local_changes: Revision of the latest local change of each entry or group UUID,
+                             used to tell local edits from external ones when merging.
+        :vartype local_changes: Dict[str, int]
         """
         self.active_path: Optional[str] = None
         self.transformed_key: Optional[bytes] = None
         self.vault: Optional[PyKeePass] = None
+        self.entries_by_uuid: Dict[str, Entry] = {}
+        self.groups_by_name: Dict[str, Group] = {}
+        self.group_models: Optional[List[GroupModel]] = None
+        self.deferred_saves: Set[int] = set()
+        self._batch_state = threading.local()
+        self.revision: int = 0
+        self.snapshot: Optional[VaultSnapshot] = None
+        self.duplicates = PasswordDuplicateIndex()
+        self.strength = PasswordStrengthIndex()
+        self.search = EntrySearchIndex()
+        self.search_sessions: Dict[str, IncrementalSearch] = {}
+        self._search_sessions_lock = threading.Lock()
+        self.row_views: Dict[Hashable, List[EntryRow]] = {}
+        self._row_views_revision: int = -1
+        self._row_views_lock = threading.Lock()
+        self.resume_snapshot: Optional[ResumeSnapshot] = None
+        self.local_changes: Dict[str, int] = {}
+        self.mutation_lock = threading.RLock()
+        self._batch_lock = threading.Lock()
+        self._revision_lock = threading.Lock()
+
+
+    def _bump_revision(self) -> None:
+        """
+        Advance the vault revision after a change to the indexed state.
+
+        :return: None
+        :rtype: None
+        """
+        with self._revision_lock:
+            self.revision += 1
+
+
+    def _batch_depth(self) -> int:
+        """
+        :return: Nesting level of the mutation batches opened by the calling thread.
+        :rtype: int
+        """
+        return getattr(self._batch_state, "depth", 0)
+
+
+    def begin_batch(self) -> None:
+        """
+        Open a (possibly nested) mutation batch on the calling thread.
+
+        :return: None
+        :rtype: None
+        """
+        self._batch_state.depth = self._batch_depth() + 1
+
+
+    def end_batch(self) -> bool:
+        """
+        Close a mutation batch of the calling thread.
+
+        :return: True if the outermost batch was closed and a save is pending, False otherwise.
+        :rtype: bool
+        """
+        depth = max(0, self._batch_depth() - 1)
+        self._batch_state.depth = depth
+        if depth > 0:
+            return False
+
+        with self._batch_lock:
+            if threading.get_ident() in self.deferred_saves:
+                self.deferred_saves.discard(threading.get_ident())
+                return True
+            return False
+
+
+    def defer_save(self) -> bool:
+        """
+        Record a save request if the calling thread has a batch open so it can
+        be applied on commit.
+
+        :return: True if the save was deferred, False if it must run immediately.
+        :rtype: bool
+        """
+        if self._batch_depth() == 0:
+            return False
+
+        with self._batch_lock:
+            self.deferred_saves.add(threading.get_ident())
+        return True
+
+
+    def take_deferred_saves(self) -> bool:
+        """
+        Drop the saves held back by the open batches of every thread, so the
+        caller can write them before the vault is closed or suspended. The
+        batches still commit normally but no longer schedule a save.
+
+        :return: True if at least one save was pending, False otherwise.
+        :rtype: bool
+        """
+        with self._batch_lock:
+            pending = bool(self.deferred_saves)
+            self.deferred_saves = set()
+        return pending
+
+
+    def build_indexes(self, vault: PyKeePass) -> None:
+        """
+        Walk the vault tree once and populate the in-memory lookup indexes.
+
+        :param vault: The PyKeePass instance to index.
+        :type vault: PyKeePass
+        :return: None
+        :rtype: None
+        """
+        self.entries_by_uuid = {str(e.uuid): e for e in vault.entries}
+        self.duplicates.build(self.entries_by_uuid.values())
+        self.strength.build(self.entries_by_uuid.values())
+        self.search.build(self.entries_by_uuid.values())
+        self.reindex_groups(vault)
+        self._bump_revision()
+        logger.debug(f"Entry index built with {len(self.entries_by_uuid)} entries.")
+
+
+    def suspend(self, snapshot: ResumeSnapshot) -> None:
+        """
+        Release the parsed vault, keeping its encrypted payload for a later resume.
+        The derived indexes, row views and search states hold no passwords and
+        are kept, so a resume from the snapshot does not rebuild them; only the
+        audit snapshot, which carries plaintext passwords, is dropped.
+
+        :param snapshot: The captured payload of the vault being released.
+        :type snapshot: ResumeSnapshot
+        :return: None
+        :rtype: None
+        """
+        self.resume_snapshot = snapshot
+        self.vault = None
+        self.entries_by_uuid = {}
+        self.groups_by_name = {}
+        self.snapshot = None
+
+
+    def rebind(self, vault: PyKeePass) -> None:
+        """
+        Attach a vault restored from the resume snapshot. Its content is the one the
+        indexes were built from, so only the UUID and group lookups, which point
+        into the XML tree, are rebuilt; the revision does not move.
+
+        :param vault: The restored PyKeePass instance.
+        :type vault: PyKeePass
+        :return: None
+        :rtype: None
+        """
+        groups_by_name: Dict[str, Group] = {}
+        for group in vault.groups:
+            groups_by_name.setdefault(group.name, group)
+
+        self.entries_by_uuid = {str(e.uuid): e for e in vault.entries}
+        self.groups_by_name = groups_by_name
+        self.vault = vault
+
+
+    def reindex_groups(self, vault: PyKeePass) -> None:
+        """
+        Rebuild the group name index and drop the memoized GroupModel list.
+
+        :param vault: The PyKeePass instance to index.
+        :type vault: PyKeePass
+        :return: None
+        :rtype: None
+        """
+        groups_by_name: Dict[str, Group] = {}
+        for group in vault.groups:
+            groups_by_name.setdefault(group.name, group)
+
+        self.groups_by_name = groups_by_name
+        self.group_models = None
+        self._bump_revision()
+
+
+    def get_group(self, name: str) -> Optional[Group]:
+        """
+        Resolve a group from the name index without querying the XML tree.
+
+        :param name: The name of the group.
+        :type name: str
+        :return: The pykeepass Group instance if indexed, None otherwise.
+        :rtype: Optional[Group]
+        """
+        return self.groups_by_name.get(name)
+
+
+    def track_group(self, group: Group) -> None:
+        """
+        Register a newly created group and invalidate the memoized GroupModel list.
+
+        :param group: The pykeepass Group instance to index.
+        :type group: Group
+        :return: None
+        :rtype: None
+        """
+        self.groups_by_name.setdefault(group.name, group)
+        self.group_models = None
+        self._bump_revision()
+        self.mark_changed(str(group.uuid))
+
+
+    def mark_changed(self, element_uuid: str) -> None:
+        """
+        Record a local change of an entry or group at the current revision.
+
+        :param element_uuid: The UUID string of the changed entry or group.
+        :type element_uuid: str
+        :return: None
+        :rtype: None
+        """
+        self.local_changes[str(element_uuid)] = self.revision
+
+
+    def changed_since(self, revision: int) -> Set[str]:
+        """
+        :param revision: A past session revision.
+        :type revision: int
+        :return: UUIDs of the entries and groups changed locally after that revision.
+        :rtype: Set[str]
+        """
+        return {key for key, changed in list(self.local_changes.items()) if changed > revision}
+
+
+    def forget_changes(self, revision: int) -> None:
+        """
+        Drop the change records up to a revision once that state is on disk.
+
+        :param revision: The revision that was written.
+        :type revision: int
+        :return: None
+        :rtype: None
+        """
+        self.local_changes = {key: changed for key, changed in list(self.local_changes.items()) if changed > revision}
+
+
+    def get_entry(self, entry_uuid: str) -> Optional[Entry]:
+        """
+        Resolve an entry from the UUID index without querying the XML tree.
+
+        :param entry_uuid: The UUID of the entry, in any format accepted by uuid.UUID.
+        :type entry_uuid: str
+        :return: The pykeepass Entry instance if indexed, None otherwise.
+        :rtype: Optional[Entry]
+        """
+        try:
+            key = str(uuid.UUID(str(entry_uuid)))
+        except (ValueError, AttributeError):
+            return None
+        return self.entries_by_uuid.get(key)
+
+
+    def track_entry(self, entry: Entry, local: bool = True) -> None:
+        """
+        Register a new or modified entry in the session indexes. Local changes
+        also stamp the entry modification time, which merges rely on.
+
+        :param entry: The pykeepass Entry instance to index.
+        :type entry: Entry
+        :param local: False when the change comes from merging an external write or
+                      from an internal write (audit tags) that must neither stamp the
+                      modification time nor count as a local edit.
+        :type local: bool
+        :return: None
+        :rtype: None
+        """
+        key = str(entry.uuid)
+        if local:
+            entry.touch(modify=True)
+        self.entries_by_uuid[key] = entry
+        self.duplicates.update(entry)
+        self.strength.update(entry)
+        self.search.update(entry)
+        self._bump_revision()
+        if local:
+            self.mark_changed(key)
+
+
+    def untrack_entry(self, entry_uuid: str, local: bool = True) -> None:
+        """
+        Remove a permanently deleted entry from the session indexes.
+
+        :param entry_uuid: The UUID string of the removed entry.
+        :type entry_uuid: str
+        :param local: False when the removal comes from merging an external write.
+        :type local: bool
+        :return: None
+        :rtype: None
+        """
+        self.entries_by_uuid.pop(str(entry_uuid), None)
+        self.duplicates.remove(entry_uuid)
+        self.strength.remove(entry_uuid)
+        self.search.remove(entry_uuid)
+        self._bump_revision()
+        if local:
+            self.mark_changed(str(entry_uuid))
+
+
+    def get_row_view(self, key: Hashable, build: Callable[[], List[EntryRow]]) -> List[EntryRow]:
+        """
+        Return a memoized, sorted row list so consecutive pages of the same
+        listing do not rebuild and re-sort it. Views are dropped on any mutation.
+
+        :param key: Identifies the listing (scope, query and sort order).
+        :type key: Hashable
+        :param build: Callable producing the sorted rows on a cache miss.
+        :type build: Callable[[], List[EntryRow]]
+        :return: The sorted rows of the listing.
+        :rtype: List[EntryRow]
+        """
+        with self._row_views_lock:
+            if self._row_views_revision != self.revision:
+                self.row_views = {}
+                self._row_views_revision = self.revision
+            view = self.row_views.get(key)
+
+        if view is not None:
+            return view
+
+        revision = self.revision
+        view = build()
+
+        with self._row_views_lock:
+            if self._row_views_revision == revision == self.revision:
+                if len(self.row_views) >= _MAX_ROW_VIEWS:
+                    self.row_views.pop(next(iter(self.row_views)))
+                self.row_views[key] = view
+        return view
+
+
+    def get_search_session(self, search_id: str) -> IncrementalSearch:
+        """
+        Return the search-as-you-type state of a search box, creating it on first use.
+
+        :param search_id: The client identifier of the search box.
+        :type search_id: str
+        :return: The IncrementalSearch bound to the session index.
+        :rtype: IncrementalSearch
+        """
+        with self._search_sessions_lock:
+            search = self.search_sessions.get(search_id)
+            if search is None:
+                if len(self.search_sessions) >= _MAX_SEARCH_SESSIONS:
+                    self.search_sessions.pop(next(iter(self.search_sessions))).cancel()
+                search = self.search_sessions[search_id] = IncrementalSearch(self.search)
+            return search
+
+
+    def close_search_session(self, search_id: str) -> None:
+        """
+        Cancel the in-flight request of a search box and drop its state.
+
+        :param search_id: The client identifier of the search box.
+        :type search_id: str
+        :return: None
+        :rtype: None
+        """
+        with self._search_sessions_lock:
+            search = self.search_sessions.pop(search_id, None)
+        if search is not None:
+            search.cancel()
 
 
     def clear(self) -> None:
@@ -40,4 +451,21 @@ class VaultSession:
         self.active_path = None
         self.transformed_key = None
         self.vault = None
-        logger.debug("Vault session cleared.")
\ No newline at end of file
+        self.entries_by_uuid = {}
+        self.groups_by_name = {}
+        self.group_models = None
+        self.snapshot = None
+        self.resume_snapshot = None
+        self.local_changes = {}
+        self.duplicates.clear()
+        self.strength.clear()
+        self.search.clear()
+        with self._search_sessions_lock:
+            for search in self.search_sessions.values():
+                search.cancel()
+            self.search_sessions = {}
+        with self._row_views_lock:
+            self.row_views = {}
+        with self._batch_lock:
+            self.deferred_saves = set()
+        logger.debug("Vault session cleared.")
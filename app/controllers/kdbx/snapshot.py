@@ -0,0 +1,40 @@
+import logging
+import threading
+from typing import Optional
+
+from app.core.config import settings
+from app.controllers.kdbx.manager import get_active_vault, get_active_session
+from app.controllers.kdbx.models import EntryModel, VaultSnapshot
+from app.controllers.kdbx.operations import sort_entries
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+_snapshot_lock = threading.Lock()
+
+
+def get_vault_snapshot() -> Optional[VaultSnapshot]:
+    """
+    Return the snapshot of the active vault, rebuilding it only when the
+    session revision moved since the last build.
+
+    Consumers must treat the contained models as read-only and work on
+    copies (model_copy) before changing them.
+
+    :return: The current VaultSnapshot, or None if no vault is active.
+    :rtype: Optional[VaultSnapshot]
+    """
+    vault = get_active_vault()
+    if not vault:
+        return None
+
+    session = get_active_session()
+
+    with _snapshot_lock:
+        revision = session.revision
+        if session.snapshot is not None and session.snapshot.revision == revision:
+            return session.snapshot
+
+        logger.debug(f"Building vault snapshot for revision {revision}...")
+        entries = [EntryModel.from_pykeepass(e) for e in list(session.entries_by_uuid.values())]
+        session.snapshot = VaultSnapshot(revision=revision, entries=tuple(sort_entries(entries)))
+        return session.snapshot
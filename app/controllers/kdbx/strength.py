@@ -0,0 +1,228 @@
+import hmac
+import secrets
+import hashlib
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set, Tuple
+from pykeepass.entry import Entry
+
+from app.core.config import settings
+from app.controllers.passwords import check_password_strength
+
+
+# Entries scoring below this value are considered weak.
+WEAK_SCORE_THRESHOLD = 3
+
+
+class PasswordStrengthIndex:
+    """
+    Per-entry cache of password strength scores keyed on the entry UUID and a
+    keyed fingerprint of its password. Running aggregates (score total, weak
+    count, tag counts) are adjusted on every change, so the health score and
+    the dashboard summary never require a full rescan of the vault.
+    """
+
+
+    def __init__(self):
+        """
+        :ivar _key: Per-index secret used to derive the password fingerprints.
+        :vartype _key: bytes
+        :ivar _records: Cached (fingerprint, score, tags) of every indexed entry.
+        :vartype _records: Dict[str, Tuple[bytes, int, Tuple[str, ...]]]
+        :ivar _total_score: Sum of the scores of every indexed entry.
+        :vartype _total_score: int
+        :ivar _weak_count: Number of entries scoring below WEAK_SCORE_THRESHOLD.
+        :vartype _weak_count: int
+        :ivar _tag_counts: Number of entries carrying each tag.
+        :vartype _tag_counts: Counter
+        :ivar _changed: UUIDs whose weak status may have changed since the last audit.
+        :vartype _changed: Set[str]
+        """
+        self._key: bytes = secrets.token_bytes(32)
+        self._records: Dict[str, Tuple[bytes, int, Tuple[str, ...]]] = {}
+        self._total_score: int = 0
+        self._weak_count: int = 0
+        self._tag_counts: Counter = Counter()
+        self._changed: Set[str] = set()
+        self._lock = threading.Lock()
+
+
+    def _fingerprint(self, password: Optional[str]) -> bytes:
+        """
+        Compute the keyed fingerprint identifying a password in the cache.
+        """
+        return hmac.new(self._key, (password or "").encode("utf-8"), hashlib.sha256).digest()
+
+
+    def _remove_record(self, entry_uuid: str) -> Optional[Tuple[bytes, int, Tuple[str, ...]]]:
+        """
+        Drop an entry and subtract it from the aggregates. Must be called with the lock held.
+        """
+        record = self._records.pop(entry_uuid, None)
+        if record is None:
+            return None
+
+        _, score, tags = record
+        self._total_score -= score
+        self._weak_count -= score < WEAK_SCORE_THRESHOLD
+        self._tag_counts.subtract(tags)
+        return record
+
+
+    def _add_record(self, entry_uuid: str, record: Tuple[bytes, int, Tuple[str, ...]]) -> None:
+        """
+        Store an entry and add it to the aggregates. Must be called with the lock held.
+        """
+        _, score, tags = record
+        self._records[entry_uuid] = record
+        self._total_score += score
+        self._weak_count += score < WEAK_SCORE_THRESHOLD
+        self._tag_counts.update(tags)
+
+
+    def build(self, entries: Iterable[Entry]) -> None:
+        """
+        Score every entry of a freshly opened vault and mark all of them for auditing.
+
+        :param entries: The pykeepass entries of the vault.
+        :type entries: Iterable[Entry]
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._records = {}
+            self._total_score = 0
+            self._weak_count = 0
+            self._tag_counts = Counter()
+
+        for entry in entries:
+            self.update(entry)
+
+
+    def update(self, entry: Entry) -> None:
+        """
+        Refresh the cached record of an added or modified entry. The strength is
+        only recomputed when the password fingerprint changed.
+
+        :param entry: The pykeepass Entry instance.
+        :type entry: Entry
+        :return: None
+        :rtype: None
+        """
+        entry_uuid = str(entry.uuid)
+        password = entry.password
+        fingerprint = self._fingerprint(password)
+        tags = tuple(dict.fromkeys(entry.tags or []))
+
+        with self._lock:
+            previous = self._remove_record(entry_uuid)
+            if previous and previous[0] == fingerprint:
+                score = previous[1]
+            else:
+                score = check_password_strength(password or "")["score"]
+
+            self._add_record(entry_uuid, (fingerprint, score, tags))
+            self._changed.add(entry_uuid)
+
+
+    def remove(self, entry_uuid: str) -> None:
+        """
+        Drop a permanently deleted entry from the cache and the aggregates.
+
+        :param entry_uuid: The UUID string of the removed entry.
+        :type entry_uuid: str
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._remove_record(str(entry_uuid))
+            self._changed.discard(str(entry_uuid))
+
+
+    def get_score(self, entry_uuid: str) -> Optional[int]:
+        """
+        Return the cached strength score of an entry.
+
+        :param entry_uuid: The UUID string of the entry.
+        :type entry_uuid: str
+        :return: The score (0-4), or None if the entry is not indexed.
+        :rtype: Optional[int]
+        """
+        with self._lock:
+            record = self._records.get(str(entry_uuid))
+            return record[1] if record else None
+
+
+    def health_score(self) -> float:
+        """
+        Return the overall security percentage of the vault from the running aggregates.
+
+        :return: A percentage score from 0 to 100.
+        :rtype: float
+        """
+        with self._lock:
+            if not self._records:
+                return 100.0
+            return (self._total_score / (len(self._records) * 4)) * 100
+
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Return the dashboard counters from the running aggregates.
+
+        :return: A dictionary with 'total', 'safe', 'weak', 'duplicate', 'pwned',
+                 'total_strength_score' and 'score'.
+        :rtype: Dict[str, float]
+        """
+        with self._lock:
+            total = len(self._records)
+            return {
+                "total": total,
+                "safe": total - self._weak_count,
+                "weak": self._weak_count,
+                "duplicate": self._tag_counts[settings.DUPLICATE_TAG],
+                "pwned": self._tag_counts[settings.PWNED_TAG],
+                "total_strength_score": self._total_score,
+                "score": (self._total_score / (total * 4)) * 100 if total else 100.0
+            }
+
+
+    def pop_changed(self) -> Set[str]:
+        """
+        Return and reset the UUIDs whose weak status must be re-checked.
+
+        :return: The set of UUID strings to audit.
+        :rtype: Set[str]
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            return changed
+
+
+    def mark_changed(self, entry_uuids: Iterable[str]) -> None:
+        """
+        Queue entries again, e.g. after an audit failed to tag them.
+
+        :param entry_uuids: The UUID strings to re-check on the next audit.
+        :type entry_uuids: Iterable[str]
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._changed.update(entry_uuids)
+
+
+    def clear(self) -> None:
+        """
+        Forget every cached score and rotate the HMAC key.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._key = secrets.token_bytes(32)
+            self._records = {}
+            self._total_score = 0
+            self._weak_count = 0
+            self._tag_counts = Counter()
+            self._changed = set()
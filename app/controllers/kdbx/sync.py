@@ -0,0 +1,526 @@
+import io
+import copy
+import uuid
+import base64
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from lxml import etree
+from pykeepass import PyKeePass
+from pykeepass.entry import Entry
+from pykeepass.exceptions import CredentialsError
+
+from app.core.config import settings
+from app.controllers import events
+from app.controllers.kdbx.manager import get_active_session, is_vault_loaded
+from app.controllers.kdbx.saver import vault_saver
+from app.controllers.kdbx.session import VaultSession
+from app.controllers.kdbx.watcher import VaultFileWatcher, file_stat
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+# Children of a <Group> element that are not the group's own fields.
+_GROUP_CHILDREN = ("Group", "Entry")
+
+
+def _uuid_key(element: etree._Element) -> str:
+    """
+    :return: The UUID of an Entry or Group element in the session key format.
+    :rtype: str
+    """
+    return str(uuid.UUID(bytes=base64.b64decode(element.findtext("UUID"))))
+
+
+def _stamp(element: etree._Element) -> Tuple[str, str]:
+    """
+    :return: The raw modification and location-change times of an element.
+    :rtype: Tuple[str, str]
+    """
+    times = element.find("Times")
+    if times is None:
+        return "", ""
+    return times.findtext("LastModificationTime") or "", times.findtext("LocationChanged") or ""
+
+
+def _index_tree(vault: PyKeePass) -> Tuple[Dict[str, etree._Element], Dict[str, etree._Element]]:
+    """
+    Map the UUIDs of every group and entry (history versions excluded) to their elements.
+
+    :param vault: The PyKeePass instance.
+    :type vault: PyKeePass
+    :return: (groups, entries), both keyed by UUID string.
+    :rtype: Tuple[Dict[str, etree._Element], Dict[str, etree._Element]]
+    """
+    groups: Dict[str, etree._Element] = {}
+    entries: Dict[str, etree._Element] = {}
+    for element in vault.tree.find("Root/Group").iter("Group", "Entry"):
+        if element.tag == "Group":
+            groups[_uuid_key(element)] = element
+        elif element.getparent().tag != "History":
+            entries[_uuid_key(element)] = element
+    return groups, entries
+
+
+class _Merger:
+    """
+    One three-way merge of an external version of the vault into the open one.
+    The base is the set of UUIDs present on disk at the last sync; local changes
+    are the UUIDs edited in this session since then. For each UUID:
+
+    - changed on one side only: that side wins;
+    - changed on both sides: the newest modification time wins and the other
+      version is kept in the entry history;
+    - deleted on one side and unchanged on the other: the deletion wins;
+      a local edit wins over an external deletion.
+    """
+
+
+    def __init__(self, vault: PyKeePass, remote: PyKeePass, base_entries: Set[str], base_groups: Set[str], changed: Set[str]):
+        self.vault = vault
+        self.remote = remote
+        self.base_entries = base_entries
+        self.base_groups = base_groups
+        self.changed = changed
+        self.local_groups, self.local_entries = _index_tree(vault)
+        self.remote_groups, self.remote_entries = _index_tree(remote)
+        self.root = vault.tree.find("Root/Group")
+        self.updated: List[etree._Element] = []
+        self.removed: List[str] = []
+        self.conflicts = 0
+        self.groups_changed = 0
+        self._binary_ids: Optional[Dict[bytes, int]] = None
+
+
+    def _local_parent(self, remote_element: etree._Element) -> etree._Element:
+        """
+        :return: The local group matching the remote parent, or the local root group.
+        :rtype: etree._Element
+        """
+        return self.local_groups.get(_uuid_key(remote_element.getparent()), self.root)
+
+
+    def _import(self, remote_element: etree._Element) -> etree._Element:
+        """
+        Copy a remote entry (with its history) for insertion into the local tree,
+        re-pointing its attachment references into the local binary pool.
+        """
+        element = copy.deepcopy(remote_element)
+        for value in element.iterfind(".//Binary/Value[@Ref]"):
+            data = self.remote.binaries[int(value.get("Ref"))]
+            if self._binary_ids is None:
+                self._binary_ids = {blob: position for position, blob in enumerate(self.vault.binaries)}
+            if data not in self._binary_ids:
+                self._binary_ids[data] = self.vault.add_binary(data)
+            value.set("Ref", str(self._binary_ids[data]))
+        return element
+
+
+    def _keep_in_history(self, winner: etree._Element, loser: etree._Element) -> None:
+        """
+        Append the losing version of a conflicting entry to the winner's history.
+        """
+        version = copy.deepcopy(loser)
+        for history in version.findall("History"):
+            version.remove(history)
+
+        history = winner.find("History")
+        if history is None:
+            history = etree.SubElement(winner, "History")
+        history.append(version)
+
+
+    def _place(self, element: etree._Element, parent: etree._Element, previous: Optional[etree._Element]) -> None:
+        """
+        Put an entry element under its parent group, replacing its previous version.
+        """
+        if previous is not None and previous.getparent() is parent:
+            parent.replace(previous, element)
+            return
+        if previous is not None:
+            previous.getparent().remove(previous)
+        position = next((i for i, child in enumerate(parent) if child.tag == "Group"), len(parent))
+        parent.insert(position, element)
+
+
+    def merge_groups(self) -> None:
+        for key, remote_group in self.remote_groups.items():
+            local_group = self.local_groups.get(key)
+            if local_group is self.root or (local_group is None and key in self.base_groups):
+                continue
+
+            if local_group is None:
+                local_group = etree.Element("Group")
+                self._local_parent(remote_group).append(local_group)
+                self.local_groups[key] = local_group
+            elif key in self.changed or _stamp(local_group) == _stamp(remote_group):
+                continue
+
+            for child in [c for c in local_group if c.tag not in _GROUP_CHILDREN]:
+                local_group.remove(child)
+            fields = [copy.deepcopy(c) for c in remote_group if c.tag not in _GROUP_CHILDREN]
+            for position, child in enumerate(fields):
+                local_group.insert(position, child)
+
+            parent = self._local_parent(remote_group)
+            if local_group.getparent() is not parent and parent is not local_group:
+                parent.append(local_group)
+            self.groups_changed += 1
+
+
+    def merge_entries(self) -> None:
+        for key, remote_entry in self.remote_entries.items():
+            local_entry = self.local_entries.get(key)
+
+            if local_entry is None:
+                if key in self.base_entries:
+                    continue
+            elif _stamp(local_entry) == _stamp(remote_entry):
+                continue
+            elif key in self.changed:
+                self.conflicts += 1
+                local_time = Entry(element=local_entry, kp=self.vault).mtime
+                remote_time = Entry(element=remote_entry, kp=self.remote).mtime
+                if local_time and remote_time and local_time >= remote_time:
+                    self._keep_in_history(local_entry, self._import(remote_entry))
+                    continue
+                imported = self._import(remote_entry)
+                self._keep_in_history(imported, local_entry)
+                self._place(imported, self._local_parent(remote_entry), local_entry)
+                self.updated.append(imported)
+                continue
+
+            imported = self._import(remote_entry)
+            self._place(imported, self._local_parent(remote_entry), local_entry)
+            self.updated.append(imported)
+
+        for key, local_entry in self.local_entries.items():
+            if key in self.remote_entries or key not in self.base_entries or key in self.changed:
+                continue
+            local_entry.getparent().remove(local_entry)
+            self.removed.append(key)
+
+
+    def prune_groups(self) -> None:
+        """
+        Remove the groups deleted externally, unless edited locally or still holding items.
+        """
+        for key, local_group in self.local_groups.items():
+            if key in self.remote_groups or key not in self.base_groups or key in self.changed:
+                continue
+            if local_group is self.root or any(c.tag in _GROUP_CHILDREN for c in local_group):
+                continue
+            local_group.getparent().remove(local_group)
+            self.groups_changed += 1
+
+
+def merge_external_changes(
+    session: VaultSession, remote: PyKeePass, base_entries: Set[str], base_groups: Set[str], synced_revision: int
+) -> Dict[str, Any]:
+    """
+    Merge an external version of the vault into the open session and update
+    only the index records of the entries that changed.
+
+    :param session: The active session holding the open vault.
+    :type session: VaultSession
+    :param remote: The version read from disk.
+    :type remote: PyKeePass
+    :param base_entries: Entry UUIDs on disk at the last sync.
+    :type base_entries: Set[str]
+    :param base_groups: Group UUIDs on disk at the last sync.
+    :type base_groups: Set[str]
+    :param synced_revision: Session revision written to disk at the last sync.
+    :type synced_revision: int
+    :return: Merge report: added/updated, removed, conflicts, groups and whether
+             the merged vault must be saved (it holds local changes).
+    :rtype: Dict[str, Any]
+    """
+    changed = session.changed_since(synced_revision)
+    merger = _Merger(session.vault, remote, base_entries, base_groups, changed)
+    merger.merge_groups()
+    merger.merge_entries()
+    merger.prune_groups()
+
+    for element in merger.updated:
+        session.track_entry(Entry(element=element, kp=session.vault), local=False)
+    for key in merger.removed:
+        session.untrack_entry(key, local=False)
+    if merger.groups_changed:
+        session.reindex_groups(session.vault)
+
+    return {
+        "updated": len(merger.updated),
+        "removed": len(merger.removed),
+        "conflicts": merger.conflicts,
+        "groups": merger.groups_changed,
+        "needs_save": bool(changed),
+        "merged_at": datetime.now().isoformat(),
+    }
+
+
+class VaultSync:
+    """
+    Keep the open vault in step with its file. A watcher reports writes to the
+    file; writes that do not match the last known state (our own saves update it)
+    are merged into the session. The saver also checks the file right before
+    every write, so an external change is merged instead of being overwritten.
+    """
+
+
+    def __init__(self):
+        self._watcher = VaultFileWatcher(self._on_file_changed)
+        self._lock = threading.RLock()
+        self._path: Optional[Path] = None
+        self._known_stat: Optional[Tuple[int, int]] = None
+        self._synced_revision: int = 0
+        self._base_entries: Set[str] = set()
+        self._base_groups: Set[str] = set()
+        self._pending: Optional[Tuple[int, Set[str], Set[str]]] = None
+        self._conflict_stat: Optional[Tuple[int, int]] = None
+        self.last_merge: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+
+    def start(self) -> None:
+        """
+        Subscribe to the vault lifecycle events and watch the vault if one is open.
+
+        :return: None
+        :rtype: None
+        """
+        events.subscribe(self.on_vault_event)
+        vault_saver.add_write_guard(self._write_allowed)
+        if is_vault_loaded():
+            self.on_vault_event(events.VAULT_OPENED)
+
+
+    def stop(self) -> None:
+        """
+        Unsubscribe and stop watching.
+
+        :return: None
+        :rtype: None
+        """
+        events.unsubscribe(self.on_vault_event)
+        vault_saver.remove_write_guard(self._write_allowed)
+        self._watcher.stop()
+
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        :return: Whether the vault file is watched, the watcher backend, whether saves are held
+                 back by an unmerged external change, the last merge report and the last error.
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "watching": self._watcher.is_watching(),
+            "backend": self._watcher.backend,
+            "conflict": self._conflict_stat is not None,
+            "last_merge": self.last_merge,
+            "error": self.last_error,
+        }
+
+
+    def refresh_watch(self) -> None:
+        """
+        Start or stop watching the open vault to follow VAULT_WATCH_ENABLED.
+        Saves keep merging external changes either way.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            path = self._path
+        if settings.VAULT_WATCH_ENABLED and path:
+            if not self._watcher.is_watching():
+                self._watcher.start(str(path))
+        else:
+            self._watcher.stop()
+
+
+    def keep_local_version(self) -> bool:
+        """
+        Resolve an unmerged external change by overwriting the file with the
+        open vault. The external version is kept in the backup rotation.
+
+        :return: True if a conflict was pending and the save was scheduled, False otherwise.
+        :rtype: bool
+        """
+        with self._lock:
+            if self._conflict_stat is None or self._path is None:
+                return False
+            self._known_stat = self._conflict_stat
+            self._conflict_stat = None
+            self.last_error = None
+
+        session = get_active_session()
+        if session.vault is None:
+            return False
+        logger.warning("Overwriting the external version of the vault with the local one.")
+        vault_saver.request_save(session.vault, session.active_path)
+        return True
+
+
+    def _write_allowed(self) -> bool:
+        """
+        Saver write guard: hold saves back while an external change could not be merged.
+        """
+        with self._lock:
+            return self._conflict_stat is None
+
+
+    def on_vault_event(self, event: str) -> None:
+        """
+        React to vault lifecycle and save events.
+
+        :param event: The event name.
+        :type event: str
+        :return: None
+        :rtype: None
+        """
+        if event in (events.VAULT_OPENED, events.VAULT_RESUMED):
+            self._reset()
+            self._watcher.stop()
+            self.refresh_watch()
+        elif event in (events.VAULT_CLOSED, events.VAULT_SUSPENDED):
+            self._watcher.stop()
+            with self._lock:
+                self._path = None
+                self._pending = None
+                self._conflict_stat = None
+        elif event == events.VAULT_SAVING:
+            self._before_save()
+        elif event == events.VAULT_SAVED:
+            self._after_save()
+
+
+    def _capture(self) -> Tuple[int, Set[str], Set[str]]:
+        """
+        :return: The session revision and the entry and group UUIDs it contains.
+        :rtype: Tuple[int, Set[str], Set[str]]
+        """
+        session = get_active_session()
+        groups = {_uuid_key(g) for g in session.vault.tree.find("Root/Group").iter("Group")}
+        return session.revision, set(session.entries_by_uuid), groups
+
+
+    def _reset(self) -> None:
+        """
+        Take the freshly opened vault as the synced base.
+        """
+        session = get_active_session()
+        with self._lock:
+            self._pending = None
+            self._conflict_stat = None
+            self.last_error = None
+            if session.vault is None or not session.active_path:
+                self._path = None
+                return
+            self._path = Path(session.active_path).resolve()
+            self._known_stat = file_stat(self._path)
+            self._synced_revision, self._base_entries, self._base_groups = self._capture()
+
+
+    def _before_save(self) -> None:
+        """
+        Called by the saver, holding the mutation and write locks, right before
+        it serializes the vault: merge a pending external change first, then
+        remember which state is about to be written. If the change cannot be
+        merged, the write guard holds the save back so it is not overwritten.
+        """
+        with self._lock:
+            if self._path is None or not is_vault_loaded():
+                return
+            stat = file_stat(self._path)
+            if stat is None or stat == self._known_stat:
+                # Unchanged, or deleted: nothing external would be overwritten.
+                self._conflict_stat = None
+            elif stat != self._conflict_stat:
+                self._merge()
+            if self._conflict_stat is None:
+                self._pending = self._capture()
+
+
+    def _after_save(self) -> None:
+        """
+        Called by the saver once the write succeeded: that state is now the base.
+        """
+        with self._lock:
+            if self._path is None:
+                return
+            pending, self._pending = self._pending, None
+            if pending is None and is_vault_loaded():
+                pending = self._capture()
+            if pending is not None:
+                self._synced_revision, self._base_entries, self._base_groups = pending
+                get_active_session().forget_changes(self._synced_revision)
+            self._known_stat = file_stat(self._path)
+
+
+    def _on_file_changed(self, path: str) -> None:
+        """
+        Watcher callback: merge the file if it was not written by this session.
+        """
+        if not is_vault_loaded():
+            return
+
+        with vault_saver.paused():
+            with self._lock:
+                if self._path is None:
+                    return
+                stat = file_stat(self._path)
+                if stat is None or stat in (self._known_stat, self._conflict_stat):
+                    return
+                report = self._merge()
+
+        if report and report["needs_save"]:
+            session = get_active_session()
+            if session.vault is not None:
+                vault_saver.request_save(session.vault, session.active_path)
+
+
+    def _merge(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the file with the session key and merge it. Must be called with
+        the mutation and sync locks held and no concurrent saver write. A file
+        that cannot be merged is recorded as a conflict: saves are held back
+        until it changes again or keep_local_version() is called.
+        """
+        session = get_active_session()
+        stat = file_stat(self._path)
+
+        try:
+            remote = PyKeePass(io.BytesIO(self._path.read_bytes()), transformed_key=session.transformed_key)
+        except CredentialsError:
+            self.last_error = "The vault file was rewritten with different credentials or KDF settings; it cannot be merged."
+            logger.error(self.last_error)
+            self._conflict_stat = stat
+            return None
+        except Exception as e:
+            self.last_error = f"The external version of the vault could not be read: {e}"
+            logger.error(self.last_error)
+            self._conflict_stat = stat
+            return None
+
+        report = merge_external_changes(
+            session, remote, self._base_entries, self._base_groups, self._synced_revision
+        )
+        groups, entries = _index_tree(remote)
+        self._base_entries, self._base_groups = set(entries), set(groups)
+        self._known_stat = stat
+        self._conflict_stat = None
+        self.last_merge = report
+        self.last_error = None
+
+        logger.info(
+            f"External change merged: {report['updated']} updated, {report['removed']} removed, "
+            f"{report['conflicts']} conflicts, {report['groups']} groups."
+        )
+        events.emit(events.VAULT_MUTATED)
+        return report
+
+
+# Global sync singleton
+vault_sync = VaultSync()
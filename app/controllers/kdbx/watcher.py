@@ -0,0 +1,217 @@
+import os
+import sys
+import errno
+import select
+import struct
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+# inotify(7) flags. The directory is watched rather than the file because atomic
+# replaces (ours and those of sync clients) swap the inode behind the name.
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Quiet period (seconds) after the last event before the change is reported,
+# so a writer that saves in several steps is seen once.
+_SETTLE_SECONDS = 0.5
+
+
+def file_stat(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    :return: (mtime_ns, size) of the file, or None if it does not exist.
+    :rtype: Optional[Tuple[int, int]]
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _Inotify:
+    """
+    Minimal ctypes binding of the Linux inotify API watching one directory.
+    """
+
+
+    def __init__(self, directory: Path):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, "inotify_add_watch failed")
+
+
+    def wait(self, name: str, timeout: float) -> bool:
+        """
+        Block until events arrive or the timeout expires.
+
+        :param name: The file name of interest inside the watched directory.
+        :type name: str
+        :param timeout: Maximum wait in seconds.
+        :type timeout: float
+        :return: True if one of the events concerned the file.
+        :rtype: bool
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return False
+            raise
+
+        matched, offset, target = False, 0, os.fsencode(name)
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if data[offset:offset + length].rstrip(b"\0") == target:
+                matched = True
+            offset += length
+        return matched
+
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class VaultFileWatcher:
+    """
+    Watch the vault file for writes and report them after a short quiet period.
+    Uses inotify on Linux and falls back to polling the file mtime and size
+    (VAULT_WATCH_POLL_INTERVAL) elsewhere or if inotify is unavailable. Reports
+    include the application's own writes; telling them apart is up to the callback.
+    """
+
+
+    def __init__(self, on_change: Callable[[str], None]):
+        """
+        :param on_change: Called from the watcher thread with the vault path after a change.
+        :type on_change: Callable[[str], None]
+        """
+        self._on_change = on_change
+        self._path: Optional[Path] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.backend: Optional[str] = None
+
+
+    def start(self, path: str) -> None:
+        """
+        Start watching a vault file, replacing any previous watch.
+
+        :param path: The vault file path.
+        :type path: str
+        :return: None
+        :rtype: None
+        """
+        self.stop()
+        with self._lock:
+            self._path = Path(path).resolve()
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._path, self._stop_event), daemon=True, name="VaultWatcher"
+            )
+            self._thread.start()
+
+
+    def stop(self) -> None:
+        """
+        Stop watching. Safe to call when not started.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stop_event.set()
+            self._path = None
+            self.backend = None
+
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=2)
+
+
+    def is_watching(self) -> bool:
+        """
+        :return: True while a vault file is being watched.
+        :rtype: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+
+    def _open_inotify(self, path: Path) -> Optional[_Inotify]:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            return _Inotify(path.parent)
+        except Exception as e:
+            logger.debug(f"inotify unavailable, polling the vault file instead: {e}")
+            return None
+
+
+    def _run(self, path: Path, stop_event: threading.Event) -> None:
+        """
+        Watcher loop: wait for a change signal, let it settle, then report it.
+        """
+        inotify = self._open_inotify(path)
+        self.backend = "inotify" if inotify else "polling"
+        logger.debug(f"Watching {path.name} for external changes ({self.backend}).")
+        last_stat = file_stat(path)
+
+        try:
+            while not stop_event.is_set():
+                interval = max(0.2, float(settings.VAULT_WATCH_POLL_INTERVAL))
+                if inotify:
+                    changed = inotify.wait(path.name, interval)
+                else:
+                    stop_event.wait(interval)
+                    changed = file_stat(path) != last_stat
+
+                if not changed or stop_event.is_set():
+                    continue
+
+                # Let the writer finish before reporting a single change.
+                while not stop_event.is_set():
+                    if inotify:
+                        if not inotify.wait(path.name, _SETTLE_SECONDS):
+                            break
+                    else:
+                        current = file_stat(path)
+                        stop_event.wait(_SETTLE_SECONDS)
+                        if file_stat(path) == current:
+                            break
+
+                last_stat = file_stat(path)
+                if last_stat is not None and not stop_event.is_set():
+                    try:
+                        self._on_change(str(path))
+                    except Exception as e:
+                        logger.error(f"Vault change handler failed: {e}")
+        finally:
+            if inotify:
+                inotify.close()
@@ -11,6 +11,7 @@ from urllib.parse import urlparse, parse_qs
 
 from app.core.config import settings
 from app.controllers.kdbx.operations import get_active_vault, update_entry
+from app.controllers.kdbx.manager import get_active_session
 from app.controllers.kdbx.models import EntryModel
 
 
@@ -97,7 +98,7 @@ def register_otp_in_entry(entry_uuid: str, raw_data: Union[str, Path, bytes]) ->
         logger.error("Could not obtain a valid TOTP seed from the provided data.")
         return False
 
-    kp_entry = vault.find_entries(uuid=entry_uuid, first=True)
+    kp_entry = get_active_session().get_entry(entry_uuid)
     if not kp_entry:
         return False
 
@@ -2,54 +2,27 @@ import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from typing import Dict, Any
 
-from app.core.config import settings
-from app.controllers.kdbx.operations import list_all_entries
-from app.controllers.passwords import check_password_strength
+from app.controllers.kdbx.manager import get_active_vault, get_active_session
 from app.gui.theme.colors import Colors
 
 
 def get_security_summary() -> Dict[str, Any]:
     """
-    Analyze all vault entries and return a summary of security metrics.
+    Return the security metrics of the active vault. The counters are running
+    aggregates maintained by the session on every mutation, so refreshing the
+    dashboard never re-scores the entries.
 
     :return: A dictionary containing counts for safe, weak, duplicated, 
              and pwned passwords, along with the global health score.
     :rtype: Dict[str, Any]
     """
-    entries = list_all_entries()
-    total = len(entries)
-    
-    if total == 0:
+    if not get_active_vault():
         return {
             "total": 0, "safe": 0, "weak": 0, 
             "duplicate": 0, "pwned": 0, "score": 100.0
         }
 
-    summary = {
-        "total": total,
-        "safe": 0,
-        "weak": 0,
-        "duplicate": 0,
-        "pwned": 0,
-        "total_strength_score": 0
-    }
-
-    for entry in entries:
-        strength = check_password_strength(entry.password)
-        summary["total_strength_score"] += strength["score"]
-        
-        if strength["score"] >= 3:
-            summary["safe"] += 1
-        else:
-            summary["weak"] += 1
-
-        if settings.DUPLICATE_TAG in entry.tags:
-            summary["duplicate"] += 1
-        if settings.PWNED_TAG in entry.tags:
-            summary["pwned"] += 1
-
-    summary["score"] = (summary["total_strength_score"] / (total * 4)) * 100    
-    return summary
+    return get_active_session().strength.summary()
 
 
 def create_security_dashboard_figure() -> Figure:
@@ -21,6 +21,7 @@ SECTION_MAP = {
     "LOG_DIR": ("DIRS", "log_dir"),
     "TEMP_DIR": ("DIRS", "temp_dir"),
     "BACKUP_DIR": ("DIRS", "backup_dir"),
+    "PWNED_CACHE_DIR": ("DIRS", "pwned_cache_dir"),
     "LOG_FILENAME": ("FILENAMES", "log_filename"),
     "HISTORY_FILENAME": ("FILENAMES", "history_filename"),
     "DUPLICATE_TAG": ("TAGS", "duplicate"),
@@ -130,11 +131,30 @@ class Settings(BaseSettings):
     HISTORY_FILENAME: str = Field(default="history.json")
     PASSWORD_AUDIT_INTERVAL: int = Field(default=30)
     PWNED_AUDIT_ENABLED: bool = Field(default=False)
+    PWNED_API_URL: str = Field(default="https://api.pwnedpasswords.com/range")
+    PWNED_CACHE_DIR: str = Field(default="temp/hibp")
+    PWNED_CACHE_TTL_DAYS: int = Field(default=7)
+    PWNED_LOOKUP_WORKERS: int = Field(default=4)
+    PWNED_BACKEND: str = Field(default="api")
+    PWNED_CORPUS_PATH: str = Field(default="temp/hibp-corpus.bin")
     CLIPBOARD_CLEAR_INTERVAL: int = Field(default=20)
     RECYCLE_BIN_RETENTION_DAYS: int = Field(default=15)
     OTHER_SERVICES_INTERVAL: int = Field(default=60)
+    SERVICE_WORKERS: int = Field(default=2)
     BACKUP_DIR: str = Field(default="temp/backups")
     BACKUP_MAX_COUNT: int = Field(default=5)
+    BACKUP_KEEP_HOURLY: int = Field(default=0)
+    BACKUP_KEEP_DAILY: int = Field(default=0)
+    BACKUP_KEEP_WEEKLY: int = Field(default=0)
+    SAVE_DEBOUNCE_INTERVAL: float = Field(default=1.5)
+    KDF_AUTO_TUNE: bool = Field(default=True)
+    KDF_TARGET_UNLOCK_MS: int = Field(default=500)
+    KDF_ALGORITHM: str = Field(default="argon2")
+    KDF_MEMORY_MIB: int = Field(default=64)
+    KDF_PARALLELISM: int = Field(default=2)
+    VAULT_WATCH_ENABLED: bool = Field(default=True)
+    VAULT_WATCH_POLL_INTERVAL: float = Field(default=2.0)
+    IMPORT_DEDUPE_POLICY: str = Field(default="tag")
     RECYCLE_BIN_GROUP_NAME: str = Field(default="Recycle Bin")
     PERSONAL_GROUP_NAME: str = Field(default="Personal")
     DUPLICATE_TAG: str = Field(default="duplicate", alias="duplicate")
@@ -8,7 +8,8 @@ from app.utils.file import open_folder_in_explorer
 from app.core.config import settings, DEFAULT_INI_FILE
 from app.controllers.kdbx.models import GroupModel, EntryModel
 from app.controllers.imports import (
-    execute_final_import, parse_csv_to_models, get_csv_columns
+    preview_csv, start_csv_parse, run_parsed_import, discard_parsed_import, get_csv_columns,
+    import_csv_file as import_csv_file_controller
 )
 from app.controllers.kdbx.operations import (
     create_group as create_group_controller,
@@ -16,13 +17,33 @@ from app.controllers.kdbx.operations import (
     delete_group as delete_group_controller,
     add_entry as add_entry_controller,
     update_group as update_group_controller,
-    list_entries_by_group as list_entries_by_group_controllers,
-    find_entries as find_entries_controller
+    list_entry_rows_by_group as list_entry_rows_by_group_controller,
+    find_entry_rows as find_entry_rows_controller,
+    get_entry_model as get_entry_model_controller,
+    list_entry_rows_page as list_entry_rows_page_controller,
+    search_entry_rows_incremental as search_entry_rows_incremental_controller,
+    close_search_session as close_search_session_controller,
+    sort_groups
+)
+from app.controllers.clipboard import copy_to_clipboard
+from app.controllers.kdbx.backups import (
+    list_backups as list_backups_controller,
+    restore_backup as restore_backup_controller
 )
 from app.controllers.kdbx.manager import (
     generate_keyfile, create_new_vault, open_vault as open_vault_controller,
-    close_current_vault, get_active_vault
+    open_vault_async as open_vault_async_controller,
+    close_current_vault, get_active_vault, get_active_session, retune_vault_kdf as retune_vault_kdf_controller,
+    suspend_vault
+)
+from app.controllers.kdbx.kdf import (
+    KDF_ALGORITHMS, calibrate_kdf, get_last_calibration, read_kdf_parameters
 )
+from app.controllers.kdbx.sync import vault_sync
+from app.controllers.kdbx.dedupe import DEDUPE_POLICIES
+from app.controllers.jobs import job_registry
+from app.services.scheduler import scheduler
+from app.services.passwords.corpus import start_corpus_import
 from app.utils.logger import logger
 from app.controllers.history import (
     get_history as get_history_controller, truncate_paths_middle, 
@@ -146,6 +167,36 @@ class API:
             return False
 
 
+    def open_vault_async(self, password: str, keyfile: Optional[str] = None) -> Optional[str]:
+        if not settings.FILE_PATH:
+            logger.error("Attempted to unlock vault, but no FILE_PATH is set.")
+            return None
+
+        try:
+            job = open_vault_async_controller(path=settings.FILE_PATH, password=password, keyfile=keyfile)
+            return job.id if job else None
+        except Exception as e:
+            logger.error(f"Error while starting vault unlock: {e}")
+            return None
+
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        try:
+            job = job_registry.get(job_id)
+            return job.to_dict() if job else None
+        except Exception as e:
+            logger.error(f"Error reading job {job_id}: {e}")
+            return None
+
+
+    def cancel_job(self, job_id: str) -> bool:
+        try:
+            return job_registry.cancel(job_id)
+        except Exception as e:
+            logger.error(f"Error cancelling job {job_id}: {e}")
+            return False
+
+
     def create_group(self, name: str, icon_id: int = 48, color: Optional[str] = None) -> bool:
         try:
             success = create_group_controller(group_data=GroupModel(
@@ -164,9 +215,11 @@ class API:
             return False
 
 
-    def list_groups(self) -> List[Dict]:
+    def list_groups(self, sort_by: str = "name", reverse: bool = False) -> List[Dict]:
         try:
             groups = list_groups_controller()
+            if sort_by != "name" or reverse:
+                groups = sort_groups(groups, sort_by=sort_by, reverse=reverse)
             return [g.model_dump(mode='json') for g in groups]
         except Exception as e:
             logger.error(f"Error listing groups: {e}")
@@ -227,6 +280,14 @@ class API:
             return False
 
 
+    def suspend_session(self) -> bool:
+        try:
+            return suspend_vault()
+        except Exception as e:
+            logger.error(f"Error suspending session via API: {e}")
+            return False
+
+
     def is_session_active(self) -> bool:
         return get_active_vault() is not None
 
@@ -235,7 +296,10 @@ class API:
         return {
             "pwned_audit_enabled": settings.PWNED_AUDIT_ENABLED,
             "password_audit_interval": settings.PASSWORD_AUDIT_INTERVAL,
-            "clipboard_clear_interval": settings.CLIPBOARD_CLEAR_INTERVAL
+            "clipboard_clear_interval": settings.CLIPBOARD_CLEAR_INTERVAL,
+            "pwned_api_url": settings.PWNED_API_URL,
+            "pwned_cache_ttl_days": settings.PWNED_CACHE_TTL_DAYS,
+            "pwned_backend": settings.PWNED_BACKEND
         }
 
 
@@ -243,17 +307,66 @@ class API:
         try:
             settings.PWNED_AUDIT_ENABLED = bool(enabled)
             logger.info(f"Pwned audit enabled updated to: {settings.PWNED_AUDIT_ENABLED}")
+            scheduler.reschedule("password_audit", delay=0)
             return settings.save_settings()
         except Exception as e:
             logger.error(f"Error saving pwned_audit_enabled: {e}")
             return False
 
 
+    def set_pwned_api_url(self, url: str) -> bool:
+        try:
+            parsed_url = str(url).strip()
+            if not parsed_url:
+                return False
+            settings.PWNED_API_URL = parsed_url
+            logger.info(f"Pwned API endpoint updated to: {parsed_url}")
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving pwned_api_url: {e}")
+            return False
+
+
+    def set_pwned_cache_ttl_days(self, days: int) -> bool:
+        try:
+            parsed_days = max(0, int(days))
+            settings.PWNED_CACHE_TTL_DAYS = parsed_days
+            logger.info(f"Pwned cache TTL updated to: {parsed_days} days")
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving pwned_cache_ttl_days: {e}")
+            return False
+
+
+    def set_pwned_backend(self, backend: str) -> bool:
+        try:
+            if backend not in ("api", "local"):
+                logger.warning(f"Invalid pwned backend: {backend}")
+                return False
+            settings.PWNED_BACKEND = backend
+            logger.info(f"Pwned backend updated to: {backend}")
+            scheduler.reschedule("password_audit", delay=0)
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving pwned_backend: {e}")
+            return False
+
+
+    def import_pwned_corpus(self, source_path: str) -> Optional[str]:
+        try:
+            job = start_corpus_import(source_path)
+            return job.id if job else None
+        except Exception as e:
+            logger.error(f"Error importing pwned corpus: {e}")
+            return None
+
+
     def set_password_audit_interval(self, interval: int) -> bool:
         try:
             parsed_interval = max(10, int(interval))
             settings.PASSWORD_AUDIT_INTERVAL = parsed_interval
             logger.info(f"Password audit interval updated to: {parsed_interval}")
+            scheduler.reschedule("password_audit")
             return settings.save_settings()
         except Exception as e:
             logger.error(f"Error saving password_audit_interval: {e}")
@@ -271,11 +384,110 @@ class API:
             return False
 
 
+    def get_kdf_settings(self) -> dict:
+        vault = get_active_vault()
+        try:
+            vault_kdf = read_kdf_parameters(vault) if vault else None
+        except Exception as e:
+            logger.error(f"Error reading the vault KDF parameters: {e}")
+            vault_kdf = None
+
+        return {
+            "kdf_auto_tune": settings.KDF_AUTO_TUNE,
+            "kdf_target_unlock_ms": settings.KDF_TARGET_UNLOCK_MS,
+            "kdf_algorithm": settings.KDF_ALGORITHM,
+            "kdf_memory_mib": settings.KDF_MEMORY_MIB,
+            "kdf_parallelism": settings.KDF_PARALLELISM,
+            "vault_kdf": vault_kdf,
+            "last_calibration": get_last_calibration()
+        }
+
+
+    def set_kdf_auto_tune(self, enabled: bool) -> bool:
+        try:
+            settings.KDF_AUTO_TUNE = bool(enabled)
+            logger.info(f"KDF auto-tune updated to: {settings.KDF_AUTO_TUNE}")
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving kdf_auto_tune: {e}")
+            return False
+
+
+    def set_kdf_target_unlock_ms(self, target_ms: int) -> bool:
+        try:
+            parsed_target = max(100, min(10000, int(target_ms)))
+            settings.KDF_TARGET_UNLOCK_MS = parsed_target
+            logger.info(f"KDF target unlock time updated to: {parsed_target} ms")
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving kdf_target_unlock_ms: {e}")
+            return False
+
+
+    def set_kdf_algorithm(self, algorithm: str) -> bool:
+        try:
+            if algorithm not in KDF_ALGORITHMS:
+                logger.warning(f"Invalid KDF algorithm: {algorithm}")
+                return False
+            settings.KDF_ALGORITHM = algorithm
+            logger.info(f"KDF algorithm updated to: {algorithm}")
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving kdf_algorithm: {e}")
+            return False
+
+
+    def benchmark_kdf(self, target_ms: Optional[int] = None) -> Optional[Dict]:
+        try:
+            return calibrate_kdf(target_ms=target_ms)
+        except Exception as e:
+            logger.error(f"Error benchmarking the KDF: {e}")
+            return None
+
+
+    def retune_vault_kdf(self, password: str, keyfile: Optional[str] = None) -> Optional[Dict]:
+        try:
+            return retune_vault_kdf_controller(password, keyfile)
+        except Exception as e:
+            logger.error(f"Error re-tuning the vault KDF: {e}")
+            return None
+
+
+    def get_sync_status(self) -> dict:
+        return {
+            "vault_watch_enabled": settings.VAULT_WATCH_ENABLED,
+            **vault_sync.get_status()
+        }
+
+
+    def keep_local_vault_version(self) -> bool:
+        try:
+            return vault_sync.keep_local_version()
+        except Exception as e:
+            logger.error(f"Error overwriting the external vault version: {e}")
+            return False
+
+
+    def set_vault_watch_enabled(self, enabled: bool) -> bool:
+        try:
+            settings.VAULT_WATCH_ENABLED = bool(enabled)
+            logger.info(f"Vault file watching updated to: {settings.VAULT_WATCH_ENABLED}")
+            vault_sync.refresh_watch()
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving vault_watch_enabled: {e}")
+            return False
+
+
     def get_maintenance_settings(self) -> dict:
         return {
             "recycle_bin_retention_days": settings.RECYCLE_BIN_RETENTION_DAYS,
             "backup_max_count": settings.BACKUP_MAX_COUNT,
-            "other_services_interval": settings.OTHER_SERVICES_INTERVAL
+            "backup_keep_hourly": settings.BACKUP_KEEP_HOURLY,
+            "backup_keep_daily": settings.BACKUP_KEEP_DAILY,
+            "backup_keep_weekly": settings.BACKUP_KEEP_WEEKLY,
+            "other_services_interval": settings.OTHER_SERVICES_INTERVAL,
+            "save_debounce_interval": settings.SAVE_DEBOUNCE_INTERVAL
         }
 
 
@@ -301,17 +513,70 @@ class API:
             return False
 
 
+    def set_backup_retention(self, hourly: int, daily: int, weekly: int) -> bool:
+        try:
+            settings.BACKUP_KEEP_HOURLY = max(0, min(168, int(hourly)))
+            settings.BACKUP_KEEP_DAILY = max(0, min(90, int(daily)))
+            settings.BACKUP_KEEP_WEEKLY = max(0, min(52, int(weekly)))
+            logger.info(
+                f"Backup retention updated to: {settings.BACKUP_KEEP_HOURLY} hourly, "
+                f"{settings.BACKUP_KEEP_DAILY} daily, {settings.BACKUP_KEEP_WEEKLY} weekly"
+            )
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving backup retention: {e}")
+            return False
+
+
+    def list_backups(self) -> List[Dict]:
+        try:
+            return list_backups_controller(settings.FILE_PATH)
+        except Exception as e:
+            logger.error(f"Error listing backups: {e}")
+            return []
+
+
+    def restore_backup(self, backup_id: str) -> bool:
+        vault_path = settings.FILE_PATH
+        if not vault_path:
+            logger.error("Attempted to restore a backup, but no FILE_PATH is set.")
+            return False
+
+        try:
+            close_current_vault()
+            settings.FILE_PATH = vault_path
+            success = restore_backup_controller(backup_id, vault_path)
+            if success:
+                logger.info(f"Backup '{backup_id}' restored via GUI. The vault must be unlocked again.")
+            return success
+        except Exception as e:
+            logger.error(f"Error restoring backup '{backup_id}': {e}")
+            return False
+
+
     def set_other_services_interval(self, interval: int) -> bool:
         try:
             parsed_interval = max(30, int(interval))
             settings.OTHER_SERVICES_INTERVAL = parsed_interval
             logger.info(f"Other services interval updated to: {parsed_interval}")
+            scheduler.reschedule("recycle_bin")
             return settings.save_settings()
         except Exception as e:
             logger.error(f"Error saving other_services_interval: {e}")
             return False
 
 
+    def set_save_debounce_interval(self, interval: float) -> bool:
+        try:
+            parsed_interval = max(0.0, min(30.0, float(interval)))
+            settings.SAVE_DEBOUNCE_INTERVAL = parsed_interval
+            logger.info(f"Save debounce interval updated to: {parsed_interval}")
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving save_debounce_interval: {e}")
+            return False
+
+
     def get_log_level(self) -> str:
         return settings.LOG_LEVEL.lower()
 
@@ -363,21 +628,65 @@ class API:
     
     def list_entries_by_group(self, group_name: str) -> List[Dict]:
         try:
-            entries = list_entries_by_group_controllers(group_name)
-            
-            cleaned_entries = []
-            for e in entries:
-                entry_dict = e.model_dump(mode='json')
-                entry_dict['password'] = bool(entry_dict.get('password'))
-                entry_dict['totp_seed'] = bool(entry_dict.get('totp_seed'))
-                cleaned_entries.append(entry_dict)
-                
-            return cleaned_entries
+            return [row.to_dict() for row in list_entry_rows_by_group_controller(group_name)]
         except Exception as e:
             logger.error(f"Error listing entries for group {group_name}: {e}")
             return []
 
 
+    def list_entries_page(
+        self, group_name: Optional[str] = None, query: Optional[str] = None, offset: int = 0,
+        limit: int = 100, sort_by: str = "title", reverse: bool = False
+    ) -> Dict:
+        try:
+            rows, total = list_entry_rows_page_controller(
+                group_name=group_name, query=query, offset=offset,
+                limit=limit, sort_by=sort_by, reverse=reverse
+            )
+            return {
+                "items": [row.to_dict() for row in rows],
+                "total": total,
+                "offset": max(0, int(offset)),
+                "revision": get_active_session().revision
+            }
+        except Exception as e:
+            logger.error(f"Error listing entries page (group={group_name}, query={query}): {e}")
+            return {"items": [], "total": 0, "offset": 0, "revision": 0}
+
+
+    def get_entry(self, entry_uuid: str) -> Optional[Dict]:
+        try:
+            entry = get_entry_model_controller(entry_uuid)
+            return entry.model_dump(mode='json') if entry else None
+        except Exception as e:
+            logger.error(f"Error loading entry {entry_uuid}: {e}")
+            return None
+
+
+    def copy_entry_field(self, entry_uuid: str, field: str) -> bool:
+        try:
+            entry = get_entry_model_controller(entry_uuid)
+            if not entry:
+                return False
+
+            if field == "password":
+                copy_to_clipboard(entry.password, is_sensitive=True)
+            elif field == "totp" and entry.totp_seed:
+                # Imported on demand: the OTP module pulls in the QR decoding stack.
+                from app.controllers.otp import get_otp_data
+                code, _ = get_otp_data(entry.totp_seed)
+                copy_to_clipboard(code, is_sensitive=True)
+            elif field in ("username", "url"):
+                copy_to_clipboard(getattr(entry, field) or "", is_sensitive=False)
+            else:
+                logger.warning(f"Unsupported copy field: {field}")
+                return False
+            return True
+        except Exception as e:
+            logger.error(f"Error copying {field} of entry {entry_uuid}: {e}")
+            return False
+
+
     def export_data(self, format: str, group_name: Optional[str] = None) -> bool:        
         ext = format.lower()
         scope_name = group_name if group_name else "full_vault"
@@ -403,22 +712,79 @@ class API:
         return self.select_file(file_types=('CSV files (*.csv)', 'All files (*.*)'))
 
 
-    def preview_csv_import(self, file_path: str, preset: Optional[str] = None, mapping: Optional[Dict] = None) -> List[Dict]:
+    def preview_csv_import(self, file_path: str, preset: Optional[str] = None, mapping: Optional[Dict] = None) -> Optional[Dict]:
         try:
-            entries = parse_csv_to_models(
+            preview = preview_csv(
                 file_path=file_path, 
                 preset_name=preset, 
                 manual_mapping=mapping
             )
-            return [e.model_dump(mode='json') for e in entries]
+            if preview is None:
+                return None
+            preview["entries"] = [e.model_dump(mode='json') for e in preview["entries"]]
+            return preview
         except Exception as e:
             logger.error(f"Error in preview_csv_import: {e}")
-            return []
+            return None
+
+
+    def start_csv_parse(self, file_path: str, preset: Optional[str] = None, mapping: Optional[Dict] = None) -> Optional[str]:
+        try:
+            job = start_csv_parse(file_path=file_path, preset_name=preset, manual_mapping=mapping)
+            return job.id if job else None
+        except Exception as e:
+            logger.error(f"Error starting CSV parse: {e}")
+            return None
+
+
+    def run_import(self, job_id: str, target_group: str, policy: Optional[str] = None) -> Dict[str, int]:
+        try:
+            return run_parsed_import(job_id, target_group, policy)
+        except Exception as e:
+            logger.error(f"Error in run_import: {e}")
+            return {"success": 0, "failed": 0}
+
+
+    def discard_import(self, job_id: str) -> bool:
+        try:
+            return discard_parsed_import(job_id)
+        except Exception as e:
+            logger.error(f"Error discarding parsed import {job_id}: {e}")
+            return False
 
 
-    def run_import(self, entries_data: List[Dict], target_group: str) -> Dict[str, int]:
-        entries = [EntryModel(**data) for data in entries_data]
-        return execute_final_import(entries, target_group)
+    def import_csv_file(
+        self, file_path: str, target_group: str, preset: Optional[str] = None, mapping: Optional[Dict] = None,
+        policy: Optional[str] = None
+    ) -> Dict[str, int]:
+        try:
+            return import_csv_file_controller(
+                file_path=file_path,
+                target_group=target_group,
+                preset_name=preset,
+                manual_mapping=mapping,
+                policy=policy
+            )
+        except Exception as e:
+            logger.error(f"Error in import_csv_file: {e}")
+            return {"success": 0, "failed": 0}
+
+
+    def get_import_dedupe_policy(self) -> str:
+        return settings.IMPORT_DEDUPE_POLICY
+
+
+    def set_import_dedupe_policy(self, policy: str) -> bool:
+        try:
+            if policy not in DEDUPE_POLICIES:
+                logger.warning(f"Invalid import dedupe policy: {policy}")
+                return False
+            settings.IMPORT_DEDUPE_POLICY = policy
+            logger.info(f"Import dedupe policy updated to: {policy}")
+            return settings.save_settings()
+        except Exception as e:
+            logger.error(f"Error saving import_dedupe_policy: {e}")
+            return False
 
 
     def get_csv_columns(self, file_path: str) -> List[str]:
@@ -432,13 +798,38 @@ class API:
 
     def search_entries(self, query: str) -> List[Dict]:
         try:
-            entries = find_entries_controller(query=query)
-            return [e.model_dump(mode='json') for e in entries]
+            return [row.to_dict() for row in find_entry_rows_controller(query=query)]
         except Exception as e:
             logger.error(f"Error searching entries: {e}")
             return []
 
 
+    def search_entries_incremental(
+        self, search_id: str, sequence: int, query: str, group_name: Optional[str] = None, limit: int = 100
+    ) -> Dict:
+        try:
+            result = search_entry_rows_incremental_controller(
+                search_id=search_id, sequence=sequence, query=query, group_name=group_name, limit=limit
+            )
+            if result is None:
+                return {"items": [], "total": 0, "sequence": sequence, "stale": True}
+
+            rows, total = result
+            return {"items": [row.to_dict() for row in rows], "total": total, "sequence": sequence, "stale": False}
+        except Exception as e:
+            logger.error(f"Error during incremental search: {e}")
+            return {"items": [], "total": 0, "sequence": sequence, "stale": False}
+
+
+    def close_search(self, search_id: str) -> bool:
+        try:
+            close_search_session_controller(search_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error closing search session: {e}")
+            return False
+
+
     def update_group(self, old_name: str, new_name: str, icon_id: int = 48, color: Optional[str] = None) -> bool:
         try:
             new_data = GroupModel(name=new_name, icon=icon_id, color=color)
@@ -12,6 +12,8 @@ from app.controllers.updater import check_for_updates
 from app.services.main import start_background_services
 from .api.main import API
 from app.controllers.kdbx.manager import close_current_vault
+from app.controllers.kdbx.saver import vault_saver
+from app.services.scheduler import scheduler
 from app.utils.file import validate_entry_url
 
 
@@ -107,13 +109,15 @@ class GUIManager:
     def _on_closed(self) -> None:
         """
         Callback executed when the user closes the webview window.
-        Ensures that the current active vault is safely closed and terminates 
-        the application process.
+        Stops the service scheduler, flushes pending background saves, ensures that the current active vault 
+        is safely closed and terminates the application process.
 
         :return: None
         :rtype: None
         """
         logger.info("Closing the Project Key graphical interface...")
+        scheduler.stop()
+        vault_saver.shutdown()
         close_current_vault()
         sys.exit(0)
 
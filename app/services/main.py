@@ -4,6 +4,8 @@ from app.core.config import settings
 from .passwords.main import start_password_security_audits
 from .recycle_bin import start_recycle_bin_service
 from .emergency_monitor import start_emergency_monitor_service
+from .scheduler import scheduler
+from app.controllers.kdbx.sync import vault_sync
 
 
 logger = logging.getLogger(settings.PROJECT_NAME)
@@ -12,6 +14,8 @@ logger = logging.getLogger(settings.PROJECT_NAME)
 def start_background_services() -> None:
     """
     Orchestrate the initialization of all application background services.
+    Every service is registered as a job of the shared scheduler, which runs
+    them on a bounded worker pool instead of one sleeping thread per service.
 
     :return: None
     :rtype: None
@@ -21,5 +25,7 @@ def start_background_services() -> None:
     start_password_security_audits()
     start_recycle_bin_service()
     start_emergency_monitor_service()
+    scheduler.start()
+    vault_sync.start()
 
     logger.info("All background services have been successfully dispatched.")
\ No newline at end of file
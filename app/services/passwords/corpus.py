@@ -0,0 +1,420 @@
+import os
+import mmap
+import heapq
+import struct
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.core.config import settings
+from app.controllers.jobs import Job, job_registry
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+# Corpus layout: header, fan-out table, then the sorted 20-byte SHA-1 records.
+# fanout[i] is the number of records whose first two bytes are < i, so the
+# records starting with prefix p live in [fanout[p], fanout[p + 1]).
+_MAGIC = b"PKHIBP01"
+_HEADER = struct.Struct("<8sQ")
+_FANOUT_SIZE = 65536 + 1
+_FANOUT = struct.Struct(f"<{_FANOUT_SIZE}Q")
+_RECORD_SIZE = 20
+_DATA_OFFSET = _HEADER.size + _FANOUT.size
+
+# Records sorted in memory per run while importing an unsorted dump (~20 MB).
+_IMPORT_RUN_SIZE = 1_000_000
+
+# Run files merged at once. A full dump spills hundreds of runs; they are merged
+# in several passes so the open handles stay far below the usual fd limit.
+_MAX_MERGE_FANIN = 64
+
+# Dump lines read between two progress reports (and cancellation points).
+_PROGRESS_LINES = 100_000
+
+# Overall progress reported by each import stage.
+_READ_SHARE = 0.5
+_MERGE_SHARE = 0.45
+
+
+def _iter_dump_hashes(source: Path, progress: Optional[Callable[[float], None]] = None) -> Iterator[bytes]:
+    """
+    Yield the raw SHA-1 digests of a Pwned Passwords dump. Accepts the single
+    "HASH:COUNT" text file or a directory of "<PREFIX>.txt" range files
+    ("SUFFIX:COUNT" lines). The optional progress callback receives the
+    fraction of the dump read every _PROGRESS_LINES lines.
+    """
+    if source.is_dir():
+        range_files = sorted(source.glob("*.txt"))
+        for position, range_file in enumerate(range_files):
+            prefix = range_file.stem.upper()
+            with open(range_file, "r", encoding="utf-8", errors="ignore") as handle:
+                for line in handle:
+                    suffix = line.split(":", 1)[0].strip()
+                    if suffix:
+                        yield bytes.fromhex(prefix + suffix)
+            if progress:
+                progress((position + 1) / len(range_files))
+        return
+
+    size = source.stat().st_size or 1
+    with open(source, "rb") as handle:
+        for lines, line in enumerate(handle, 1):
+            sha1_hash = line.split(b":", 1)[0].strip()
+            if len(sha1_hash) == 40:
+                yield bytes.fromhex(sha1_hash.decode("ascii", errors="ignore"))
+            if progress and lines % _PROGRESS_LINES == 0:
+                progress(min(1.0, handle.tell() / size))
+
+
+def _write_run(records: List[bytes], folder: str) -> str:
+    """
+    Sort a chunk of records and spill it to a temporary run file.
+    """
+    records.sort()
+    fd, run_path = tempfile.mkstemp(dir=folder, suffix=".run")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(b"".join(records))
+    return run_path
+
+
+def _iter_run(handle: BinaryIO) -> Iterator[bytes]:
+    """
+    Stream the fixed-size records of a run file.
+    """
+    while True:
+        record = handle.read(_RECORD_SIZE)
+        if len(record) < _RECORD_SIZE:
+            return
+        yield record
+
+
+def _merge_runs(run_paths: List[str], write: Callable[[bytes], None], progress: Callable[[], None]) -> None:
+    """
+    Merge sorted run files into one sorted, duplicate-free record stream.
+
+    :param run_paths: At most _MAX_MERGE_FANIN run files.
+    :type run_paths: List[str]
+    :param write: Receives every distinct record, in order.
+    :type write: Callable[[bytes], None]
+    :param progress: Called every _IMPORT_RUN_SIZE records.
+    :type progress: Callable[[], None]
+    :return: None
+    :rtype: None
+    """
+    run_handles = [open(path, "rb") for path in run_paths]
+    try:
+        previous = None
+        for merged, record in enumerate(heapq.merge(*(_iter_run(h) for h in run_handles)), 1):
+            if merged % _IMPORT_RUN_SIZE == 0:
+                progress()
+            if record == previous:
+                continue
+            write(record)
+            previous = record
+    finally:
+        for handle in run_handles:
+            handle.close()
+
+
+def _build_corpus(source: Path, target: Path, job: Optional[Job] = None) -> int:
+    """
+    Sort a dump into the corpus file with an external merge sort: sorted runs
+    are spilled while reading, then merged _MAX_MERGE_FANIN at a time, in as
+    many passes as needed, and the last pass writes the corpus.
+
+    :param source: The text dump file or the directory of range files.
+    :type source: Path
+    :param target: The corpus file to write.
+    :type target: Path
+    :param job: (Optional) Job receiving the progress; cancelling it stops the import.
+    :type job: Optional[Job]
+    :raises JobCancelled: If the job was cancelled.
+    :return: The number of distinct hashes written.
+    :rtype: int
+    """
+    folder = str(target.parent)
+    report = (lambda stage, ratio: job.set_stage(stage, ratio)) if job else (lambda stage, ratio: None)
+    run_paths: List[str] = []
+    tmp_path = None
+
+    try:
+        report("read", 0.0)
+        records: List[bytes] = []
+        total = 0
+        read_progress = lambda ratio: report("read", ratio * _READ_SHARE)
+        for record in _iter_dump_hashes(source, progress=read_progress):
+            records.append(record)
+            if len(records) >= _IMPORT_RUN_SIZE:
+                total += len(records)
+                run_paths.append(_write_run(records, folder))
+                records = []
+        if records or not run_paths:
+            total += len(records)
+            run_paths.append(_write_run(records, folder))
+
+        passes, runs = 1, len(run_paths)
+        while runs > _MAX_MERGE_FANIN:
+            runs = -(-runs // _MAX_MERGE_FANIN)
+            passes += 1
+        merged = 0
+
+        def merge_progress() -> None:
+            nonlocal merged
+            merged += _IMPORT_RUN_SIZE
+            report("merge", _READ_SHARE + _MERGE_SHARE * min(1.0, merged / (max(total, 1) * passes)))
+
+        report("merge", _READ_SHARE)
+        while len(run_paths) > _MAX_MERGE_FANIN:
+            group = run_paths[:_MAX_MERGE_FANIN]
+            fd, merged_path = tempfile.mkstemp(dir=folder, suffix=".run")
+            run_paths.append(merged_path)
+            with os.fdopen(fd, "wb") as output:
+                _merge_runs(group, output.write, merge_progress)
+            del run_paths[:_MAX_MERGE_FANIN]
+            for path in group:
+                os.remove(path)
+
+        fanout = [0] * _FANOUT_SIZE
+        count = 0
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+
+        with os.fdopen(fd, "wb") as output:
+            output.seek(_DATA_OFFSET)
+
+            def write(record: bytes) -> None:
+                nonlocal count
+                output.write(record)
+                fanout[int.from_bytes(record[:2], "big") + 1] += 1
+                count += 1
+
+            _merge_runs(run_paths, write, merge_progress)
+            report("write", _READ_SHARE + _MERGE_SHARE)
+
+            for i in range(1, _FANOUT_SIZE):
+                fanout[i] += fanout[i - 1]
+
+            output.seek(0)
+            output.write(_HEADER.pack(_MAGIC, count))
+            output.write(_FANOUT.pack(*fanout))
+            output.flush()
+            os.fsync(output.fileno())
+
+        os.replace(tmp_path, target)
+        tmp_path = None
+        return count
+
+    finally:
+        for path in run_paths + ([tmp_path] if tmp_path else []):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def import_corpus(source_path: str, output_path: Optional[str] = None) -> bool:
+    """
+    Convert a downloaded Pwned Passwords SHA-1 dump into the compact binary
+    corpus used by the local backend. Unsorted input is handled with a bounded
+    external merge sort, so memory use and open files do not grow with the dump size.
+
+    :param source_path: The text dump file or the directory of range files.
+    :type source_path: str
+    :param output_path: The corpus file to write. Defaults to PWNED_CORPUS_PATH.
+    :type output_path: Optional[str]
+    :return: True if the corpus was written, False otherwise.
+    :rtype: bool
+    """
+    source = Path(source_path)
+    target = Path(output_path or settings.PWNED_CORPUS_PATH)
+
+    if not source.exists():
+        logger.error(f"Corpus import failed: source {source} does not exist.")
+        return False
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        logger.info(f"Importing breached-password corpus from {source}...")
+        count = _build_corpus(source, target)
+        logger.info(f"Breached-password corpus written to {target} ({count} hashes).")
+        return True
+
+    except Exception as e:
+        logger.error(f"Corpus import failed: {e}")
+        return False
+
+
+def start_corpus_import(source_path: str, output_path: Optional[str] = None) -> Optional[Job]:
+    """
+    Run import_corpus() on a background job. The job reports the read, merge
+    and write stages and can be cancelled between batches of records; the
+    previous corpus stays in place until the new one is complete.
+
+    :param source_path: The text dump file or the directory of range files.
+    :type source_path: str
+    :param output_path: The corpus file to write. Defaults to PWNED_CORPUS_PATH.
+    :type output_path: Optional[str]
+    :return: The started Job, or None if the source does not exist.
+    :rtype: Optional[Job]
+    """
+    source = Path(source_path)
+    target = Path(output_path or settings.PWNED_CORPUS_PATH)
+
+    if not source.exists():
+        logger.error(f"Corpus import failed: source {source} does not exist.")
+        return None
+
+    def run(job: Job) -> Dict[str, int]:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Importing breached-password corpus from {source}...")
+        count = _build_corpus(source, target, job=job)
+        logger.info(f"Breached-password corpus written to {target} ({count} hashes).")
+        return {"hashes": count}
+
+    return job_registry.submit("pwned_corpus", run)
+
+
+class BreachCorpus:
+    """
+    Read-only, memory-mapped view of a corpus file. Lookups touch only the
+    fan-out slots and the pages visited by the binary search, so the resident
+    set stays bounded regardless of the corpus size.
+    """
+
+
+    def __init__(self, path: str):
+        """
+        :param path: The corpus file produced by import_corpus.
+        :type path: str
+        :raises ValueError: If the file is not a valid corpus.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, self.count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or len(self._map) != _DATA_OFFSET + self.count * _RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a valid breached-password corpus")
+
+        self.version = f"local:{self.count}:{os.fstat(self._file.fileno()).st_mtime_ns}"
+
+
+    def _bucket(self, prefix: int) -> range:
+        """
+        Return the record index range sharing a 16-bit prefix.
+        """
+        lo, hi = struct.unpack_from("<2Q", self._map, _HEADER.size + prefix * 8)
+        return range(lo, hi)
+
+
+    def contains(self, digest: bytes) -> bool:
+        """
+        Binary-search a raw SHA-1 digest within its fan-out bucket.
+
+        :param digest: The 20-byte SHA-1 digest.
+        :type digest: bytes
+        :return: True if the digest is in the corpus.
+        :rtype: bool
+        """
+        bucket = self._bucket(int.from_bytes(digest[:2], "big"))
+        lo, hi = bucket.start, bucket.stop
+        data = self._map
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _DATA_OFFSET + mid * _RECORD_SIZE
+            record = data[offset:offset + _RECORD_SIZE]
+            if record < digest:
+                lo = mid + 1
+            elif record > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+
+    def close(self) -> None:
+        """
+        Release the memory map and the file handle.
+
+        :return: None
+        :rtype: None
+        """
+        self._map.close()
+        self._file.close()
+
+
+_corpus: Optional[BreachCorpus] = None
+_corpus_stamp = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus() -> Optional[BreachCorpus]:
+    """
+    Return the mapped corpus at PWNED_CORPUS_PATH, remapping it when the file
+    was replaced by a new import.
+
+    :return: The BreachCorpus instance, or None if no valid corpus is available.
+    :rtype: Optional[BreachCorpus]
+    """
+    global _corpus, _corpus_stamp
+    path = settings.PWNED_CORPUS_PATH
+
+    with _corpus_lock:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            logger.error(f"Local breach corpus not found at {path}.")
+            return None
+
+        stamp = (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if _corpus is not None and _corpus_stamp == stamp:
+            return _corpus
+
+        try:
+            corpus = BreachCorpus(path)
+        except Exception as e:
+            logger.error(f"Failed to map breach corpus {path}: {e}")
+            return None
+
+        if _corpus is not None:
+            _corpus.close()
+        _corpus, _corpus_stamp = corpus, stamp
+        return _corpus
+
+
+def get_data_version() -> Optional[str]:
+    """
+    Identify the imported corpus, so audit results are invalidated by a re-import.
+
+    :return: The data version string, or None if no corpus is available.
+    :rtype: Optional[str]
+    """
+    corpus = get_corpus()
+    return corpus.version if corpus else None
+
+
+def lookup_hashes(hashes: Iterable[str]) -> Dict[str, Optional[bool]]:
+    """
+    Check SHA-1 hashes against the local corpus. Same contract as the HIBP
+    range backend, so both are interchangeable in the pwned audit.
+
+    :param hashes: Uppercase SHA-1 hex digests.
+    :type hashes: Iterable[str]
+    :return: A mapping from hash to True (breached), False (clean) or None (corpus unavailable).
+    :rtype: Dict[str, Optional[bool]]
+    """
+    unique_hashes = sorted(set(hashes))
+    corpus = get_corpus()
+    if corpus is None:
+        return {sha1_hash: None for sha1_hash in unique_hashes}
+
+    with _corpus_lock:
+        return {sha1_hash: corpus.contains(bytes.fromhex(sha1_hash)) for sha1_hash in unique_hashes}
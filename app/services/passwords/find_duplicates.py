@@ -1,81 +1,60 @@
-import time
 import logging
-from collections import defaultdict
-from typing import List, Dict
 
 from app.core.config import settings
-from app.controllers.kdbx.operations import list_all_entries, update_entry
-from app.controllers.kdbx.models import EntryModel
-from app.controllers.kdbx.manager import get_active_vault
+from app.controllers.kdbx.manager import get_active_session
+from app.controllers.kdbx.operations import update_entry_tags, vault_batch
 
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 
 
-def get_duplicate_map() -> Dict[str, List[EntryModel]]:
+def duplicate_password_audit() -> None:
     """
-    Map all entries in the vault by their password to identify duplicates.
+    Detect and tag duplicate passwords using the session's keyed-hash index.
 
-    :return: A dictionary where keys are passwords and values are lists 
-             of EntryModel objects sharing that password.
-    :rtype: Dict[str, List[EntryModel]]
+    This audit performs the following actions:
+    1. Takes the entries whose duplicate status may have changed since the last run.
+    2. Adds a 'duplicate' tag to entries with shared passwords if not present.
+    3. Removes the 'duplicate' tag from entries that now have unique passwords.
+    4. Persists all tag changes with a single save.
+
+    The index is maintained on every add, update and delete, so each run only
+    touches the entries affected by the latest changes.
+
+    :return: None
+    :rtype: None
     """
-    entries = list_all_entries()
-    if not entries:
-        return {}
+    logger.debug("Executing scheduled duplicate password audit and tagging...")
 
-    password_map = defaultdict(list)
-    for entry in entries:
-        password_map[entry.password].append(entry)
+    session = get_active_session()
+    index = session.duplicates
+    changed = index.pop_changed()
+    if not changed:
+        return
 
-    return password_map
+    failed = []
+    with vault_batch():
+        for entry_uuid in changed:
+            entry = session.get_entry(entry_uuid)
+            if entry is None:
+                continue
 
+            tags = entry.tags or []
+            is_duplicated = index.is_duplicate(entry_uuid)
 
-def duplicate_password_audit_task() -> None:
-    """
-    Background execution loop for detecting and tagging duplicate passwords.
+            if is_duplicated and settings.DUPLICATE_TAG not in tags:
+                changes = {"add": [settings.DUPLICATE_TAG]}
+                logger.warning(f"Security Risk: Tagging duplicated entry '{entry.title}'")
 
-    This task performs the following actions:
-    1. Scans all entries and identifies reused passwords.
-    2. Adds a 'duplicate' tag to entries with shared passwords if not present.
-    3. Removes the 'duplicate' tag from entries that now have unique passwords.
-    4. Persists changes to the vault via the operations controller.
+            elif not is_duplicated and settings.DUPLICATE_TAG in tags:
+                changes = {"remove": [settings.DUPLICATE_TAG]}
+                logger.info(f"Security Fixed: Removing duplicate tag from '{entry.title}'")
 
-    :return: None
-    :rtype: None
-    """
-    while True:
-        if not get_active_vault():
-            time.sleep(settings.PASSWORD_AUDIT_INTERVAL)
-            continue
-        
-        logger.debug("Executing scheduled duplicate password audit and tagging...")
-        
-        password_map = get_duplicate_map()
-        if not password_map:
-            time.sleep(settings.PASSWORD_AUDIT_INTERVAL)
-            continue
-
-        for _, entries in password_map.items():
-            is_duplicated = len(entries) > 1
-
-            for entry in entries:
-                changed = False
-                current_tags = list(entry.tags)
-
-                if is_duplicated and settings.DUPLICATE_TAG not in current_tags:
-                    current_tags.append(settings.DUPLICATE_TAG)
-                    entry.tags = current_tags
-                    changed = True
-                    logger.warning(f"Security Risk: Tagging duplicated entry '{entry.title}'")
-
-                elif not is_duplicated and settings.DUPLICATE_TAG in current_tags:
-                    current_tags.remove(settings.DUPLICATE_TAG)
-                    entry.tags = current_tags
-                    changed = True
-                    logger.info(f"Security Fixed: Removing duplicate tag from '{entry.title}'")
-
-                if changed and entry.uuid:
-                    update_entry(entry.uuid, entry)
-
-        time.sleep(settings.PASSWORD_AUDIT_INTERVAL)
\ No newline at end of file
+            else:
+                continue
+
+            if not update_entry_tags(entry_uuid, **changes, internal=True):
+                failed.append(entry_uuid)
+
+    if failed:
+        index.mark_changed(failed)
@@ -0,0 +1,243 @@
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+import http.client
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Set
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+# One persistent HTTP connection per worker thread, keyed by (scheme, host).
+_connections = threading.local()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def sha1_hex(password: str) -> str:
+    """
+    Compute the uppercase SHA-1 hex digest used by the k-anonymity range API.
+
+    :param password: The plaintext password.
+    :type password: str
+    :return: The 40-character uppercase hex digest.
+    :rtype: str
+    """
+    return hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+
+
+def _get_cache_folder() -> Path:
+    """
+    Resolve and create the folder holding the cached prefix ranges.
+
+    :return: The cache folder path.
+    :rtype: Path
+    """
+    folder = Path(settings.PWNED_CACHE_DIR)
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+def _parse_range(body: str) -> Set[str]:
+    """
+    Extract the hash suffixes of a range response ("SUFFIX:COUNT" per line).
+
+    :param body: The raw range body.
+    :type body: str
+    :return: The set of uppercase suffixes listed in the range.
+    :rtype: Set[str]
+    """
+    return {line.split(':', 1)[0].strip().upper() for line in body.splitlines() if line.strip()}
+
+
+def _read_cached_range(prefix: str) -> Optional[str]:
+    """
+    Return a cached range body if it exists and is younger than PWNED_CACHE_TTL_DAYS.
+
+    :param prefix: The 5-character hash prefix.
+    :type prefix: str
+    :return: The cached body, or None on a miss or an expired entry.
+    :rtype: Optional[str]
+    """
+    path = _get_cache_folder() / f"{prefix}.txt"
+    try:
+        if time.time() - path.stat().st_mtime > settings.PWNED_CACHE_TTL_DAYS * 86400:
+            return None
+        return path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Unreadable HIBP cache entry {prefix}: {e}")
+        return None
+
+
+def _write_cached_range(prefix: str, body: str) -> None:
+    """
+    Atomically store a range body in the on-disk cache.
+
+    :param prefix: The 5-character hash prefix.
+    :type prefix: str
+    :param body: The raw range body.
+    :type body: str
+    :return: None
+    :rtype: None
+    """
+    folder = _get_cache_folder()
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=f".{prefix}.", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            handle.write(body)
+        os.replace(tmp_path, folder / f"{prefix}.txt")
+    except OSError as e:
+        logger.warning(f"Could not cache HIBP range {prefix}: {e}")
+
+
+def _get_connection(scheme: str, netloc: str) -> http.client.HTTPConnection:
+    """
+    Return the keep-alive connection of the calling worker thread for a host.
+    """
+    pool = getattr(_connections, "pool", None)
+    if pool is None:
+        pool = _connections.pool = {}
+
+    key = (scheme, netloc)
+    if key not in pool:
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        pool[key] = connection_class(netloc, timeout=settings.UPDATE_TIMEOUT)
+    return pool[key]
+
+
+def _drop_connection(scheme: str, netloc: str) -> None:
+    """
+    Close and forget the connection of the calling worker thread for a host.
+    """
+    connection = getattr(_connections, "pool", {}).pop((scheme, netloc), None)
+    if connection:
+        connection.close()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Return the long-lived lookup pool. Its threads outlive a single audit so
+    their keep-alive connections are reused across cycles.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.PWNED_LOOKUP_WORKERS),
+                thread_name_prefix="HIBPLookup"
+            )
+        return _executor
+
+
+def _fetch_http_range(endpoint: urllib.parse.SplitResult, prefix: str) -> str:
+    """
+    Download a range over a reused HTTP(S) connection, reconnecting once if the
+    server closed the idle connection.
+    """
+    path = endpoint.path.rstrip('/') + f"/{prefix}"
+    headers = {'User-Agent': f'{settings.PROJECT_NAME}-Audit', 'Connection': 'keep-alive'}
+
+    for attempt in range(2):
+        connection = _get_connection(endpoint.scheme, endpoint.netloc)
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            body = response.read().decode('utf-8')
+            if response.status != 200:
+                raise ConnectionError(f"HTTP {response.status}")
+            return body
+        except (http.client.HTTPException, OSError):
+            _drop_connection(endpoint.scheme, endpoint.netloc)
+            if attempt:
+                raise
+
+
+def _fetch_local_range(endpoint: str, prefix: str) -> str:
+    """
+    Read a range from a downloaded dump laid out as one "<PREFIX>.txt" file per prefix.
+    """
+    folder = Path(urllib.request.url2pathname(urllib.parse.urlsplit(endpoint).path)) \
+        if endpoint.startswith("file:") else Path(endpoint)
+    return (folder / f"{prefix}.txt").read_text(encoding='utf-8')
+
+
+def fetch_range(prefix: str) -> Optional[Set[str]]:
+    """
+    Resolve the suffixes of a prefix range, from the cache when fresh, otherwise
+    from the configured PWNED_API_URL (HTTP endpoint or local range dump).
+
+    :param prefix: The 5-character uppercase hash prefix.
+    :type prefix: str
+    :return: The set of breached suffixes, or None if the range is unavailable.
+    :rtype: Optional[Set[str]]
+    """
+    body = _read_cached_range(prefix)
+    if body is not None:
+        return _parse_range(body)
+
+    endpoint = settings.PWNED_API_URL
+    parsed = urllib.parse.urlsplit(endpoint)
+    is_remote = parsed.scheme in ("http", "https")
+
+    try:
+        body = _fetch_http_range(parsed, prefix) if is_remote else _fetch_local_range(endpoint, prefix)
+    except Exception as e:
+        logger.error(f"Failed to fetch HIBP range {prefix}: {e}")
+        return None
+
+    if is_remote:
+        _write_cached_range(prefix, body)
+    return _parse_range(body)
+
+
+def get_data_version() -> Optional[str]:
+    """
+    Identify the breach data served by the configured endpoint. The range API
+    is not versioned, so results are bound to the endpoint and refreshed
+    through PWNED_CACHE_TTL_DAYS instead.
+
+    :return: The data version string.
+    :rtype: Optional[str]
+    """
+    return f"api:{settings.PWNED_API_URL}"
+
+
+def lookup_hashes(hashes: Iterable[str]) -> Dict[str, Optional[bool]]:
+    """
+    Check SHA-1 hashes against the breach ranges. Hashes sharing a prefix are
+    grouped so each range is resolved once, and cache misses are fetched
+    concurrently through PWNED_LOOKUP_WORKERS threads.
+
+    :param hashes: Uppercase SHA-1 hex digests.
+    :type hashes: Iterable[str]
+    :return: A mapping from hash to True (breached), False (clean) or None (range unavailable).
+    :rtype: Dict[str, Optional[bool]]
+    """
+    by_prefix: Dict[str, Set[str]] = defaultdict(set)
+    for sha1_hash in hashes:
+        by_prefix[sha1_hash[:5]].add(sha1_hash)
+
+    if not by_prefix:
+        return {}
+
+    ranges = dict(zip(by_prefix, _get_executor().map(fetch_range, by_prefix)))
+
+    logger.debug(f"HIBP lookup resolved {len(by_prefix)} prefix range(s).")
+
+    results: Dict[str, Optional[bool]] = {}
+    for prefix, group in by_prefix.items():
+        suffixes = ranges[prefix]
+        for sha1_hash in group:
+            results[sha1_hash] = None if suffixes is None else sha1_hash[5:] in suffixes
+    return results
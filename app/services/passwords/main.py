@@ -1,50 +1,85 @@
-import threading
 import logging
+from typing import Callable, Dict, List, Tuple
 
 from app.core.config import settings
-from .find_duplicates import duplicate_password_audit_task
-from .weak_passwords import weak_password_audit_task
-from .pwned_check import pwned_password_audit_task
+from app.controllers.kdbx.manager import get_active_vault, get_active_session
+from app.services.scheduler import ScheduledJob, scheduler
+from .find_duplicates import duplicate_password_audit
+from .weak_passwords import weak_password_audit
+from .pwned_check import pwned_password_audit
 
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 
+_last_audited_revisions: Dict[str, int] = {}
+
+# Audits keeping their own per-entry state. They run on every cycle because
+# their results can expire while the vault itself is unchanged.
+_STATEFUL_AUDITS = {"pwned"}
+
+
+def _get_enabled_audits() -> List[Tuple[str, Callable[[], None]]]:
+    """
+    Resolve the password audits that must run in the current cycle.
+
+    :return: A list of (name, audit function) pairs.
+    :rtype: List[Tuple[str, Callable[[], None]]]
+    """
+    audits = [
+        ("duplicate", duplicate_password_audit),
+        ("weak", weak_password_audit),
+    ]
+    if settings.PWNED_AUDIT_ENABLED:
+        audits.append(("pwned", pwned_password_audit))
+    return audits
+
+
+def run_password_audit_cycle() -> None:
+    """
+    Run every enabled password audit. The duplicate and weak audits work from
+    the session indexes; only the breach audit needs the entry snapshot, which
+    it builds itself. Audits that already ran against the same vault revision
+    are skipped, except the stateful ones which decide per entry what is due.
+
+    :return: None
+    :rtype: None
+    """
+    if not get_active_vault():
+        return
+
+    revision = get_active_session().revision
+    for name, audit in _get_enabled_audits():
+        if name not in _STATEFUL_AUDITS and _last_audited_revisions.get(name) == revision:
+            logger.debug(f"Skipping {name} audit: vault unchanged since revision {revision}.")
+            continue
+
+        try:
+            audit()
+            _last_audited_revisions[name] = revision
+        except Exception as e:
+            logger.error(f"Password audit '{name}' failed: {e}")
+
 
 def start_password_security_audits() -> None:
     """
-    Initialize and launch all password-related security audit services.
+    Register the password audit cycle with the service scheduler. It runs every
+    PASSWORD_AUDIT_INTERVAL seconds and shortly after any vault mutation.
 
     :return: None
     :rtype: None
     """
     logger.info("Launching password security audit services...")
 
-    dup_thread = threading.Thread(
-        target=duplicate_password_audit_task, 
-        daemon=True,
-        name="DuplicatePasswordAudit"
-    )
-    dup_thread.start()
-    logger.info("Duplicate password audit service started.")
-    logger.debug(f"Thread '{dup_thread.name}' is now running in background.")
-
-    weak_thread = threading.Thread(
-        target=weak_password_audit_task,
-        daemon=True,
-        name="WeakPasswordAudit"
-    )
-    weak_thread.start()
-    logger.info("Weak password audit service started.")
-    logger.debug(f"Thread '{weak_thread.name}' is now running in background.")
+    scheduler.register(ScheduledJob(
+        name="password_audit",
+        func=run_password_audit_cycle,
+        interval=lambda: settings.PASSWORD_AUDIT_INTERVAL,
+        priority=2,
+        run_on_mutation=True
+    ))
+    logger.info("Duplicate and weak password audits scheduled.")
 
     if settings.PWNED_AUDIT_ENABLED:
-        pwned_thread = threading.Thread(
-            target=pwned_password_audit_task,
-            daemon=True,
-            name="PwnedPasswordAudit"
-        )
-        pwned_thread.start()
-        logger.info("HIBP breach audit service enabled and started.")
-        logger.debug(f"Thread '{pwned_thread.name}' is now running in background.")
+        logger.info("HIBP breach audit enabled.")
     else:
-        logger.debug("HIBP breach audit service is disabled in settings.")
\ No newline at end of file
+        logger.debug("HIBP breach audit is disabled in settings.")
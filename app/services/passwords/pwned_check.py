@@ -1,80 +1,141 @@
+import hmac
 import time
-import logging
 import hashlib
-import urllib.request
+import logging
+from typing import NamedTuple, Optional
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 from app.core.config import settings
-from app.controllers.kdbx.operations import list_all_entries, update_entry
-from app.controllers.kdbx.models import EntryModel
-from app.controllers.kdbx.manager import get_active_vault
+from app.controllers.kdbx.manager import get_active_session
+from app.controllers.kdbx.operations import update_entry_properties, update_entry_tags, vault_batch
+from app.controllers.kdbx.snapshot import get_vault_snapshot
+from . import corpus, hibp
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 
+# Custom property holding the per-entry audit state, stored encrypted in the vault.
+# It is written in place and persisted with the next save; a state lost on exit
+# only means the entry is checked again.
+PWNED_STATE_PROPERTY = "pwned_audit"
+
+_FINGERPRINT_INFO = b"project-key pwned audit fingerprint"
+
+
+class PwnedAuditState(NamedTuple):
+    """
+    Result of the last breach check of an entry, serialized as
+    "<fingerprint>;<checked_at>;<data_version>".
+    """
+    fingerprint: str
+    checked_at: int
+    data_version: str
+
 
-def _is_password_pwned(password: str) -> bool:
+    def serialize(self) -> str:
+        return f"{self.fingerprint};{self.checked_at};{self.data_version}"
+
+
+    @classmethod
+    def parse(cls, raw: Optional[str]) -> Optional["PwnedAuditState"]:
+        try:
+            fingerprint, checked_at, data_version = raw.split(";", 2)
+            return cls(fingerprint, int(checked_at), data_version)
+        except (AttributeError, ValueError):
+            return None
+
+
+def _get_backend():
     """
-    Check if a password has been leaked using the Have I Been Pwned API.
-    
-    :param password: The plaintext password to check.
-    :return: True if the password was found in a breach, False otherwise.
+    Select the breach lookup backend configured in PWNED_BACKEND.
+
+    :return: The local corpus module ("local") or the HIBP range client module ("api").
+             Both expose lookup_hashes() and get_data_version().
+    """
+    return corpus if settings.PWNED_BACKEND == "local" else hibp
+
+
+def _fingerprint_key(transformed_key: bytes) -> bytes:
     """
-    if not password:
-        return False
-
-    sha1_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
-    prefix, suffix = sha1_hash[:5], sha1_hash[5:]
-
-    url = f"https://api.pwnedpasswords.com/range/{prefix}"
-    
-    try:
-        req = urllib.request.Request(url, headers={'User-Agent': f'{settings.PROJECT_NAME}-Audit'})
-        with urllib.request.urlopen(req, timeout=settings.UPDATE_TIMEOUT) as response:
-            hashes = (line.split(':') for line in response.read().decode('utf-8').splitlines())
-            return any(h_suffix == suffix for h_suffix, _ in hashes)
-            
-    except Exception as e:
-        logger.error(f"Failed to connect to HIBP API: {e}")
-        return False
-
-
-def pwned_password_audit_task() -> None:
+    Derive the fingerprint key from the session transformed key, so fingerprints
+    are stable across sessions but cannot be verified without the vault key.
     """
-    Background loop that checks for leaked passwords and updates entry tags.
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=_FINGERPRINT_INFO).derive(transformed_key)
+
+
+def _fingerprint(key: bytes, entry_uuid: str, password: str) -> str:
+    """
+    Fingerprint a password for change detection with a keyed hash. Salted with
+    the entry UUID so equal passwords of different entries produce different values.
+    """
+    return hmac.new(key, f"{entry_uuid}:{password}".encode('utf-8'), hashlib.sha256).hexdigest()[:32]
+
+
+def pwned_password_audit() -> None:
+    """
+    Check the vault snapshot for leaked passwords and update entry tags. The
+    snapshot is shared with the other snapshot consumers and only rebuilt
+    when the vault revision moved.
+
+    Each entry stores the fingerprint of the last checked password and the
+    breach data version it was checked against. Only entries that are new,
+    changed, checked against another data version or older than
+    PWNED_CACHE_TTL_DAYS are looked up. Every distinct hash prefix is resolved
+    once; entries whose range could not be resolved keep their current tags
+    and are retried on the next cycle.
 
     :return: None
     :rtype: None
     """
-    while True:
-        if not get_active_vault():
-            time.sleep(settings.PASSWORD_AUDIT_INTERVAL)
+    snapshot = get_vault_snapshot()
+    if snapshot is None or not snapshot.entries:
+        return
+
+    backend = _get_backend()
+    data_version = backend.get_data_version()
+    if data_version is None:
+        return
+
+    session = get_active_session()
+    if not session.transformed_key:
+        return
+    key = _fingerprint_key(session.transformed_key)
+    now = int(time.time())
+    ttl = settings.PWNED_CACHE_TTL_DAYS * 86400
+    due = {}
+
+    for entry in snapshot.entries:
+        kp_entry = session.get_entry(entry.uuid)
+        if kp_entry is None or not entry.password:
             continue
-        
-        entries = list_all_entries()
-        if not entries:
-            time.sleep(settings.PASSWORD_AUDIT_INTERVAL)
+
+        fingerprint = _fingerprint(key, entry.uuid, entry.password)
+        state = PwnedAuditState.parse(kp_entry.custom_properties.get(PWNED_STATE_PROPERTY))
+        if state and state.fingerprint == fingerprint and state.data_version == data_version \
+                and now - state.checked_at < ttl:
             continue
 
-        logger.debug("Executing scheduled Have I Been Pwned (HIBP) audit...")
+        due[entry.uuid] = (entry, fingerprint, hibp.sha1_hex(entry.password))
 
-        for entry in entries:
-            is_pwned = _is_password_pwned(entry.password)
-            
-            changed = False
-            current_tags = list(entry.tags)
+    if not due:
+        return
 
-            if is_pwned and settings.PWNED_TAG not in current_tags:
-                current_tags.append(settings.PWNED_TAG)
-                entry.tags = current_tags
-                changed = True
+    logger.debug(f"Executing scheduled HIBP audit on {len(due)} of {len(snapshot.entries)} entries...")
+    results = backend.lookup_hashes(sha1_hash for _, _, sha1_hash in due.values())
+
+    with vault_batch():
+        for entry_uuid, (entry, fingerprint, sha1_hash) in due.items():
+            is_pwned = results.get(sha1_hash)
+            if is_pwned is None:
+                continue
+
+            if is_pwned and settings.PWNED_TAG not in entry.tags:
                 logger.warning(f"CRITICAL: Password for '{entry.title}' found in a data breach!")
+                update_entry_tags(entry_uuid, add=[settings.PWNED_TAG], internal=True)
 
-            elif not is_pwned and settings.PWNED_TAG in current_tags:
-                current_tags.remove(settings.PWNED_TAG)
-                entry.tags = current_tags
-                changed = True
+            elif not is_pwned and settings.PWNED_TAG in entry.tags:
                 logger.info(f"Security Update: Entry '{entry.title}' is no longer flagged as pwned.")
+                update_entry_tags(entry_uuid, remove=[settings.PWNED_TAG], internal=True)
 
-            if changed and entry.uuid:
-                update_entry(entry.uuid, entry)
-
-        time.sleep(settings.PASSWORD_AUDIT_INTERVAL)
\ No newline at end of file
+            state = PwnedAuditState(fingerprint, now, data_version)
+            update_entry_properties(entry_uuid, {PWNED_STATE_PROPERTY: state.serialize()}, internal=True)
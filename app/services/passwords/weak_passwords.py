@@ -1,77 +1,67 @@
-import time
 import logging
-from typing import List
 
 from app.core.config import settings
-from app.controllers.kdbx.operations import list_all_entries, update_entry
-from app.controllers.passwords import check_password_strength
-from app.controllers.kdbx.models import EntryModel
-from app.controllers.kdbx.manager import get_active_vault
+from app.controllers.kdbx.manager import get_active_session
+from app.controllers.kdbx.operations import update_entry_tags, vault_batch
+from app.controllers.kdbx.strength import WEAK_SCORE_THRESHOLD
 
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 
 
-def calculate_global_health_score(entries: List[EntryModel]) -> float:
+def calculate_global_health_score() -> float:
     """
-    Calculate the overall security percentage of the vault.
-    
+    Return the overall security percentage of the active vault.
+    Read from the session's running aggregates, no entry is re-scored.
 
-    :param entries: List of entries to analyze.
     :return: A percentage score from 0 to 100.
     :rtype: float
     """
-    if not entries:
-        return 100.0
+    return get_active_session().strength.health_score()
 
-    total_possible_score = len(entries) * 4
-    current_total_score = sum(check_password_strength(e.password)["score"] for e in entries)
 
-    return (current_total_score / total_possible_score) * 100
-
-
-def weak_password_audit_task() -> None:
+def weak_password_audit() -> None:
     """
-    Background loop that scans for weak passwords and updates entry tags.
+    Tag weak passwords using the session's cached strength scores.
+    Only entries changed since the last run are re-checked.
 
     :return: None
     :rtype: None
     """
-    while True:
-        if not get_active_vault():
-            time.sleep(settings.PASSWORD_AUDIT_INTERVAL)
-            continue
-        
-        logger.debug("Executing scheduled weak password audit...")
-        entries = list_all_entries()
-        
-        if not entries:
-            time.sleep(settings.PASSWORD_AUDIT_INTERVAL)
-            continue
-
-        global_score = calculate_global_health_score(entries)
-        logger.info(f"Vault Global Health Score: {global_score:.2f}%")
-
-        for entry in entries:
-            strength = check_password_strength(entry.password)
-            is_weak = strength["score"] < 3
-            
-            changed = False
-            current_tags = list(entry.tags)
-
-            if is_weak and settings.WEAK_TAG not in current_tags:
-                current_tags.append(settings.WEAK_TAG)
-                entry.tags = current_tags
-                changed = True
-                logger.warning(f"Security Alert: Entry '{entry.title}' marked as weak (Score: {strength['score']})")
-
-            elif not is_weak and settings.WEAK_TAG in current_tags:
-                current_tags.remove(settings.WEAK_TAG)
-                entry.tags = current_tags
-                changed = True
+    logger.debug("Executing scheduled weak password audit...")
+
+    session = get_active_session()
+    index = session.strength
+    changed = index.pop_changed()
+    if not changed:
+        return
+
+    logger.info(f"Vault Global Health Score: {calculate_global_health_score():.2f}%")
+
+    failed = []
+    with vault_batch():
+        for entry_uuid in changed:
+            entry = session.get_entry(entry_uuid)
+            score = index.get_score(entry_uuid)
+            if entry is None or score is None:
+                continue
+
+            tags = entry.tags or []
+            is_weak = score < WEAK_SCORE_THRESHOLD
+
+            if is_weak and settings.WEAK_TAG not in tags:
+                changes = {"add": [settings.WEAK_TAG]}
+                logger.warning(f"Security Alert: Entry '{entry.title}' marked as weak (Score: {score})")
+
+            elif not is_weak and settings.WEAK_TAG in tags:
+                changes = {"remove": [settings.WEAK_TAG]}
                 logger.info(f"Security Improved: Removing weak tag from '{entry.title}'")
 
-            if changed and entry.uuid:
-                update_entry(entry.uuid, entry)
+            else:
+                continue
+
+            if not update_entry_tags(entry_uuid, **changes, internal=True):
+                failed.append(entry_uuid)
 
-        time.sleep(settings.PASSWORD_AUDIT_INTERVAL)
\ No newline at end of file
+    if failed:
+        index.mark_changed(failed)
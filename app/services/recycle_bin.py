@@ -1,33 +1,32 @@
-import time
 import logging
-import threading
 from datetime import datetime, timedelta
 
 from app.core.config import settings
-from app.controllers.kdbx.operations import list_recycle_bin_entries, delete_entry
-from app.controllers.kdbx.manager import get_active_vault
+from app.controllers.kdbx.operations import delete_entry, vault_batch
+from app.controllers.kdbx.snapshot import get_vault_snapshot
+from app.services.scheduler import ScheduledJob, scheduler
 
 
 logger = logging.getLogger(settings.PROJECT_NAME)
 
 
-def auto_empty_recycle_bin_task() -> None:
+def purge_expired_recycle_bin_entries() -> None:
     """
-    Background execution loop for automated Recycle Bin maintenance.
+    Permanently delete Recycle Bin entries older than RECYCLE_BIN_RETENTION_DAYS.
 
     :return: None
     :rtype: None
     """
-    while True:
-        if not get_active_vault():
-            time.sleep(settings.OTHER_SERVICES_INTERVAL)
-            continue
-        
-        logger.debug("Checking Recycle Bin for expired entries...")
-        entries = list_recycle_bin_entries()
-        now = datetime.now()
-        retention_delta = timedelta(days=settings.RECYCLE_BIN_RETENTION_DAYS)
+    snapshot = get_vault_snapshot()
+    if snapshot is None:
+        return
 
+    logger.debug("Checking Recycle Bin for expired entries...")
+    entries = [e for e in snapshot.entries if e.group == settings.RECYCLE_BIN_GROUP_NAME]
+    now = datetime.now()
+    retention_delta = timedelta(days=settings.RECYCLE_BIN_RETENTION_DAYS)
+
+    with vault_batch():
         for entry in entries:
             if entry.deleted_at:
                 try:
@@ -38,20 +37,18 @@ def auto_empty_recycle_bin_task() -> None:
                 except ValueError:
                     logger.error(f"Invalid timestamp format for entry {entry.title}")
 
-        time.sleep(settings.OTHER_SERVICES_INTERVAL)
-
 
 def start_recycle_bin_service() -> None:
     """
-    Initialize and launch the Recycle Bin auto-empty service.
+    Register the Recycle Bin auto-empty job with the service scheduler.
 
     :return: None
     :rtype: None
     """
-    audit_thread = threading.Thread(
-        target=auto_empty_recycle_bin_task,
-        daemon=True,
-        name="RecycleBinAudit"
-    )
-    audit_thread.start()
-    logger.info("Recycle Bin auto-empty service successfully initialized.")
\ No newline at end of file
+    scheduler.register(ScheduledJob(
+        name="recycle_bin",
+        func=purge_expired_recycle_bin_entries,
+        interval=lambda: settings.OTHER_SERVICES_INTERVAL,
+        priority=1
+    ))
+    logger.info("Recycle Bin auto-empty service successfully initialized.")
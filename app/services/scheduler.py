@@ -0,0 +1,295 @@
+import time
+import heapq
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.controllers import events
+from app.controllers.kdbx.manager import is_vault_loaded
+
+
+logger = logging.getLogger(settings.PROJECT_NAME)
+
+# Delay applied after a vault mutation so bursts of edits trigger a single run.
+_MUTATION_GRACE_PERIOD = 2.0
+
+
+class ScheduledJob:
+    """
+    Definition and runtime state of a periodic background job.
+    """
+
+
+    def __init__(
+        self, name: str, func: Callable[[], None], interval: Callable[[], float],
+        priority: int = 10, requires_vault: bool = True, run_on_mutation: bool = False
+    ):
+        """
+        :ivar name: Unique job name.
+        :vartype name: str
+        :ivar func: The callable executed on each run.
+        :vartype func: Callable[[], None]
+        :ivar interval: Callable returning the current interval in seconds, read after every run
+                        so settings changes apply without a restart.
+        :vartype interval: Callable[[], float]
+        :ivar priority: Lower values run first when several jobs are due at once.
+        :vartype priority: int
+        :ivar requires_vault: If True, the job is parked while no vault is open.
+        :vartype requires_vault: bool
+        :ivar run_on_mutation: If True, vault mutations pull the next run forward.
+        :vartype run_on_mutation: bool
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.priority = priority
+        self.requires_vault = requires_vault
+        self.run_on_mutation = run_on_mutation
+        self.next_run: Optional[float] = None
+        self.generation: int = 0
+        self.running: bool = False
+
+
+class ServiceScheduler:
+    """
+    Single dispatcher for every background service. Jobs live in a priority
+    queue ordered by due time and run on a bounded worker pool. The dispatcher
+    sleeps until the next due job or until a vault event / reschedule wakes it.
+    """
+
+
+    def __init__(self, max_workers: int = 2):
+        """
+        :param max_workers: Maximum number of jobs running concurrently.
+        :type max_workers: int
+        """
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._queue: List[Tuple[float, int, int, str]] = []
+        self._condition = threading.Condition()
+        self._max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+
+    def register(self, job: ScheduledJob) -> None:
+        """
+        Add a job. It is due immediately unless it requires a vault and none is open.
+
+        :param job: The job definition.
+        :type job: ScheduledJob
+        :return: None
+        :rtype: None
+        """
+        with self._condition:
+            self._jobs[job.name] = job
+            if job.requires_vault and not is_vault_loaded():
+                self._park(job)
+            else:
+                self._schedule(job, time.monotonic())
+
+
+    def cancel(self, name: str) -> None:
+        """
+        Stop scheduling a job. A run already in progress is allowed to finish.
+
+        :param name: The job name.
+        :type name: str
+        :return: None
+        :rtype: None
+        """
+        with self._condition:
+            job = self._jobs.pop(name, None)
+            if job:
+                job.generation += 1
+                job.next_run = None
+                logger.debug(f"Scheduler: job '{name}' cancelled.")
+
+
+    def reschedule(self, name: str, delay: Optional[float] = None) -> None:
+        """
+        Recompute the next run of a job, e.g. after its interval setting changed.
+
+        :param name: The job name.
+        :type name: str
+        :param delay: Seconds until the next run. Defaults to the job's current interval.
+        :type delay: Optional[float]
+        :return: None
+        :rtype: None
+        """
+        with self._condition:
+            job = self._jobs.get(name)
+            if not job or (job.requires_vault and not is_vault_loaded()):
+                return
+
+            wait = job.interval() if delay is None else delay
+            self._schedule(job, time.monotonic() + max(0.0, wait))
+            logger.debug(f"Scheduler: job '{name}' rescheduled in {wait:.1f}s.")
+
+
+    def on_vault_event(self, event: str) -> None:
+        """
+        React to vault lifecycle events emitted by the controllers.
+
+        :param event: The event name.
+        :type event: str
+        :return: None
+        :rtype: None
+        """
+        now = time.monotonic()
+
+        with self._condition:
+            for job in self._jobs.values():
+                if event in (events.VAULT_OPENED, events.VAULT_RESUMED) and job.requires_vault:
+                    self._schedule(job, now)
+
+                elif event in (events.VAULT_CLOSED, events.VAULT_SUSPENDED) and job.requires_vault:
+                    self._park(job)
+
+                elif event == events.VAULT_MUTATED and job.run_on_mutation:
+                    due = now + _MUTATION_GRACE_PERIOD
+                    if job.next_run is not None and job.next_run > due:
+                        self._schedule(job, due)
+
+
+    def start(self) -> None:
+        """
+        Start the dispatcher thread, the worker pool and the event subscription.
+
+        :return: None
+        :rtype: None
+        """
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+
+            self._stopped = False
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="ServiceWorker"
+            )
+            self._thread = threading.Thread(
+                target=self._dispatch_loop,
+                daemon=True,
+                name="ServiceScheduler"
+            )
+            self._thread.start()
+
+        events.subscribe(self.on_vault_event)
+        logger.info(f"Service scheduler started with {self._max_workers} worker(s).")
+
+
+    def stop(self) -> None:
+        """
+        Stop dispatching jobs. Running jobs are not interrupted.
+
+        :return: None
+        :rtype: None
+        """
+        events.unsubscribe(self.on_vault_event)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+
+    def _schedule(self, job: ScheduledJob, due: float) -> None:
+        """
+        Push a job into the queue, invalidating its previous queue entry.
+        Must be called with the condition held.
+        """
+        job.generation += 1
+        job.next_run = due
+        heapq.heappush(self._queue, (due, job.priority, job.generation, job.name))
+        self._condition.notify_all()
+
+
+    def _park(self, job: ScheduledJob) -> None:
+        """
+        Remove a job from the queue until a vault is opened again.
+        Must be called with the condition held.
+        """
+        job.generation += 1
+        job.next_run = None
+
+
+    def _dispatch_loop(self) -> None:
+        """
+        Wait for the earliest due job and hand it to the worker pool.
+
+        :return: None
+        :rtype: None
+        """
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    self._drop_stale_entries()
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+
+                    wait = self._queue[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._condition.wait(wait)
+
+                if self._stopped:
+                    return
+
+                _, _, _, name = heapq.heappop(self._queue)
+                job = self._jobs[name]
+
+                if job.running:
+                    # Never overlap runs of the same job; retry after its interval.
+                    self._schedule(job, time.monotonic() + job.interval())
+                    continue
+
+                job.running = True
+                job.next_run = None
+
+            self._executor.submit(self._run_job, job)
+
+
+    def _drop_stale_entries(self) -> None:
+        """
+        Discard queue entries of cancelled, parked or rescheduled jobs.
+        Must be called with the condition held.
+        """
+        while self._queue:
+            _, _, generation, name = self._queue[0]
+            job = self._jobs.get(name)
+            if job and job.generation == generation and job.next_run is not None:
+                return
+            heapq.heappop(self._queue)
+
+
+    def _run_job(self, job: ScheduledJob) -> None:
+        """
+        Execute a job on a worker thread and queue its next run.
+
+        :param job: The job to execute.
+        :type job: ScheduledJob
+        :return: None
+        :rtype: None
+        """
+        try:
+            if not job.requires_vault or is_vault_loaded():
+                job.func()
+        except Exception as e:
+            logger.error(f"Scheduled job '{job.name}' failed: {e}")
+        finally:
+            with self._condition:
+                job.running = False
+                is_registered = self._jobs.get(job.name) is job
+                is_runnable = not job.requires_vault or is_vault_loaded()
+
+                if is_registered and is_runnable and job.next_run is None:
+                    self._schedule(job, time.monotonic() + job.interval())
+
+
+# Global scheduler singleton
+scheduler = ServiceScheduler(max_workers=settings.SERVICE_WORKERS)
@@ -8,6 +8,114 @@ export interface GroupModel {
     updated_at?: string;
 }
 
+export interface EntryRow {
+    uuid: string;
+    title: string;
+    username: string | null;
+    url: string | null;
+    group: string;
+    color: string | null;
+    icon: number | null;
+    tags: string[];
+    is_favorite: boolean;
+    password: boolean;
+    totp_seed: boolean;
+    auto_fill_config: null;
+    deleted_at: string | null;
+    created_at: string | null;
+    updated_at: string | null;
+}
+
+export interface EntryPage {
+    items: EntryRow[];
+    total: number;
+    offset: number;
+    revision: number;
+}
+
+export interface EntrySearchResult {
+    items: EntryRow[];
+    total: number;
+    sequence: number;
+    stale: boolean;
+}
+
+export type JobStatus = 'pending' | 'running' | 'done' | 'failed' | 'cancelled';
+
+export interface JobState {
+    id: string;
+    kind: string;
+    status: JobStatus;
+    stage: string | null;
+    progress: number;
+    result: any;
+    error: string | null;
+}
+
+export interface CsvImportPreview {
+    entries: any[];
+    sampled_rows: number;
+    estimated_rows: number;
+    estimated_entries: number;
+}
+
+export type ImportDedupePolicy = 'skip' | 'tag' | 'overwrite' | 'keep_newest';
+
+export interface ImportResult {
+    success: number;
+    failed: number;
+    skipped: number;
+    updated: number;
+}
+
+export type KdfAlgorithm = 'argon2' | 'argon2id' | 'aeskdf';
+
+export interface KdfParameters {
+    algorithm: KdfAlgorithm;
+    iterations: number;
+    memory_kib: number;
+    parallelism: number;
+}
+
+export interface KdfCalibration extends KdfParameters {
+    estimated_ms: number;
+    target_ms: number;
+}
+
+export interface KdfRetuneResult extends KdfCalibration {
+    previous: KdfParameters;
+}
+
+export interface KdfSettings {
+    kdf_auto_tune: boolean;
+    kdf_target_unlock_ms: number;
+    kdf_algorithm: KdfAlgorithm;
+    kdf_memory_mib: number;
+    kdf_parallelism: number;
+    vault_kdf: KdfParameters | null;
+    last_calibration: KdfCalibration | null;
+}
+
+export interface SyncMergeReport {
+    updated: number;
+    removed: number;
+    conflicts: number;
+    groups: number;
+    needs_save: boolean;
+    merged_at: string;
+}
+
+export interface SyncStatus {
+    vault_watch_enabled: boolean;
+    watching: boolean;
+    backend: 'inotify' | 'polling' | null;
+    conflict: boolean;
+    last_merge: SyncMergeReport | null;
+    error: string | null;
+}
+
+export type EntrySortField = 'title' | 'created_at' | 'updated_at' | 'relevance';
+
 export interface FooterItem {
     icon: LucideIcon;
     label: string;
@@ -41,30 +149,62 @@ declare global {
                 set_file_path: (path: string) => Promise<boolean>;
                 select_file: (file_types: string[]) => Promise<string | null>;
                 open_vault: (password: string, keyfile: string | null) => Promise<boolean>;
+                open_vault_async: (password: string, keyfile: string | null) => Promise<string | null>;
+                get_job: (jobId: string) => Promise<JobState | null>;
+                cancel_job: (jobId: string) => Promise<boolean>;
                 create_group: (name: string, icon: number, color?: string) => Promise<boolean>;
-                list_groups(): Promise<GroupModel[]>;
+                list_groups(sortBy?: 'name' | 'created_at' | 'updated_at', reverse?: boolean): Promise<GroupModel[]>;
+                list_entries_page: (
+                    groupName: string | null, query: string | null, offset: number,
+                    limit: number, sortBy: EntrySortField, reverse: boolean
+                ) => Promise<EntryPage>;
                 set_close_behavior: (behavior: string) => Promise<boolean>;
                 minimize_window: () => Promise<void>;
                 exit_application: () => Promise<void>;
                 close_session: () => Promise<boolean>;
+                suspend_session: () => Promise<boolean>;
                 is_session_active: () => Promise<boolean>;
                 get_close_behavior: () => Promise<string>;
                 get_security_settings: () => Promise<{
                     pwned_audit_enabled: boolean;
                     password_audit_interval: number;
                     clipboard_clear_interval: number;
+                    pwned_api_url: string;
+                    pwned_cache_ttl_days: number;
+                    pwned_backend: 'api' | 'local';
                 }>;
                 set_pwned_audit_enabled: (enabled: boolean) => Promise<boolean>;
+                set_pwned_api_url: (url: string) => Promise<boolean>;
+                set_pwned_cache_ttl_days: (days: number) => Promise<boolean>;
+                set_pwned_backend: (backend: 'api' | 'local') => Promise<boolean>;
+                import_pwned_corpus: (sourcePath: string) => Promise<string | null>;
                 set_password_audit_interval: (interval: number) => Promise<boolean>;
                 set_clipboard_clear_interval: (interval: number) => Promise<boolean>;
+                get_kdf_settings: () => Promise<KdfSettings>;
+                set_kdf_auto_tune: (enabled: boolean) => Promise<boolean>;
+                set_kdf_target_unlock_ms: (targetMs: number) => Promise<boolean>;
+                set_kdf_algorithm: (algorithm: KdfAlgorithm) => Promise<boolean>;
+                benchmark_kdf: (targetMs: number | null) => Promise<KdfCalibration | null>;
+                retune_vault_kdf: (password: string, keyfile: string | null) => Promise<KdfRetuneResult | null>;
+                get_sync_status: () => Promise<SyncStatus>;
+                keep_local_vault_version: () => Promise<boolean>;
+                set_vault_watch_enabled: (enabled: boolean) => Promise<boolean>;
                 get_maintenance_settings: () => Promise<{
                     recycle_bin_retention_days: number;
                     backup_max_count: number;
                     other_services_interval: number;
+                    save_debounce_interval: number;
+                    backup_keep_hourly: number;
+                    backup_keep_daily: number;
+                    backup_keep_weekly: number;
                 }>;
                 set_recycle_bin_retention_days: (days: number) => Promise<boolean>;
                 set_backup_max_count: (count: number) => Promise<boolean>;
                 set_other_services_interval: (interval: number) => Promise<boolean>;
+                set_save_debounce_interval: (interval: number) => Promise<boolean>;
+                set_backup_retention: (hourly: number, daily: number, weekly: number) => Promise<boolean>;
+                list_backups: () => Promise<{ id: string; created_at: string; size: number }[]>;
+                restore_backup: (backup_id: string) => Promise<boolean>;
                 get_log_level: () => Promise<string>;
                 set_log_level: (level: string) => Promise<boolean>;
                 open_log_dir: () => Promise<boolean>;
@@ -72,11 +212,24 @@ declare global {
                 open_history_dir: () => Promise<boolean>;
                 open_config_dir: () => Promise<boolean>;
                 add_entry: (entry: any) => Promise<boolean>;
+                get_entry: (entryUuid: string) => Promise<any | null>;
+                copy_entry_field: (entryUuid: string, field: 'username' | 'password' | 'url' | 'totp') => Promise<boolean>;
                 export_data: (format: string, groupName?: string) => Promise<boolean>;
                 get_csv_columns: (filePath: string) => Promise<string[]>;
-                preview_csv_import: (filePath: string, preset?: string, mapping?: any) => Promise<any[]>;
-                run_import: (entries: any[], targetGroup: string) => Promise<{ success: number; failed: number }>;
+                preview_csv_import: (filePath: string, preset?: string, mapping?: any) => Promise<CsvImportPreview | null>;
+                start_csv_parse: (filePath: string, preset?: string, mapping?: any) => Promise<string | null>;
+                run_import: (jobId: string, targetGroup: string, policy?: ImportDedupePolicy) => Promise<ImportResult>;
+                discard_import: (jobId: string) => Promise<boolean>;
+                import_csv_file: (
+                    filePath: string, targetGroup: string, preset?: string, mapping?: any, policy?: ImportDedupePolicy
+                ) => Promise<ImportResult>;
+                get_import_dedupe_policy: () => Promise<ImportDedupePolicy>;
+                set_import_dedupe_policy: (policy: ImportDedupePolicy) => Promise<boolean>;
                 search_entries: (query: string) => Promise<any[]>;
+                search_entries_incremental: (
+                    searchId: string, sequence: number, query: string, groupName: string | null, limit: number
+                ) => Promise<EntrySearchResult>;
+                close_search: (searchId: string) => Promise<boolean>;
                 update_group: (oldName: string, newName: string, icon: number, color?: string) => Promise<boolean>; // <--- Nuevo
             }
         }
@@ -1,6 +1,13 @@
-import type { GroupModel } from "@/global"
+import type {
+    CsvImportPreview, EntryPage, EntrySearchResult, EntrySortField, GroupModel,
+    ImportDedupePolicy, ImportResult, JobState, KdfAlgorithm, KdfCalibration, KdfRetuneResult,
+    KdfSettings, SyncStatus
+} from "@/global"
 
 
+// Last keystroke number sent by each search box; the backend drops older requests.
+const searchSequences: Record<string, number> = {};
+
 const getPywebviewApi = (): Promise<any> => {
     
     if (
@@ -88,14 +95,54 @@ export const backendAPI = {
         return await api.open_vault(password, parsedKeyfile)
     },
 
+    // Starts the unlock in the background; poll it with getJob / waitForJob.
+    startUnlockVault: async (password: string, keyfile: string | null = null): Promise<string | null> => {
+        const api = await getPywebviewApi()
+        const parsedKeyfile = keyfile && keyfile.trim() !== "" ? keyfile : null;
+        return await api.open_vault_async(password, parsedKeyfile)
+    },
+
+    getJob: async (jobId: string): Promise<JobState | null> => {
+        const api = await getPywebviewApi();
+        return await api.get_job(jobId);
+    },
+
+    cancelJob: async (jobId: string): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.cancel_job(jobId);
+    },
+
+    waitForJob: async (
+        jobId: string, onProgress?: (job: JobState) => void, intervalMs: number = 150
+    ): Promise<JobState | null> => {
+        const api = await getPywebviewApi();
+        while (true) {
+            const job: JobState | null = await api.get_job(jobId);
+            if (!job) return null;
+            onProgress?.(job);
+            if (job.status !== 'pending' && job.status !== 'running') return job;
+            await new Promise((resolve) => setTimeout(resolve, intervalMs));
+        }
+    },
+
     createGroup: async (name: string, icon: number = 48, color?: string): Promise<boolean> => {
         const api = await getPywebviewApi();
         return await api.create_group(name, icon, color);
     },
 
-    listGroups: async (): Promise<GroupModel[]> => {
+    listGroups: async (sortBy: 'name' | 'created_at' | 'updated_at' = 'name', reverse: boolean = false): Promise<GroupModel[]> => {
+        const api = await getPywebviewApi();
+        return await api.list_groups(sortBy, reverse);
+    },
+
+    listEntriesPage: async (
+        options: { groupName?: string; query?: string; offset?: number; limit?: number; sortBy?: EntrySortField; reverse?: boolean } = {}
+    ): Promise<EntryPage> => {
         const api = await getPywebviewApi();
-        return await api.list_groups();
+        return await api.list_entries_page(
+            options.groupName ?? null, options.query ?? null, options.offset ?? 0,
+            options.limit ?? 100, options.sortBy ?? 'title', options.reverse ?? false
+        );
     },
 
     deleteGroup: async (name: string, force: boolean = false, moveTo: string | null = null): Promise<boolean> => {
@@ -123,6 +170,11 @@ export const backendAPI = {
         return await api.close_session();
     },
 
+    suspendSession: async (): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.suspend_session();
+    },
+
     isSessionActive: async (): Promise<boolean> => {
         const api = await getPywebviewApi();
         return await api.is_session_active();
@@ -143,6 +195,26 @@ export const backendAPI = {
         return await api.set_pwned_audit_enabled(enabled);
     },
 
+    setPwnedApiUrl: async (url: string): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_pwned_api_url(url);
+    },
+
+    setPwnedCacheTtlDays: async (days: number): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_pwned_cache_ttl_days(days);
+    },
+
+    setPwnedBackend: async (backend: 'api' | 'local'): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_pwned_backend(backend);
+    },
+
+    importPwnedCorpus: async (sourcePath: string): Promise<string | null> => {
+        const api = await getPywebviewApi();
+        return await api.import_pwned_corpus(sourcePath);
+    },
+
     setPasswordAuditInterval: async (interval: number): Promise<boolean> => {
         const api = await getPywebviewApi();
         return await api.set_password_audit_interval(interval);
@@ -153,6 +225,51 @@ export const backendAPI = {
         return await api.set_clipboard_clear_interval(interval);
     },
 
+    getKdfSettings: async (): Promise<KdfSettings> => {
+        const api = await getPywebviewApi();
+        return await api.get_kdf_settings();
+    },
+
+    setKdfAutoTune: async (enabled: boolean): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_kdf_auto_tune(enabled);
+    },
+
+    setKdfTargetUnlockMs: async (targetMs: number): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_kdf_target_unlock_ms(targetMs);
+    },
+
+    setKdfAlgorithm: async (algorithm: KdfAlgorithm): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_kdf_algorithm(algorithm);
+    },
+
+    benchmarkKdf: async (targetMs?: number): Promise<KdfCalibration | null> => {
+        const api = await getPywebviewApi();
+        return await api.benchmark_kdf(targetMs ?? null);
+    },
+
+    retuneVaultKdf: async (password: string, keyfile: string | null = null): Promise<KdfRetuneResult | null> => {
+        const api = await getPywebviewApi();
+        return await api.retune_vault_kdf(password, keyfile);
+    },
+
+    getSyncStatus: async (): Promise<SyncStatus> => {
+        const api = await getPywebviewApi();
+        return await api.get_sync_status();
+    },
+
+    keepLocalVaultVersion: async (): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.keep_local_vault_version();
+    },
+
+    setVaultWatchEnabled: async (enabled: boolean): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_vault_watch_enabled(enabled);
+    },
+
     getMaintenanceSettings: async () => {
         const api = await getPywebviewApi();
         return await api.get_maintenance_settings();
@@ -168,11 +285,31 @@ export const backendAPI = {
         return await api.set_backup_max_count(count);
     },
 
+    setBackupRetention: async (hourly: number, daily: number, weekly: number): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_backup_retention(hourly, daily, weekly);
+    },
+
+    listBackups: async (): Promise<{ id: string; created_at: string; size: number }[]> => {
+        const api = await getPywebviewApi();
+        return await api.list_backups();
+    },
+
+    restoreBackup: async (backupId: string): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.restore_backup(backupId);
+    },
+
     setOtherServicesInterval: async (interval: number): Promise<boolean> => {
         const api = await getPywebviewApi();
         return await api.set_other_services_interval(interval);
     },
 
+    setSaveDebounceInterval: async (interval: number): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_save_debounce_interval(interval);
+    },
+
     getLogLevel: async (): Promise<string> => {
         const api = await getPywebviewApi();
         return await api.get_log_level();
@@ -210,6 +347,16 @@ export const backendAPI = {
         return await api.list_entries_by_group(groupName);
     },
 
+    getEntry: async (entryUuid: string): Promise<any | null> => {
+        const api = await getPywebviewApi();
+        return await api.get_entry(entryUuid);
+    },
+
+    copyEntryField: async (entryUuid: string, field: 'username' | 'password' | 'url' | 'totp'): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.copy_entry_field(entryUuid, field);
+    },
+
     exportData: async (format: string, groupName?: string): Promise<boolean> => {
         const api = await getPywebviewApi();
         return await api.export_data(format, groupName);
@@ -225,14 +372,41 @@ export const backendAPI = {
         return await api.select_file(['CSV files (*.csv)', 'All files (*.*)']);
     },
 
-    previewCsvImport: async (filePath: string, preset?: string, mapping?: any): Promise<any[]> => {
+    previewCsvImport: async (filePath: string, preset?: string, mapping?: any): Promise<CsvImportPreview | null> => {
         const api = await getPywebviewApi();
         return await api.preview_csv_import(filePath, preset, mapping);
     },
 
-    runImport: async (entries: any[], targetGroup: string): Promise<{ success: number; failed: number }> => {
+    startCsvParse: async (filePath: string, preset?: string, mapping?: any): Promise<string | null> => {
+        const api = await getPywebviewApi();
+        return await api.start_csv_parse(filePath, preset, mapping);
+    },
+
+    runImport: async (jobId: string, targetGroup: string, policy?: ImportDedupePolicy): Promise<ImportResult> => {
+        const api = await getPywebviewApi();
+        return await api.run_import(jobId, targetGroup, policy);
+    },
+
+    discardImport: async (jobId: string): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.discard_import(jobId);
+    },
+
+    importCsvFile: async (
+        filePath: string, targetGroup: string, preset?: string, mapping?: any, policy?: ImportDedupePolicy
+    ): Promise<ImportResult> => {
         const api = await getPywebviewApi();
-        return await api.run_import(entries, targetGroup);
+        return await api.import_csv_file(filePath, targetGroup, preset, mapping, policy);
+    },
+
+    getImportDedupePolicy: async (): Promise<ImportDedupePolicy> => {
+        const api = await getPywebviewApi();
+        return await api.get_import_dedupe_policy();
+    },
+
+    setImportDedupePolicy: async (policy: ImportDedupePolicy): Promise<boolean> => {
+        const api = await getPywebviewApi();
+        return await api.set_import_dedupe_policy(policy);
     },
 
     searchEntries: async (query: string): Promise<any[]> => {
@@ -240,6 +414,25 @@ export const backendAPI = {
         return await api.search_entries(query);
     },
 
+    // Resolves to null when a newer keystroke of the same search box superseded this one.
+    searchAsYouType: async (
+        searchId: string, query: string, options: { groupName?: string; limit?: number } = {}
+    ): Promise<EntrySearchResult | null> => {
+        const sequence = (searchSequences[searchId] ?? 0) + 1;
+        searchSequences[searchId] = sequence;
+        const api = await getPywebviewApi();
+        const result: EntrySearchResult = await api.search_entries_incremental(
+            searchId, sequence, query, options.groupName ?? null, options.limit ?? 100
+        );
+        return result.stale || searchSequences[searchId] !== sequence ? null : result;
+    },
+
+    closeSearch: async (searchId: string): Promise<boolean> => {
+        delete searchSequences[searchId];
+        const api = await getPywebviewApi();
+        return await api.close_search(searchId);
+    },
+
     updateGroup: async (oldName: string, newName: string, icon: number = 48, color?: string): Promise<boolean> => {
         const api = await getPywebviewApi();
         return await api.update_group(oldName, newName, icon, color);
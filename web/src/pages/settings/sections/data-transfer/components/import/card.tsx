@@ -8,6 +8,7 @@ import { Label } from "@/components/ui/label"
 import { ImportPreviewDialog } from "./preview-dialog"
 import { backendAPI as backend } from "@/lib/api"
 import { useGroup } from "@/contexts/group-context"
+import type { CsvImportPreview } from "@/global"
 
 const PRESETS = [
     { id: "chrome", name: "Google Chrome" },
@@ -38,7 +39,8 @@ export const ImportCard = () => {
         url: ["url", "none"], 
         notes: ["note", "none"]
     })
-    const [previewEntries, setPreviewEntries] = useState<any[]>([])
+    const [preview, setPreview] = useState<CsvImportPreview | null>(null)
+    const [parseJobId, setParseJobId] = useState<string | null>(null)
     const [isPreviewOpen, setIsPreviewOpen] = useState(false)
     const { groups } = useGroup();
 
@@ -73,11 +75,15 @@ export const ImportCard = () => {
                 acc[key] = mapping[key].map(val => val === "none" ? "" : val);
                 return acc;
             }, {} as Record<string, string[]>);
-            const data = await backend.previewCsvImport(filePath, preset === "others" ? "" : preset, preset === "others" ? cleanMapping : {})           
-            if (data.length === 0) {
+            const presetName = preset === "others" ? "" : preset
+            const presetMapping = preset === "others" ? cleanMapping : {}
+            const data = await backend.previewCsvImport(filePath, presetName, presetMapping)
+            if (!data || data.entries.length === 0) {
                 toast.error("No entries found. Check your mapping.", { id: loadingId })
             } else {
-                setPreviewEntries(data)
+                // The full file is parsed in the background while the sample is reviewed.
+                setParseJobId(await backend.startCsvParse(filePath, presetName, presetMapping))
+                setPreview(data)
                 setIsPreviewOpen(true)
                 toast.dismiss(loadingId)
             }
@@ -189,7 +195,7 @@ export const ImportCard = () => {
                     <span>Analyze & Preview Data</span>
                 </Button>
 
-                <ImportPreviewDialog open={isPreviewOpen} onOpenChange={setIsPreviewOpen} data={previewEntries} targetGroup={targetGroup} />
+                <ImportPreviewDialog open={isPreviewOpen} onOpenChange={setIsPreviewOpen} preview={preview} jobId={parseJobId} targetGroup={targetGroup} />
 
             </div>
         </div>
@@ -1,23 +1,64 @@
+import { useState, useEffect } from "react"
 import { ImportDataTable } from "./table/table"
 import { columns } from "./table/columns"
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle } from "@/components/ui/dialog"
 import { Button } from "@/components/ui/button"
+import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { toast } from "sonner"
 import { CheckCircle2Icon, AlertCircleIcon } from "lucide-react"
 
 import { backendAPI as backend } from "@/lib/api"
+import type { ImportDedupePolicy } from "@/global"
+
+const DEDUPE_POLICIES: { id: ImportDedupePolicy; name: string }[] = [
+    { id: "tag", name: "Add and tag duplicates" },
+    { id: "skip", name: "Skip existing accounts" },
+    { id: "overwrite", name: "Overwrite existing accounts" },
+    { id: "keep_newest", name: "Keep the newest version" },
+]
+
+export function ImportPreviewDialog({ open, onOpenChange, preview, jobId, targetGroup }: any) {
+
+    const data = preview?.entries ?? []
+    const estimatedEntries = preview?.estimated_entries ?? data.length
+    const [policy, setPolicy] = useState<ImportDedupePolicy>("tag")
+
+    useEffect(() => {
+        if (open) backend.getImportDedupePolicy().then(setPolicy).catch(() => {})
+    }, [open])
+
+    const handleOpenChange = (isOpen: boolean) => {
+        if (!isOpen && jobId) {
+            // Stop the background parse (or release its result) when the import is abandoned.
+            backend.cancelJob(jobId)
+            backend.discardImport(jobId)
+        }
+        onOpenChange(isOpen)
+    }
 
-export function ImportPreviewDialog({ open, onOpenChange, data, targetGroup }: any) {
-    
     const handleConfirmImport = async () => {
-        const loadingId = toast.loading(`Importing ${data.length} entries to ${targetGroup}...`)
+        if (!jobId) return toast.error("The file could not be parsed.")
+        const loadingId = toast.loading("Reading the whole file...")
         try {
-            const results = await backend.runImport(data, targetGroup)
+            const job = await backend.waitForJob(jobId, (state) => {
+                toast.loading(`Reading the whole file... ${Math.round(state.progress * 100)}%`, { id: loadingId })
+            })
+            if (!job || job.status !== 'done') {
+                return toast.error(job?.error ?? "Parsing the file failed.", { id: loadingId })
+            }
+
+            toast.loading(`Importing ${job.result.entries} entries to ${targetGroup}...`, { id: loadingId })
+            const results = await backend.runImport(jobId, targetGroup, policy)
             
-            if (results.success > 0) {
+            if (results.success > 0 || results.updated > 0 || results.skipped > 0) {
+                const details = [
+                    results.updated > 0 ? `${results.updated} updated` : null,
+                    results.skipped > 0 ? `${results.skipped} duplicates skipped` : null,
+                    results.failed > 0 ? `${results.failed} failed to import` : null,
+                ].filter(Boolean).join(", ")
                 toast.success(`Done! ${results.success} entries added.`, { 
                     id: loadingId,
-                    description: results.failed > 0 ? `${results.failed} failed to import.` : undefined 
+                    description: details || undefined 
                 })
                 window.dispatchEvent(new CustomEvent('vault-changed'))
                 onOpenChange(false)
@@ -30,12 +71,12 @@ export function ImportPreviewDialog({ open, onOpenChange, data, targetGroup }: a
     }
 
     return (
-        <Dialog open={open} onOpenChange={onOpenChange}>
+        <Dialog open={open} onOpenChange={handleOpenChange}>
             <DialogContent className="sm:max-w-225 max-h-[85vh] flex flex-col p-0 overflow-hidden">
                 
                 <DialogHeader className="p-6 pb-2">
                     <DialogTitle className="text-xl">Review Imported Data</DialogTitle>
-                    <DialogDescription>We found <strong>{data.length} entries</strong>. Please verify the mapping below before adding them to the <strong>{targetGroup}</strong> group.</DialogDescription>
+                    <DialogDescription>We found about <strong>{estimatedEntries} entries</strong>; the first {data.length} are shown. Please verify the mapping below before adding them to the <strong>{targetGroup}</strong> group.</DialogDescription>
                 </DialogHeader>
 
                 <div className="flex-1 overflow-y-auto px-6 py-2">
@@ -45,10 +86,16 @@ export function ImportPreviewDialog({ open, onOpenChange, data, targetGroup }: a
                 <div className="p-6 flex items-center justify-between bg-muted/40 border-t">
                     <div className="flex items-center gap-2 text-xs text-muted-foreground max-w-100">
                         <AlertCircleIcon className="size-4 text-amber-500 shrink-0" />
-                        <span>Entries with existing titles and usernames will be automatically tagged to avoid data loss.</span>
+                        <span>Accounts already in the vault (same site and username) are matched; identical copies are never added twice.</span>
                     </div>
                     <div className="flex gap-3">
-                        <Button variant="ghost" onClick={() => onOpenChange(false)}>
+                        <Select value={policy} onValueChange={(val) => setPolicy(val as ImportDedupePolicy)}>
+                            <SelectTrigger className="w-56"><SelectValue /></SelectTrigger>
+                            <SelectContent>
+                                {DEDUPE_POLICIES.map(p => <SelectItem key={p.id} value={p.id}>{p.name}</SelectItem>)}
+                            </SelectContent>
+                        </Select>
+                        <Button variant="ghost" onClick={() => handleOpenChange(false)}>
                             <span>Cancel</span>
                         </Button>
                         <Button onClick={handleConfirmImport} className="px-8">